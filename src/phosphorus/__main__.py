@@ -1,9 +1,12 @@
 from phosphorus.lib.cli import parse_args
 from phosphorus.subcommands.build import BuildCommand
+from phosphorus.subcommands.resolve import ResolveCommand
 
 
 def main() -> None:
     args = parse_args()
     match args.subcommand:
-        case "build":  # pragma: no branch
+        case "build":
             BuildCommand(args).run()
+        case "resolve":  # pragma: no branch
+            ResolveCommand(args).run()
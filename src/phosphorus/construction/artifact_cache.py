@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import shutil
+import time
+import uuid
+from contextlib import suppress
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+cache_dir_variable = "PHOSPHORUS_ARTIFACT_CACHE"
+max_size_variable = "PHOSPHORUS_ARTIFACT_CACHE_SIZE"
+default_max_size = 5 * 2**30
+size_units = {"K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+# temporary files older than this were left behind by interrupted inserts
+stale_temporary_seconds = 3600
+
+_caches: dict[tuple[Path, int], ArtifactCache] = {}
+_caches_lock = Lock()
+
+
+class ArtifactCache:
+    """Finished artifacts, by the digest of their inputs, shared by local builds.
+
+    Entries are only ever added whole, by renaming a complete temporary file
+    into place, and are never modified, so concurrent builds, on one host or
+    over NFS, need no locks: a reader that races an eviction merely misses.
+    The access time of an entry is set explicitly when it is used, rather than
+    relying on the mount options, and the least recently used entries are
+    evicted once the cache outgrows its maximum size.
+    """
+
+    __slots__ = ("directory", "hits", "max_size", "misses")
+
+    def __init__(self, directory: Path, *, max_size: int = default_max_size) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def fetch(self, key: str, destination: Path) -> bool:
+        """Put the artifact of the key at the destination, if it is cached."""
+        entry = self._entry(key)
+        temporary = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}")
+        try:
+            try:
+                os.link(entry, temporary)
+            except OSError:
+                # another filesystem, or one without hard links, unless the
+                # entry is missing, and cannot be copied either
+                shutil.copyfile(entry, temporary)
+            temporary.replace(destination)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+            self.misses += 1
+            return False
+        self._touch(entry)
+        self.hits += 1
+        return True
+
+    def insert(self, key: str, artifact: Path) -> None:
+        """Add an artifact, and evict the least recently used ones if needed.
+
+        A cache that cannot be written to is not an error: the next build
+        merely misses again.
+        """
+        entry = self._entry(key)
+        if entry.exists():
+            self._touch(entry)
+            return
+        temporary = entry.with_name(f".{key}.{uuid.uuid4().hex}")
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            with artifact.open("rb") as source, temporary.open("xb") as target:
+                shutil.copyfileobj(source, target)
+                target.flush()
+                os.fsync(target.fileno())
+            # entries may be hard linked into output directories, where they
+            # must not be modified in place
+            temporary.chmod(0o444)
+            temporary.replace(entry)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove the least recently used entries beyond the maximum size.
+
+        Return the number of bytes that were freed.
+        """
+        entries = []
+        total = 0
+        now = time.time_ns()
+        for path, stat in self._scan():
+            if path.name.startswith("."):
+                if now - stat.st_mtime_ns > stale_temporary_seconds * 10**9:
+                    path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_atime_ns, stat.st_size, path))
+            total += stat.st_size
+
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_size:
+                break
+            with suppress(OSError):
+                path.unlink()
+                freed += size
+        return freed
+
+    def _entry(self, key: str) -> Path:
+        return self.directory.joinpath(key[:2], key)
+
+    def _scan(self) -> list[tuple[Path, os.stat_result]]:
+        entries = []
+        with suppress(OSError):
+            for shard in os.scandir(self.directory):
+                if not shard.is_dir():
+                    continue
+                with suppress(OSError):
+                    for entry in os.scandir(shard.path):
+                        # entries evicted meanwhile are skipped
+                        with suppress(OSError):
+                            entries.append((Path(entry.path), entry.stat()))
+        return entries
+
+    @staticmethod
+    def _touch(entry: Path) -> None:
+        with suppress(OSError):
+            os.utime(entry, ns=(time.time_ns(), entry.stat().st_mtime_ns))
+
+
+def get_artifact_cache(config: Mapping[str, str]) -> ArtifactCache | None:
+    """Return the cache of the build settings, or of the environment, if any.
+
+    Builds that share the same cache directory, in the same process, share
+    the same instance, so that its hit rate covers all of them.
+    """
+    directory = config.get("artifact-cache", os.environ.get(cache_dir_variable))
+    if not directory:
+        return None
+    size = config.get("artifact-cache-size", os.environ.get(max_size_variable))
+    path = Path(directory).resolve()
+    max_size = parse_size(size) if size else default_max_size
+    with _caches_lock:
+        if (path, max_size) not in _caches:
+            _caches[path, max_size] = ArtifactCache(path, max_size=max_size)
+        return _caches[path, max_size]
+
+
+def parse_size(size: str) -> int:
+    """Parse a number of bytes, with an optional K, M, G or T binary unit."""
+    number, unit = size.strip(), 1
+    if number[-1:].upper() in size_units:
+        number, unit = number[:-1], size_units[number[-1].upper()]
+    try:
+        return int(float(number) * unit)
+    except ValueError:
+        msg = f"Invalid artifact cache size {size!r}, expected say 500M or 10G"
+        raise ValueError(msg) from None
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, TypeVar
+
+from phosphorus.construction.pipeline import AsyncBuild, default_max_in_flight_bytes
+from phosphorus.construction.sdist import SdistBuilder
+from phosphorus.construction.wheel import WheelBuilder
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+    from concurrent.futures import Executor
+
+    from phosphorus.construction.base import Builder
+
+T = TypeVar("T")
+
+# asynchronous counterparts of the hooks in phosphorus.construction.api
+
+
+async def build_wheel(
+    wheel_directory: str,
+    config_settings: Mapping[str, str] | None = None,
+    metadata_directory: str | None = None,
+    *,
+    source_directory: str | None = None,
+    executor: Executor | None = None,
+    max_in_flight_bytes: int = default_max_in_flight_bytes,
+) -> str:
+    metadata_path = None if metadata_directory is None else Path(metadata_directory)
+    builder = await _run_in_executor(
+        executor,
+        partial(
+            WheelBuilder,
+            Path(wheel_directory),
+            config_settings,
+            metadata_path,
+            source_dir=_source_path(source_directory),
+        ),
+    )
+    return await _build(builder, executor, max_in_flight_bytes)
+
+
+async def build_sdist(
+    sdist_directory: str,
+    config_settings: Mapping[str, str] | None = None,
+    *,
+    source_directory: str | None = None,
+    executor: Executor | None = None,
+    max_in_flight_bytes: int = default_max_in_flight_bytes,
+) -> str:
+    builder = await _run_in_executor(
+        executor,
+        partial(
+            SdistBuilder,
+            Path(sdist_directory),
+            config_settings,
+            None,
+            source_dir=_source_path(source_directory),
+        ),
+    )
+    return await _build(builder, executor, max_in_flight_bytes)
+
+
+async def prepare_metadata_for_build_wheel(
+    metadata_directory: str,
+    config_settings: Mapping[str, str] | None = None,
+    *,
+    source_directory: str | None = None,
+    executor: Executor | None = None,
+) -> str:
+    builder = await _run_in_executor(
+        executor,
+        partial(
+            WheelBuilder,
+            Path(os.devnull),
+            config_settings,
+            Path(metadata_directory),
+            source_dir=_source_path(source_directory),
+        ),
+    )
+    metadata_path = await _run_in_executor(executor, builder.prepare_metadata)
+    return metadata_path.name
+
+
+async def build_editable(
+    wheel_directory: str,
+    config_settings: Mapping[str, str] | None = None,
+    metadata_directory: str | None = None,
+    *,
+    source_directory: str | None = None,
+    executor: Executor | None = None,
+    max_in_flight_bytes: int = default_max_in_flight_bytes,
+) -> str:
+    metadata_path = None if metadata_directory is None else Path(metadata_directory)
+    builder = await _run_in_executor(
+        executor,
+        partial(
+            WheelBuilder,
+            Path(wheel_directory),
+            config_settings,
+            metadata_path,
+            editable=True,
+            source_dir=_source_path(source_directory),
+        ),
+    )
+    return await _build(builder, executor, max_in_flight_bytes)
+
+
+async def _build(
+    builder: Builder[T], executor: Executor | None, max_in_flight_bytes: int
+) -> str:
+    build = AsyncBuild(
+        builder, executor=executor, max_in_flight_bytes=max_in_flight_bytes
+    )
+    package = await build.build()
+    return package.name
+
+
+def _source_path(source_directory: str | None) -> Path | None:
+    return None if source_directory is None else Path(source_directory).resolve()
+
+
+async def _run_in_executor(executor: Executor | None, func: Callable[[], T]) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func)
@@ -1,55 +1,226 @@
 from __future__ import annotations
 
+import hashlib
+import time
+from dataclasses import dataclass
 from itertools import chain
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Generic, TypeVar
 
+from phosphorus.__version__ import __version__
+from phosphorus.construction.artifact_cache import get_artifact_cache
+from phosphorus.construction.fingerprint import Fingerprint
+from phosphorus.construction.report import BuildReport
 from phosphorus.lib.contributors import Contributor
+from phosphorus.lib.digest_cache import get_digest_cache
+from phosphorus.lib.licenses import get_license_files
 from phosphorus.lib.metadata import Metadata
+from phosphorus.lib.zipped_file import ArchiveFile
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator, Mapping, Sequence
+    from collections.abc import Iterator, Mapping, Sequence
+    from contextlib import AbstractContextManager
 
-    from phosphorus.lib.zipped_file import ArchiveFile
+    from phosphorus.construction.artifact_cache import ArtifactCache
+    from phosphorus.construction.report import Progress
+    from phosphorus.lib.type_defs import JsonType
 
+ArchiveT = TypeVar("ArchiveT")
 
-class Builder:
-    __slots__ = ("config", "meta", "metadata_dir", "output_dir")
+
+@dataclass(frozen=True, slots=True)
+class PendingBuild:
+    """A build whose artifact is neither up to date, nor cached."""
+
+    report: BuildReport
+    fingerprint: Fingerprint
+    cache: ArtifactCache | None
+    # the key of the artifact in the cache, if there is one
+    key: str
+    started: float
+
+
+class Builder(Generic[ArchiveT]):
+    __slots__ = ("config", "meta", "metadata_dir", "output_dir", "progress", "report")
 
     def __init__(
         self,
         output_dir: Path,
         config: Mapping[str, str] | None,
         metadata_dir: Path | None,
+        *,
+        source_dir: Path | None = None,
+        progress: Progress | None = None,
     ) -> None:
         self.output_dir = output_dir
         self.config = config or {}
         self.metadata_dir = metadata_dir
-        self.meta = Metadata.from_path()
+        self.meta = Metadata.from_path(source_dir)
+        # called with the report of the build after each file is added
+        self.progress = progress
+        self.report: BuildReport | None = None
 
     def build(self) -> Path:
-        package = self.output_dir.joinpath(self.filename)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        package.unlink(missing_ok=True)
+        artifact, pending = self.start_build()
+        if pending is None:
+            return artifact
 
+        report = pending.report
+        package = self.prepare_output()
         with TemporaryDirectory() as temp_dir_name:
             temp_dir = Path(temp_dir_name).resolve()
-            files = chain(
-                self.package_files(temp_dir), self.non_package_files(temp_dir)
-            )
-            self.write_files(files, package, temp_dir)
+            with report.stage("collect"):
+                sources = self.sources(temp_dir)
+            with self.open_archive(package) as archive:
+                files = []
+                for source, base_dir in sources:
+                    with report.stage("read"):
+                        archive_file, data = self.load_file(
+                            source, base_dir, pending.fingerprint
+                        )
+                    with report.stage("write"):
+                        self.add_file(archive, archive_file, data)
+                    files.append(archive_file)
+                    report.add(archive_file.size)
+                    if self.progress is not None:
+                        self.progress(report)
+                with report.stage("metadata"):
+                    self.add_info_file(archive, temp_dir, files)
+
+        return self.finish_build(pending, package)
 
+    def start_build(self) -> tuple[Path, PendingBuild | None]:
+        """Return the artifact, and what is needed to build it, if anything.
+
+        Nothing is needed when the artifact is up to date, or was fetched from
+        the artifact cache. Otherwise, once the artifact is written, the build
+        is completed by `finish_build`.
+        """
+        started = time.perf_counter()
+        report = self.report = BuildReport(self.output_dir.joinpath(self.filename))
+        with report.stage("fingerprint"):
+            fingerprint = self.fingerprint()
+            report.skipped = fingerprint.is_current()
+        if report.skipped:
+            report.seconds = time.perf_counter() - started
+            return fingerprint.artifact, None
+
+        fingerprint.invalidate()
+        cache = get_artifact_cache(self.config) if self.cacheable else None
+        key = ""
+        if cache is not None:
+            key = fingerprint.content_digest(self.meta.base_dir)
+            with report.stage("cache"):
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                report.cache = (
+                    "hit" if cache.fetch(key, fingerprint.artifact) else "miss"
+                )
+            if report.cache == "hit":
+                fingerprint.record()
+                report.seconds = time.perf_counter() - started
+                return fingerprint.artifact, None
+
+        return fingerprint.artifact, PendingBuild(
+            report=report,
+            fingerprint=fingerprint,
+            cache=cache,
+            key=key,
+            started=started,
+        )
+
+    def finish_build(self, pending: PendingBuild, package: Path) -> Path:
+        """Cache the artifact that was written, and record its fingerprint."""
+        report = pending.report
+        if pending.cache is not None:
+            with report.stage("cache"):
+                pending.cache.insert(pending.key, package)
+        with report.stage("record"):
+            pending.fingerprint.record()
+        report.seconds = time.perf_counter() - pending.started
         return package
 
+    @property
+    def cacheable(self) -> bool:
+        """Whether the artifact only depends on the fingerprint of its sources."""
+        return True
+
+    def fingerprint(self) -> Fingerprint:
+        return Fingerprint(
+            self.output_dir.joinpath(self.filename),
+            self.fingerprint_inputs(),
+            self.input_files(),
+            get_digest_cache(self.config, self.meta.base_dir),
+        )
+
+    def fingerprint_inputs(self) -> dict[str, JsonType]:
+        metadata = "\n".join(self.get_metadata_content()).encode()
+        return {
+            "generator": __version__,
+            "builder": type(self).__name__,
+            # where artifacts and digests are cached does not change them
+            "config": {
+                key: value
+                for key, value in sorted(self.config.items())
+                if not key.startswith(("artifact-cache", "digest-cache"))
+            },
+            "metadata": hashlib.sha256(metadata).hexdigest(),
+        }
+
+    def input_files(self) -> Iterator[Path]:
+        """Yield the source files that the artifact is built from.
+
+        The generated files, such as the metadata, are covered by the other
+        fingerprint inputs.
+        """
+        base_dir = self.meta.base_dir
+        yield self.meta.pyproject
+        yield from get_license_files(base_dir)
+        if self.meta.readme.is_file():
+            yield self.meta.readme
+        for package in self.meta.package_paths:
+            for file in package.absolute_path.rglob("*"):
+                if file.is_file():
+                    yield file
+
+    def prepare_output(self) -> Path:
+        package = self.output_dir.joinpath(self.filename)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        package.unlink(missing_ok=True)
+        return package
+
+    def sources(self, temp_dir: Path) -> list[tuple[Path, Path]]:
+        return sorted(
+            chain(self.package_files(temp_dir), self.non_package_files(temp_dir))
+        )
+
+    def load_file(
+        self, source: Path, base_dir: Path, fingerprint: Fingerprint | None = None
+    ) -> tuple[ArchiveFile, bytes]:
+        data = source.read_bytes()
+        # the sources were hashed by the fingerprint, unless they changed since
+        stat = source.stat()
+        digest = fingerprint.known_digest(source, stat) if fingerprint else None
+        if digest is None:
+            digest = ArchiveFile.hash_data(data)
+        archive_file = ArchiveFile(
+            absolute_path=source,
+            base_dir=base_dir,
+            digest=digest,
+            size=len(data),
+            mode=stat.st_mode,
+            meta=self.meta,
+        )
+        return archive_file, data
+
     @property
     def filename(self) -> str:
         raise NotImplementedError
 
-    def package_files(self, temp_dir: Path) -> Iterator[ArchiveFile]:
+    def package_files(self, temp_dir: Path) -> Iterator[tuple[Path, Path]]:
         raise NotImplementedError
 
-    def non_package_files(self, temp_dir: Path) -> Iterator[ArchiveFile]:
+    def non_package_files(self, temp_dir: Path) -> Iterator[tuple[Path, Path]]:
         raise NotImplementedError
 
     def get_info_file(
@@ -57,8 +228,16 @@ class Builder:
     ) -> ArchiveFile:
         raise NotImplementedError
 
-    def write_files(
-        self, files: Iterable[ArchiveFile], package: Path, temp_dir: Path
+    def open_archive(self, package: Path) -> AbstractContextManager[ArchiveT]:
+        raise NotImplementedError
+
+    def add_file(
+        self, archive: ArchiveT, archive_file: ArchiveFile, data: bytes
+    ) -> None:
+        raise NotImplementedError
+
+    def add_info_file(
+        self, archive: ArchiveT, temp_dir: Path, files: Sequence[ArchiveFile]
     ) -> None:
         raise NotImplementedError
 
@@ -102,6 +281,9 @@ class Builder:
         for classifier in self.meta.classifiers:
             yield f"Classifier: {classifier}"
 
+        for extra in self.meta.extras:
+            yield f"Provides-Extra: {extra}"
+
         for requirement in self.meta.requirements:
             yield f"Requires-Dist: {requirement}"
 
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+import py_compile
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from importlib.machinery import SOURCE_SUFFIXES
+from py_compile import PycInvalidationMode
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+invalidation_modes = {
+    "true": PycInvalidationMode.UNCHECKED_HASH,
+    "unchecked-hash": PycInvalidationMode.UNCHECKED_HASH,
+    "checked-hash": PycInvalidationMode.CHECKED_HASH,
+}
+# below this many modules, starting worker processes costs more than it saves
+min_parallel_modules = 64
+
+
+def get_invalidation_mode(setting: str) -> PycInvalidationMode | None:
+    """Return how compiled modules are checked against their source, if at all.
+
+    Timestamps are not supported, as they would make the wheels irreproducible.
+    """
+    if setting == "false":
+        return None
+    try:
+        return invalidation_modes[setting]
+    except KeyError:
+        choices = ", ".join(["false", *invalidation_modes])
+        msg = f"Unknown compile-bytecode {setting!r}, expected one of {choices}"
+        raise ValueError(msg) from None
+
+
+def compile_modules(
+    files: Iterable[tuple[Path, Path]],
+    output_dir: Path,
+    invalidation_mode: PycInvalidationMode,
+) -> list[Path]:
+    """Compile the modules into `__pycache__` directories under `output_dir`.
+
+    Each module is given with the directory that its path in the wheel is
+    relative to, which is also the path that is recorded in its bytecode, so
+    that the bytecode does not depend on where the wheel is built.
+    """
+    jobs = []
+    for source, base_dir in files:
+        if source.suffix not in SOURCE_SUFFIXES:
+            continue
+        relative = source.relative_to(base_dir)
+        target = output_dir.joinpath(
+            relative.parent,
+            "__pycache__",
+            f"{source.stem}.{sys.implementation.cache_tag}.pyc",
+        )
+        jobs.append((source, relative.as_posix(), target, invalidation_mode))
+
+    workers = os.cpu_count() or 1
+    if len(jobs) < min_parallel_modules or workers == 1:
+        for job in jobs:
+            _compile(job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_compile, jobs, chunksize=16))
+    return [target for _, _, target, _ in jobs]
+
+
+def _compile(job: tuple[Path, str, Path, PycInvalidationMode]) -> None:
+    source, display_path, target, invalidation_mode = job
+    try:
+        py_compile.compile(
+            os.fspath(source),
+            cfile=os.fspath(target),
+            dfile=display_path,
+            doraise=True,
+            invalidation_mode=invalidation_mode,
+        )
+    except py_compile.PyCompileError as exc:
+        raise ValueError(exc.msg) from None
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import inspect
+from importlib.machinery import EXTENSION_SUFFIXES, SOURCE_SUFFIXES
+from typing import TYPE_CHECKING
+
+from phosphorus.construction import editable_finder
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+# the suffixes of importable files, in the order that the import system tries them
+module_suffixes = (*EXTENSION_SUFFIXES, *SOURCE_SUFFIXES)
+
+
+def module_index(
+    roots: Iterable[Path],
+) -> tuple[dict[str, str], dict[str, list[str]]]:
+    """Map the modules under the package roots to their files.
+
+    Namespace packages, which have no file, are mapped to their directories.
+    As with `sys.path`, the modules of the first roots shadow those of the
+    later ones, and packages shadow modules of the same name.
+    """
+    modules: dict[str, str] = {}
+    namespaces: dict[str, list[str]] = {}
+    for root in roots:
+        _index_directory(root, "", modules, namespaces)
+    # a module of a later root still shadows a namespace package
+    return modules, {
+        name: directories
+        for name, directories in namespaces.items()
+        if name not in modules
+    }
+
+
+def _index_directory(
+    directory: Path,
+    prefix: str,
+    modules: dict[str, str],
+    namespaces: dict[str, list[str]],
+) -> None:
+    entries = sorted(directory.iterdir())
+    for entry in entries:
+        if not entry.is_dir() or not entry.name.isidentifier():
+            continue
+        if entry.name == "__pycache__":
+            continue
+        name = f"{prefix}{entry.name}"
+        init = next(
+            (
+                init
+                for suffix in module_suffixes
+                if (init := entry.joinpath(f"__init__{suffix}")).is_file()
+            ),
+            None,
+        )
+        if init is not None:
+            modules.setdefault(name, str(init))
+        else:
+            namespaces.setdefault(name, []).append(str(entry))
+        _index_directory(entry, f"{name}.", modules, namespaces)
+
+    for suffix in module_suffixes:
+        for entry in entries:
+            if not entry.name.endswith(suffix):
+                continue
+            stem = entry.name.removesuffix(suffix)
+            if stem != "__init__" and stem.isidentifier() and entry.is_file():
+                modules.setdefault(f"{prefix}{stem}", str(entry))
+
+
+def finder_source(modules: dict[str, str], namespaces: dict[str, list[str]]) -> str:
+    """Return the source of the import finder, with the given module index."""
+    source = inspect.getsource(editable_finder)
+    source = source.replace(
+        "MODULES: dict[str, str] = {}", f"MODULES: dict[str, str] = {modules!r}", 1
+    )
+    return source.replace(
+        "NAMESPACES: dict[str, list[str]] = {}",
+        f"NAMESPACES: dict[str, list[str]] = {namespaces!r}",
+        1,
+    )
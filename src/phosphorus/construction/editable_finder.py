@@ -0,0 +1,91 @@
+"""Import the modules of an editable install from an index made at build time.
+
+This module is copied into editable wheels, with the index filled in, and is
+installed by a `.pth` file at interpreter startup. It must only use the
+standard library.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from importlib.machinery import ModuleSpec, PathFinder
+from importlib.util import spec_from_file_location
+from typing import TYPE_CHECKING, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from types import ModuleType
+
+# `os.path` is used rather than `pathlib`, which is slow to import at startup
+
+# the file of each module, and the directories of each namespace package
+MODULES: dict[str, str] = {}
+NAMESPACES: dict[str, list[str]] = {}
+
+# bumped when the attributes that installs share change
+finder_version = 1
+
+
+class EditableFinder:
+    """Find the modules of every editable install in a single lookup.
+
+    The finder is shared by all editable installs: the first install puts it
+    on `sys.meta_path`, ahead of the path finder, and the others merge their
+    index into it. Imports of other modules cost one failed lookup, and the
+    package roots are kept off `sys.path`.
+    """
+
+    __slots__ = ("modules", "namespaces")
+
+    phosphorus_editable_finder = finder_version
+
+    def __init__(self) -> None:
+        self.modules: dict[str, str] = {}
+        self.namespaces: dict[str, list[str]] = {}
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Sequence[str] | None = None,  # noqa: ARG002
+        target: ModuleType | None = None,  # noqa: ARG002
+    ) -> ModuleSpec | None:
+        location = self.modules.get(fullname)
+        if location is not None:
+            if not os.path.exists(location):  # noqa: PTH110
+                # removed since the install: let the other finders fail
+                return None
+            if not os.path.basename(location).startswith("__init__."):  # noqa: PTH119
+                return spec_from_file_location(fullname, location)
+            return spec_from_file_location(
+                fullname,
+                location,
+                submodule_search_locations=[os.path.dirname(location)],  # noqa: PTH120
+            )
+        if (directories := self.namespaces.get(fullname)) is not None:
+            spec = ModuleSpec(fullname, None, is_package=True)
+            spec.submodule_search_locations = directories
+            return spec
+        return None
+
+    def invalidate_caches(self) -> None:
+        pass
+
+
+def install() -> None:
+    for finder in sys.meta_path:
+        # the class differs in each copy of this module, so the finder of
+        # another install is recognised by its attribute
+        if getattr(finder, "phosphorus_editable_finder", None) == finder_version:
+            break
+    else:
+        finder = EditableFinder()
+        index = next(
+            (index for index, other in enumerate(sys.meta_path) if other is PathFinder),
+            len(sys.meta_path),
+        )
+        sys.meta_path.insert(index, finder)
+    shared = cast("EditableFinder", finder)
+    shared.modules.update(MODULES)
+    for name, directories in NAMESPACES.items():
+        shared.namespaces.setdefault(name, []).extend(directories)
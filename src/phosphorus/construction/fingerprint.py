@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from contextlib import suppress
+from stat import S_IMODE
+from typing import TYPE_CHECKING, cast
+
+from phosphorus.lib.zipped_file import ArchiveFile
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from pathlib import Path
+
+    from phosphorus.lib.digest_cache import DigestCache
+    from phosphorus.lib.type_defs import JsonType
+
+fingerprint_version = 2
+
+
+class Fingerprint:
+    """The inputs of a build, as recorded in a manifest next to its artifact.
+
+    The inputs are the digests of the source files, and anything else that
+    the artifact depends on, such as the resolved metadata and the build
+    settings. A source file is only hashed again when its size or mtime
+    differ from the manifest, or when it was modified after the previous build
+    started, so that an unchanged tree is checked from its stats alone. Files
+    missing from the manifest, such as in a new output directory, are looked
+    up in the digest cache of the project, if any.
+    """
+
+    __slots__ = (
+        "artifact",
+        "digests",
+        "inputs",
+        "manifest",
+        "modes",
+        "previous",
+        "started",
+        "stats",
+    )
+
+    def __init__(
+        self,
+        artifact: Path,
+        inputs: Mapping[str, JsonType],
+        files: Iterable[Path],
+        digest_cache: DigestCache | None = None,
+    ) -> None:
+        self.artifact = artifact
+        # hidden, so that `dist/*` globs, as used to upload artifacts, skip it
+        self.manifest = artifact.with_name(f".{artifact.name}.fingerprint.json")
+        self.started = time.time_ns()
+        self.previous = self._read()
+        self.inputs = {"version": fingerprint_version, **inputs}
+        self.stats: dict[str, list[int]] = {}
+        self.digests: dict[str, str] = {}
+        # a change of mode, which the archives keep, leaves the mtime as is
+        self.modes: dict[str, int] = {}
+        self._hash(files, digest_cache)
+
+    def is_current(self) -> bool:
+        """Whether the artifact exists, and was built from the same inputs."""
+        if self.previous is None:
+            return False
+        try:
+            stat = self.artifact.stat()
+        except OSError:
+            return False
+        current = (
+            self.previous.get("artifact") == [stat.st_size, stat.st_mtime_ns]
+            and self.previous.get("inputs") == self.inputs
+            and self.previous.get("digests") == self.digests
+            and self.previous.get("modes") == self.modes
+        )
+        if current and self.previous.get("stats") != self.stats:
+            # files were touched without changes: record their stats to skip
+            # hashing them again next time
+            self.record()
+        return current
+
+    def invalidate(self) -> None:
+        self.manifest.unlink(missing_ok=True)
+
+    def record(self) -> None:
+        stat = self.artifact.stat()
+        manifest = {
+            "artifact": [stat.st_size, stat.st_mtime_ns],
+            "started": self.started,
+            "inputs": self.inputs,
+            "stats": self.stats,
+            "digests": self.digests,
+            "modes": self.modes,
+        }
+        # a build that cannot record its fingerprint merely builds again
+        with suppress(OSError):
+            self.manifest.write_text(
+                json.dumps(manifest, separators=(",", ":")), encoding="utf-8"
+            )
+
+    def known_digest(self, file: Path, stat: os.stat_result) -> str | None:
+        """Return the digest of a source file, if it is unchanged since hashed.
+
+        A file modified after the fingerprint was started may have the stats
+        of the version that was hashed, so its digest is not known.
+        """
+        key = file.as_posix()
+        if self.stats.get(key) != [stat.st_size, stat.st_mtime_ns]:
+            return None
+        if stat.st_mtime_ns >= self.started:
+            return None
+        return self.digests.get(key)
+
+    def content_digest(self, base_dir: Path) -> str:
+        """Digest the inputs and the source files, wherever the sources are.
+
+        The files are listed by their path relative to `base_dir`, so that
+        copies of the same sources, in different places, have the same digest.
+        """
+        sha256 = hashlib.sha256(
+            json.dumps(self.inputs, sort_keys=True, separators=(",", ":")).encode()
+        )
+        files = sorted((os.path.relpath(key, base_dir), key) for key in self.digests)
+        for relative, key in files:
+            line = f"{relative}\0{self.modes[key]:o}\0{self.digests[key]}\n"
+            sha256.update(line.encode())
+        return sha256.hexdigest()
+
+    def _hash(self, files: Iterable[Path], digest_cache: DigestCache | None) -> None:
+        previous = self.previous or {}
+        stats = cast("dict[str, JsonType]", previous.get("stats", {}))
+        digests = cast("dict[str, JsonType]", previous.get("digests", {}))
+        started = cast("int", previous.get("started", 0))
+        for file in sorted(set(files)):
+            key = file.as_posix()
+            stat = file.stat()
+            self.stats[key] = [stat.st_size, stat.st_mtime_ns]
+            self.modes[key] = S_IMODE(stat.st_mode)
+            # a file modified while the previous build ran may have the same
+            # mtime as the version that was hashed
+            unchanged = stats.get(key) == self.stats[key] and stat.st_mtime_ns < started
+            digest = digests.get(key)
+            if unchanged and isinstance(digest, str):
+                self.digests[key] = digest
+            elif digest_cache is not None:
+                self.digests[key] = digest_cache.hash_file(file, stat)
+            else:
+                self.digests[key] = ArchiveFile.hash_file(file)
+        if digest_cache is not None:
+            digest_cache.save()
+
+    def _read(self) -> dict[str, JsonType] | None:
+        try:
+            with self.manifest.open(encoding="utf-8") as manifest_file:
+                manifest = cast("dict[str, JsonType]", json.load(manifest_file))
+        except (OSError, ValueError):
+            return None
+        return manifest if isinstance(manifest, dict) else None
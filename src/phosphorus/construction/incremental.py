@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import time
+import zlib
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING
+from zipfile import ZIP64_LIMIT, ZIP_DEFLATED, ZIP_FILECOUNT_LIMIT
+
+from phosphorus.lib.zipped_file import ArchiveFile
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from zipfile import ZipFile, ZipInfo
+
+
+@dataclass(frozen=True, slots=True)
+class Member:
+    size: int
+    mtime_ns: int
+    mode: int
+    digest: str
+    crc: int
+    compressed: bytes
+    # when the file was read, to detect writes within the same mtime tick
+    read_at: int
+
+
+class MemberCache:
+    """Keep the digests and deflated data of the files of a wheel between builds.
+
+    A file is read again only when its size or mtime changed, or when it was
+    modified after it was last read, so that a rebuild only hashes and
+    compresses the files that changed. A change of mode alone is recorded
+    without reading the file. The members that the latest build did not use
+    are dropped by `prune`.
+    """
+
+    __slots__ = ("_members", "_used")
+
+    def __init__(self) -> None:
+        self._members: dict[Path, Member] = {}
+        self._used: set[Path] = set()
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def load(self, source: Path) -> Member:
+        self._used.add(source)
+        stat = source.stat()
+        member = self._members.get(source)
+        if (
+            member is not None
+            and (member.size, member.mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+            and stat.st_mtime_ns < member.read_at
+        ):
+            if member.mode != stat.st_mode:
+                # a chmod leaves the mtime, and the data, as they were
+                member = self._members[source] = replace(member, mode=stat.st_mode)
+            return member
+
+        read_at = time.time_ns()
+        data = source.read_bytes()
+        member = self._members[source] = Member(
+            size=len(data),
+            mtime_ns=stat.st_mtime_ns,
+            mode=stat.st_mode,
+            digest=ArchiveFile.hash_data(data),
+            crc=zlib.crc32(data),
+            compressed=deflate(data),
+            read_at=read_at,
+        )
+        return member
+
+    def deflated(self, archive_file: ArchiveFile, data: bytes) -> tuple[int, bytes]:
+        """Return the checksum and deflated data of a file, compressing it if new."""
+        member = self._members.get(archive_file.absolute_path)
+        if member is not None and member.digest == archive_file.digest:
+            return member.crc, member.compressed
+        return zlib.crc32(data), deflate(data)
+
+    def prune(self) -> None:
+        if not self._used:
+            # nothing was built, say because the wheel was up to date
+            return
+        self._members = {
+            source: member
+            for source, member in self._members.items()
+            if source in self._used
+        }
+        self._used = set()
+
+
+def deflate(data: bytes) -> bytes:
+    # the same raw deflate stream that ZipFile writes with the default level
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def write_deflated(
+    archive: ZipFile, zip_info: ZipInfo, size: int, crc: int, compressed: bytes
+) -> None:
+    """Add data that is already deflated to a zip archive that is being written.
+
+    The member is byte for byte the one that `ZipFile.writestr` would write.
+    Splicing it in relies on the internals of `ZipFile`, so unless the archive
+    is plainly being written, and the member is one that `writestr` would
+    write without a warning, an error or zip64 extensions, the data is
+    inflated and written by `writestr` instead.
+    """
+    fp = archive.fp
+    if fp is None or not can_splice(archive, zip_info, size, fp.tell()):
+        data = zlib.decompress(compressed, -15)
+        archive.writestr(zip_info, data, compress_type=ZIP_DEFLATED)
+        return
+
+    zip_info.compress_type = ZIP_DEFLATED
+    zip_info.file_size = size
+    zip_info.compress_size = len(compressed)
+    zip_info.CRC = crc
+    zip_info.flag_bits = 0
+    zip_info.header_offset = fp.tell()
+    fp.write(zip_info.FileHeader(zip64=False))
+    fp.write(compressed)
+    archive.start_dir = fp.tell()
+    archive.filelist.append(zip_info)
+    archive.NameToInfo[zip_info.filename] = zip_info
+
+
+def can_splice(archive: ZipFile, zip_info: ZipInfo, size: int, offset: int) -> bool:
+    """Whether `write_deflated` can write the member as `writestr` would."""
+    return (
+        archive.mode == "w"
+        # the private state that `writestr` checks, where it is expected
+        and getattr(archive, "_writing", None) is False
+        and getattr(archive, "_seekable", None) is True
+        and offset == getattr(archive, "start_dir", None)
+        and isinstance(getattr(archive, "filelist", None), list)
+        and isinstance(getattr(archive, "NameToInfo", None), dict)
+        # which `writestr` warns about, or checks against the zip64 limits
+        and zip_info.filename not in archive.NameToInfo
+        and len(archive.filelist) < ZIP_FILECOUNT_LIMIT
+        and size * 1.05 <= ZIP64_LIMIT
+        and offset <= ZIP64_LIMIT
+    )
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from functools import partial
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from phosphorus.construction.base import ArchiveT
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from concurrent.futures import Executor
+
+    from phosphorus.construction.base import Builder, PendingBuild
+    from phosphorus.construction.fingerprint import Fingerprint
+    from phosphorus.lib.zipped_file import ArchiveFile
+
+T = TypeVar("T")
+
+default_max_in_flight_bytes = 64 * 2**20
+
+
+class ByteBudget:
+    """Limit the number of bytes that are held in memory at the same time.
+
+    Reservations are granted in the order they are requested, so that a
+    pipeline that consumes its results in order can never deadlock. A single
+    reservation larger than the whole budget is granted once nothing else is
+    in flight.
+    """
+
+    __slots__ = ("_condition", "_in_flight", "limit")
+
+    def __init__(self, limit: int) -> None:
+        if limit <= 0:
+            msg = "The byte budget must be positive"
+            raise ValueError(msg)
+        self.limit = limit
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self, size: int) -> int:
+        size = min(size, self.limit)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight + size <= self.limit)
+            self._in_flight += size
+        return size
+
+    async def release(self, size: int) -> None:
+        async with self._condition:
+            self._in_flight -= size
+            self._condition.notify_all()
+
+
+class AsyncBuild(Generic[ArchiveT]):
+    """Build an artifact without blocking the event loop.
+
+    The build runs in three pipelined stages: the files are read and hashed
+    concurrently in the executor, and each one is handed, in archive order, to
+    a single writer that compresses it into the artifact. The bytes that have
+    been read, but not yet written, never exceed `max_in_flight_bytes`.
+    Cancelling the awaiting task stops the pipeline and removes the
+    partially written artifact.
+    """
+
+    __slots__ = ("budget", "builder", "executor")
+
+    def __init__(
+        self,
+        builder: Builder[ArchiveT],
+        *,
+        executor: Executor | None = None,
+        max_in_flight_bytes: int = default_max_in_flight_bytes,
+    ) -> None:
+        self.builder = builder
+        self.executor = executor
+        self.budget = ByteBudget(max_in_flight_bytes)
+
+    async def run_in_executor(self, func: Callable[[], T]) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func)
+
+    async def build(self) -> Path:
+        # up to date and cached artifacts are skipped as in synchronous builds
+        artifact, pending = await self.run_in_executor(self.builder.start_build)
+        if pending is None:
+            return artifact
+
+        package = await self.run_in_executor(self.builder.prepare_output)
+        temp_dir = await self.run_in_executor(TemporaryDirectory)
+        try:
+            temp_path = await self.run_in_executor(Path(temp_dir.name).resolve)
+            await self.write_archive(package, temp_path, pending)
+        except BaseException:
+            await self.run_in_executor(partial(package.unlink, missing_ok=True))
+            raise
+        finally:
+            await self.run_in_executor(temp_dir.cleanup)
+
+        return await self.run_in_executor(
+            partial(self.builder.finish_build, pending, package)
+        )
+
+    async def write_archive(
+        self, package: Path, temp_dir: Path, pending: PendingBuild
+    ) -> None:
+        report = pending.report
+        sources = await self.run_in_executor(partial(self.builder.sources, temp_dir))
+        queue: asyncio.Queue[asyncio.Task[tuple[ArchiveFile, bytes, int]] | None]
+        queue = asyncio.Queue()
+        producer = asyncio.create_task(
+            self.schedule_loads(sources, queue, pending.fingerprint)
+        )
+        context = self.builder.open_archive(package)
+        archive = await self.run_in_executor(context.__enter__)
+        try:
+            files = []
+            while (load := await queue.get()) is not None:
+                archive_file, data, reserved = await load
+                await self.write_in_order(
+                    partial(self.builder.add_file, archive, archive_file, data)
+                )
+                await self.budget.release(reserved)
+                files.append(archive_file)
+                report.add(archive_file.size)
+            await self.write_in_order(
+                partial(self.builder.add_info_file, archive, temp_dir, files)
+            )
+        except BaseException:
+            producer.cancel()
+            while not queue.empty():
+                if (task := queue.get_nowait()) is not None:
+                    task.cancel()
+            await self.run_in_executor(partial(context.__exit__, None, None, None))
+            raise
+        await self.run_in_executor(partial(context.__exit__, None, None, None))
+
+    async def write_in_order(self, func: Callable[[], None]) -> None:
+        # the archive is not thread safe, so a cancelled build still has to
+        # wait for the current write, before the archive can be closed
+        write = asyncio.ensure_future(self.run_in_executor(func))
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            with suppress(Exception):
+                await write
+            raise
+
+    async def schedule_loads(
+        self,
+        sources: list[tuple[Path, Path]],
+        queue: asyncio.Queue[asyncio.Task[tuple[ArchiveFile, bytes, int]] | None],
+        fingerprint: Fingerprint | None = None,
+    ) -> None:
+        for source, base_dir in sources:
+            stat = await self.run_in_executor(source.stat)
+            reserved = await self.budget.acquire(stat.st_size)
+            load = self.load(source, base_dir, reserved, fingerprint)
+            queue.put_nowait(asyncio.create_task(load))
+        queue.put_nowait(None)
+
+    async def load(
+        self,
+        source: Path,
+        base_dir: Path,
+        reserved: int,
+        fingerprint: Fingerprint | None = None,
+    ) -> tuple[ArchiveFile, bytes, int]:
+        try:
+            archive_file, data = await self.run_in_executor(
+                partial(self.builder.load_file, source, base_dir, fingerprint)
+            )
+        except BaseException:
+            await self.budget.release(reserved)
+            raise
+        return archive_file, data, reserved
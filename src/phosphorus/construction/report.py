@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+    from phosphorus.lib.type_defs import JsonType
+
+    Progress = Callable[["BuildReport"], None]
+
+megabyte = 1_000_000
+
+
+@dataclass(slots=True)
+class BuildReport:
+    """What went into building an artifact, and how long each stage took.
+
+    A skipped build, of an artifact that was already up to date, only knows
+    the artifact itself: its files and their size are unknown. So does a build
+    that found its artifact in the artifact cache.
+    """
+
+    artifact: Path
+    skipped: bool = False
+    # whether the artifact cache had the artifact, when there is a cache
+    cache: Literal["hit", "miss"] | None = None
+    files: int = 0
+    # the total size of the files, before compression
+    size: int = 0
+    # the wall time of the whole build, and of each of its stages
+    seconds: float = 0.0
+    stages: dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (
+                time.perf_counter() - started
+            )
+
+    def add(self, size: int) -> None:
+        self.files += 1
+        self.size += size
+
+    def to_json(self) -> dict[str, JsonType]:
+        sha256 = hashlib.sha256()
+        with self.artifact.open("rb") as file:
+            while data := file.read(2**16):
+                sha256.update(data)
+        compressed_size = self.artifact.stat().st_size
+        archived = not self.skipped and self.cache != "hit"
+        built = archived and self.size > 0
+        return {
+            "filename": self.artifact.name,
+            "skipped": self.skipped,
+            "cache": self.cache,
+            "files": self.files if archived else None,
+            "uncompressed_bytes": self.size if archived else None,
+            "compressed_bytes": compressed_size,
+            "compression_ratio": (
+                round(compressed_size / self.size, 4) if built else None
+            ),
+            "seconds": round(self.seconds, 6),
+            "stages": {name: round(value, 6) for name, value in self.stages.items()},
+            "megabytes_per_second": (
+                round(self.size / megabyte / self.seconds, 3)
+                if built and self.seconds
+                else None
+            ),
+            "sha256": sha256.hexdigest(),
+        }
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import gzip
 import tarfile
+from contextlib import contextmanager
+from io import BytesIO
 from typing import TYPE_CHECKING
 
 from phosphorus.construction.base import Builder
@@ -9,43 +12,33 @@ from phosphorus.lib.licenses import get_license_files
 from phosphorus.lib.zipped_file import ArchiveFile
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator, Sequence
+    from collections.abc import Iterator, Sequence
     from pathlib import Path
 
 
-class SdistBuilder(Builder):
+class SdistBuilder(Builder[tarfile.TarFile]):
     __slots__ = ()
 
     @property
     def filename(self) -> str:
         return f"{self.base_name}.tar.gz"
 
-    def package_files(self, _temp_dir: Path) -> Iterator[ArchiveFile]:
+    def package_files(self, _temp_dir: Path) -> Iterator[tuple[Path, Path]]:
         base_dir = self.meta.base_dir
         for package in self.meta.package_paths:
             for file in package.absolute_path.rglob("*"):
                 if file.is_file():
-                    yield ArchiveFile.from_file(
-                        source=file, base_dir=base_dir, metadata=self.meta
-                    )
+                    yield file, base_dir
 
-    def non_package_files(self, _temp_dir: Path) -> Iterator[ArchiveFile]:
+    def non_package_files(self, _temp_dir: Path) -> Iterator[tuple[Path, Path]]:
         base_dir = self.meta.base_dir
-        yield ArchiveFile.from_file(
-            base_dir.joinpath(pyproject_base_name),
-            base_dir=base_dir,
-            metadata=self.meta,
-        )
+        yield base_dir.joinpath(pyproject_base_name), base_dir
 
         for license_file in get_license_files(base_dir):
-            yield ArchiveFile.from_file(
-                license_file, base_dir=base_dir, metadata=self.meta
-            )
+            yield license_file, base_dir
 
         if self.meta.readme.read_text():
-            yield ArchiveFile.from_file(
-                self.meta.readme, base_dir=base_dir, metadata=self.meta
-            )
+            yield self.meta.readme, base_dir
 
     def get_info_file(
         self, temp_dir: Path, _data: Sequence[tuple[Path, str, int]] = ()
@@ -58,14 +51,25 @@ class SdistBuilder(Builder):
             source=pkg_info, base_dir=temp_dir, metadata=self.meta
         )
 
-    def write_files(
-        self, files: Iterable[ArchiveFile], package: Path, temp_dir: Path
+    @contextmanager
+    def open_archive(self, package: Path) -> Iterator[tarfile.TarFile]:
+        # a fixed gzip timestamp keeps repeated builds byte for byte identical
+        with (
+            gzip.GzipFile(package, mode="wb", mtime=0) as gzip_file,
+            tarfile.open(fileobj=gzip_file, mode="w") as tar,
+        ):
+            yield tar
+
+    def add_file(
+        self, archive: tarfile.TarFile, archive_file: ArchiveFile, data: bytes
     ) -> None:
-        with tarfile.open(package, "w:gz") as tar:
-            for archive_file in sorted(files):
-                tar.addfile(
-                    archive_file.tar_info, archive_file.absolute_path.open("rb")
-                )
+        archive.addfile(archive_file.tar_info, BytesIO(data))
 
-            info_file = self.get_info_file(temp_dir)
-            tar.addfile(info_file.tar_info, info_file.absolute_path.open("rb"))
+    def add_info_file(
+        self,
+        archive: tarfile.TarFile,
+        temp_dir: Path,
+        _files: Sequence[ArchiveFile] = (),
+    ) -> None:
+        info_file = self.get_info_file(temp_dir)
+        self.add_file(archive, info_file, info_file.absolute_path.read_bytes())
@@ -2,22 +2,32 @@ from __future__ import annotations
 
 import csv
 import shutil
+import sys
 from pathlib import Path
 from typing import TYPE_CHECKING
 from zipfile import ZIP_DEFLATED, ZipFile
 
 from phosphorus.__version__ import __version__
 from phosphorus.construction.base import Builder
+from phosphorus.construction.bytecode import compile_modules, get_invalidation_mode
+from phosphorus.construction.editable import finder_source, module_index
+from phosphorus.construction.incremental import write_deflated
 from phosphorus.lib.licenses import get_license_files
 from phosphorus.lib.tags import Tag
 from phosphorus.lib.zipped_file import ArchiveFile
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator, Mapping, Sequence
+    from collections.abc import Iterator, Mapping, Sequence
+    from py_compile import PycInvalidationMode
 
+    from phosphorus.construction.fingerprint import Fingerprint
+    from phosphorus.construction.incremental import MemberCache
+    from phosphorus.construction.report import Progress
+    from phosphorus.lib.type_defs import JsonType
 
-class WheelBuilder(Builder):
-    __slots__ = ("editable",)
+
+class WheelBuilder(Builder[ZipFile]):
+    __slots__ = ("editable", "members")
 
     def __init__(
         self,
@@ -26,9 +36,39 @@ class WheelBuilder(Builder):
         metadata_dir: Path | None,
         *,
         editable: bool = False,
+        source_dir: Path | None = None,
+        members: MemberCache | None = None,
+        progress: Progress | None = None,
     ) -> None:
-        super().__init__(output_dir, config, metadata_dir)
+        super().__init__(
+            output_dir, config, metadata_dir, source_dir=source_dir, progress=progress
+        )
         self.editable = editable
+        self.members = members
+
+    def build(self) -> Path:
+        package = super().build()
+        if self.members is not None:
+            self.members.prune()
+        return package
+
+    def load_file(
+        self, source: Path, base_dir: Path, fingerprint: Fingerprint | None = None
+    ) -> tuple[ArchiveFile, bytes]:
+        # the generated metadata files are new to every build
+        if self.members is None or not source.is_relative_to(self.meta.base_dir):
+            return super().load_file(source, base_dir, fingerprint)
+        member = self.members.load(source)
+        archive_file = ArchiveFile(
+            absolute_path=source,
+            base_dir=base_dir,
+            digest=member.digest,
+            size=member.size,
+            mode=member.mode,
+            meta=self.meta,
+        )
+        # the data is only needed when it has to be deflated
+        return archive_file, b""
 
     @property
     def filename(self) -> str:
@@ -39,6 +79,27 @@ class WheelBuilder(Builder):
         )
         return self.wheel_filenames[tag]
 
+    def fingerprint_inputs(self) -> dict[str, JsonType]:
+        # the bytecode depends on the running interpreter
+        bytecode = self.bytecode_mode is not None and not self.editable
+        return {
+            **super().fingerprint_inputs(),
+            "editable": self.editable,
+            "bytecode": sys.implementation.cache_tag if bytecode else None,
+        }
+
+    @property
+    def cacheable(self) -> bool:
+        # editable wheels point to their sources, wherever they are
+        return not self.editable
+
+    @property
+    def bytecode_mode(self) -> PycInvalidationMode | None:
+        # compiled for the running interpreter, whose cache tag in the file
+        # names makes other interpreters ignore the bytecode
+        setting = self.config.get("compile-bytecode", self.meta.compile_bytecode)
+        return get_invalidation_mode(setting.lower())
+
     @property
     def dist_info(self) -> str:
         return f"{self.base_name}.dist-info"
@@ -47,27 +108,33 @@ class WheelBuilder(Builder):
     def wheel_filenames(self) -> dict[Tag, str]:
         return {tag: f"{self.base_name}-{tag}.whl" for tag in self.meta.tags}
 
-    def package_files(self, temp_dir: Path) -> Iterator[ArchiveFile]:
+    def package_files(self, temp_dir: Path) -> Iterator[tuple[Path, Path]]:
         if self.editable:
-            file = self.create_pth(temp_dir)
-            yield ArchiveFile.from_file(
-                source=file, base_dir=temp_dir, metadata=self.meta
-            )
+            yield from self.create_editable_files(temp_dir)
             return
 
-        for package in self.meta.package_paths:
-            for file in package.absolute_path.rglob("*"):
-                if file.is_file():
-                    yield ArchiveFile.from_file(
-                        source=file, base_dir=package.absolute_path, metadata=self.meta
-                    )
+        bytecode_mode = self.bytecode_mode
+        files = [
+            (file, package.absolute_path)
+            for package in self.meta.package_paths
+            for file in package.absolute_path.rglob("*")
+            if file.is_file()
+            # the bytecode of the source tree is replaced by the compiled one
+            and not (
+                bytecode_mode is not None
+                and "__pycache__" in file.relative_to(package.absolute_path).parts
+            )
+        ]
+        yield from files
+        if bytecode_mode is not None:
+            bytecode_dir = temp_dir.joinpath("bytecode")
+            for compiled in compile_modules(files, bytecode_dir, bytecode_mode):
+                yield compiled, bytecode_dir
 
-    def non_package_files(self, temp_dir: Path) -> Iterator[ArchiveFile]:
+    def non_package_files(self, temp_dir: Path) -> Iterator[tuple[Path, Path]]:
         for file in self.prepare_metadata(temp_dir).rglob("*"):
             if file.is_file():
-                yield ArchiveFile.from_file(
-                    source=file, base_dir=temp_dir, metadata=self.meta
-                )
+                yield file, temp_dir
 
     def get_info_file(
         self, temp_dir: Path, data: Sequence[tuple[Path, str, int]]
@@ -82,27 +149,29 @@ class WheelBuilder(Builder):
             source=info_file, base_dir=temp_dir, metadata=self.meta
         )
 
-    def write_files(
-        self, files: Iterable[ArchiveFile], package: Path, temp_dir: Path
+    def open_archive(self, package: Path) -> ZipFile:
+        return ZipFile(package, mode="w", compression=ZIP_DEFLATED)
+
+    def add_file(
+        self, archive: ZipFile, archive_file: ArchiveFile, data: bytes
     ) -> None:
-        with ZipFile(package, mode="w", compression=ZIP_DEFLATED) as zip_file:
-            rows = []
-            for archive_file in sorted(files):
-                zip_file.writestr(
-                    archive_file.zip_info,
-                    archive_file.absolute_path.read_bytes(),
-                    compress_type=ZIP_DEFLATED,
-                )
-                rows.append(
-                    (archive_file.relative_path, archive_file.digest, archive_file.size)
-                )
-
-            record_info = self.get_info_file(temp_dir, rows)
-            zip_file.writestr(
-                record_info.zip_info,
-                record_info.absolute_path.read_bytes(),
-                compress_type=ZIP_DEFLATED,
-            )
+        if self.members is None:
+            archive.writestr(archive_file.zip_info, data, compress_type=ZIP_DEFLATED)
+            return
+        crc, compressed = self.members.deflated(archive_file, data)
+        write_deflated(
+            archive, archive_file.zip_info, archive_file.size, crc, compressed
+        )
+
+    def add_info_file(
+        self, archive: ZipFile, temp_dir: Path, files: Sequence[ArchiveFile]
+    ) -> None:
+        rows = [
+            (archive_file.relative_path, archive_file.digest, archive_file.size)
+            for archive_file in files
+        ]
+        record_info = self.get_info_file(temp_dir, rows)
+        self.add_file(archive, record_info, record_info.absolute_path.read_bytes())
 
     @property
     def record_target(self) -> Path:
@@ -111,6 +180,16 @@ class WheelBuilder(Builder):
     def is_pure_lib(self) -> bool:
         return all(tag.abi is None for tag in self.meta.tags)
 
+    def create_editable_files(self, tmp_dir: Path) -> Iterator[tuple[Path, Path]]:
+        editable_mode = self.config.get("editable-mode", "path")
+        if editable_mode == "path":
+            yield self.create_pth(tmp_dir), tmp_dir
+        elif editable_mode == "finder":
+            yield from self.create_finder(tmp_dir)
+        else:
+            msg = f"Unknown editable-mode {editable_mode!r}, expected path or finder"
+            raise ValueError(msg)
+
     def create_pth(self, tmp_dir: Path) -> Path:
         paths = {
             package.absolute_path.as_posix() for package in self.meta.package_paths
@@ -119,6 +198,26 @@ class WheelBuilder(Builder):
         pth.write_text("\n".join(sorted(paths)))
         return pth
 
+    def create_finder(self, tmp_dir: Path) -> Iterator[tuple[Path, Path]]:
+        """Create an import finder of the package modules, and its `.pth` loader.
+
+        The package roots are kept off `sys.path`, so that the imports of
+        other modules do not search them. The modules are indexed when the
+        wheel is built: new top level modules need the package reinstalled,
+        while new submodules are found through their package.
+        """
+        module_name = f"__editable___{self.meta.package.distribution_name}_finder"
+        modules, namespaces = module_index(
+            package.absolute_path for package in self.meta.package_paths
+        )
+        finder = tmp_dir.joinpath(f"{module_name}.py")
+        finder.write_text(finder_source(modules, namespaces))
+        yield finder, tmp_dir
+
+        pth = tmp_dir.joinpath(f"{self.meta.package.name}.pth")
+        pth.write_text(f"import {module_name}; {module_name}.install()\n")
+        yield pth, tmp_dir
+
     def prepare_metadata(self, temp_dir: Path | None = None) -> Path:
         base = temp_dir or self.metadata_dir
         if base is None:
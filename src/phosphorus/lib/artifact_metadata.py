@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import os
+import struct
+import tarfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import getaddresses
+from typing import TYPE_CHECKING, BinaryIO
+from zipfile import ZipFile
+
+from phosphorus.lib.cache import named_cache
+from phosphorus.lib.contributors import Contributor
+from phosphorus.lib.packages import Package
+from phosphorus.lib.requirements import Requirement
+from phosphorus.lib.versions import SpecifierSet, Version
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from concurrent.futures import Executor
+    from pathlib import Path
+
+    from typing_extensions import Self  # upgrade: py3.10: import from typing
+
+    from phosphorus.lib.cache import ParseCache
+
+artifact_suffixes = (".whl", ".tar.gz", ".zip")
+
+# the zip records that are read to find a single member, without the variable
+# length names, extra fields and comments that follow them
+_end_of_central_directory = struct.Struct("<4s4H2LH")
+_central_directory_entry = struct.Struct("<4s6H3L5H2L")
+_local_file_header = struct.Struct("<4s5H3L2H")
+_end_of_central_directory_signature = b"PK\x05\x06"
+_central_directory_signature = b"PK\x01\x02"
+_local_file_header_signature = b"PK\x03\x04"
+# the sizes and offsets that are stored in the zip64 extra field instead
+_zip64_marker = 0xFFFFFFFF
+_stored = 0
+_deflated = 8
+
+_artifact_metadata: ParseCache[tuple[Path, int, int], ArtifactMetadata] = named_cache(
+    "ArtifactMetadata.from_path"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ArtifactMetadata:
+    package: Package
+    version: Version
+    requirements: tuple[Requirement, ...]
+    python: SpecifierSet
+    extras: tuple[str, ...] = ()
+    summary: str = ""
+    authors: tuple[Contributor, ...] = ()
+    maintainers: tuple[Contributor, ...] = ()
+
+    @classmethod
+    def from_string(cls, metadata: str) -> Self:
+        headers = parse_headers(metadata)
+        return cls(
+            package=Package(name=_header(headers, "name")),
+            version=Version.from_string(_header(headers, "version")),
+            requirements=tuple(
+                Requirement.from_string(requirement)
+                for requirement in headers.get("requires-dist", [])
+            ),
+            python=SpecifierSet.from_string(
+                ",".join(headers.get("requires-python", []))
+            ),
+            extras=tuple(headers.get("provides-extra", [])),
+            summary=" ".join(headers.get("summary", [])),
+            authors=parse_contributors(
+                headers.get("author", []), headers.get("author-email", [])
+            ),
+            maintainers=parse_contributors(
+                headers.get("maintainer", []), headers.get("maintainer-email", [])
+            ),
+        )
+
+    @classmethod
+    def from_path(cls, path: Path) -> ArtifactMetadata:
+        """Read the metadata of an artifact, once per size and mtime of the file."""
+        stat = path.stat()
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        return _artifact_metadata.get(
+            key, lambda: cls.from_string(read_metadata_text(path))
+        )
+
+
+def read_directory(
+    directory: Path, *, executor: Executor | None = None
+) -> dict[Path, ArtifactMetadata]:
+    """Read the metadata of every wheel and sdist in a directory, concurrently.
+
+    The artifacts are read in a thread pool unless an executor is given.
+    """
+    paths = sorted(
+        directory.joinpath(entry.name)
+        for entry in os.scandir(directory)
+        if entry.name.endswith(artifact_suffixes) and entry.is_file()
+    )
+    if executor is not None:
+        return dict(
+            zip(paths, executor.map(ArtifactMetadata.from_path, paths), strict=True)
+        )
+    with ThreadPoolExecutor() as pool:
+        return dict(
+            zip(paths, pool.map(ArtifactMetadata.from_path, paths), strict=True)
+        )
+
+
+def parse_headers(metadata: str) -> dict[str, list[str]]:
+    """Parse the RFC 822 style headers of a METADATA or PKG-INFO file.
+
+    The header names are lower-cased, and the body, after the first blank line,
+    is ignored.
+    """
+    headers: dict[str, list[str]] = {}
+    values: list[str] | None = None
+    for line in metadata.splitlines():
+        if not line:
+            break
+        if line[0] in " \t" and values:
+            values[-1] += f"\n{line.strip()}"
+            continue
+        name, _, value = line.partition(":")
+        values = headers.setdefault(name.strip().lower(), [])
+        values.append(value.strip())
+    return headers
+
+
+def parse_contributors(
+    names: Iterable[str], emails: Iterable[str]
+) -> tuple[Contributor, ...]:
+    """Pair the `Author` and `Author-email` headers back into contributors.
+
+    The names of the email addresses are kept, and the names that have no
+    address are added after them.
+    """
+    contributors = [
+        Contributor(name=name, email=email) for name, email in getaddresses(emails)
+    ]
+    named = {contributor.name for contributor in contributors}
+    contributors.extend(
+        Contributor(name=name.strip(), email="")
+        for header in names
+        for name in header.split(",")
+        if name.strip() and name.strip() not in named
+    )
+    return tuple(contributors)
+
+
+def read_metadata_text(path: Path) -> str:
+    """Read the metadata of a wheel, or the PKG-INFO of an sdist.
+
+    Only the member that holds the metadata is decompressed: zip archives are
+    read from their central directory, and gzipped tarballs are decompressed
+    up to the end of their PKG-INFO.
+    """
+    if path.name.endswith(".whl"):
+        return _read_zip_member(path, ".dist-info/METADATA")
+    if path.name.endswith(".zip"):
+        return _read_zip_member(path, "/PKG-INFO")
+
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            if (
+                member.name.count("/") == 1
+                and member.name.endswith("/PKG-INFO")
+                and (contents := archive.extractfile(member))
+            ):
+                return contents.read().decode()
+    msg = f"{path.name} has no PKG-INFO"
+    raise RuntimeError(msg)
+
+
+def _header(headers: dict[str, list[str]], name: str) -> str:
+    try:
+        return headers[name][0]
+    except KeyError:
+        msg = f"The metadata has no {name.title()} header"
+        raise ValueError(msg) from None
+
+
+def _read_zip_member(path: Path, suffix: str) -> str:
+    with path.open("rb") as file:
+        contents = _read_from_central_directory(file, suffix.encode())
+    if contents is None:
+        # zip64, prefixed and otherwise unusual archives are left to zipfile
+        contents = _read_with_zipfile(path, suffix)
+    return contents.decode()
+
+
+def _read_from_central_directory(file: BinaryIO, suffix: bytes) -> bytes | None:
+    size = file.seek(0, os.SEEK_END)
+    # the end record is followed by a comment of at most 64 KiB
+    tail_size = min(size, _end_of_central_directory.size + 0xFFFF)
+    file.seek(size - tail_size)
+    tail = file.read()
+    end = tail.rfind(_end_of_central_directory_signature)
+    if end < 0 or end + _end_of_central_directory.size > len(tail):
+        return None
+    *_, directory_size, directory_offset, _ = _end_of_central_directory.unpack_from(
+        tail, end
+    )
+    if _zip64_marker in {directory_size, directory_offset}:
+        return None
+
+    file.seek(directory_offset)
+    directory = file.read(directory_size)
+    offset = _find_entry(directory, suffix)
+    if offset is None:
+        return None
+    entry = _central_directory_entry.unpack_from(directory, offset)
+    flags, method, compressed_size, header_offset = *entry[3:5], entry[8], entry[-1]
+    encrypted = flags & 1
+    if encrypted or method not in {_stored, _deflated}:
+        return None
+    if _zip64_marker in {compressed_size, header_offset}:
+        return None
+    return _read_local_file(file, header_offset, method, compressed_size)
+
+
+def _find_entry(directory: bytes, suffix: bytes) -> int | None:
+    """Find the entry of the top level member whose name ends with the suffix.
+
+    Rather than walking every entry, the names are searched for the suffix from
+    the end, where wheels keep their metadata, and the entry before each match
+    is checked to really end its name there.
+    """
+    name_end = len(directory)
+    while (found := directory.rfind(suffix, 0, name_end)) >= 0:
+        name_end = found + len(suffix)
+        offset = directory.rfind(_central_directory_signature, 0, found)
+        name_start = offset + _central_directory_entry.size
+        if offset >= 0 and name_start <= found:
+            name_length = _central_directory_entry.unpack_from(directory, offset)[10]
+            if (
+                name_start + name_length == name_end
+                and directory.count(b"/", name_start, name_end) == 1
+            ):
+                return offset
+        name_end -= 1
+    return None
+
+
+def _read_local_file(
+    file: BinaryIO, header_offset: int, method: int, compressed_size: int
+) -> bytes | None:
+    file.seek(header_offset)
+    header = file.read(_local_file_header.size)
+    if len(header) < _local_file_header.size:
+        return None
+    signature, *_, name_length, extra_length = _local_file_header.unpack(header)
+    if signature != _local_file_header_signature:
+        return None
+    file.seek(name_length + extra_length, os.SEEK_CUR)
+    data = file.read(compressed_size)
+    if method == _stored:
+        return data
+    return zlib.decompress(data, -zlib.MAX_WBITS)
+
+
+def _read_with_zipfile(path: Path, suffix: str) -> bytes:
+    with ZipFile(path) as archive:
+        for name in archive.namelist():
+            if name.count("/") == 1 and name.endswith(suffix):
+                return archive.read(name)
+    msg = f"{path.name} has no {suffix.lstrip('/').rpartition('/')[-1]}"
+    raise RuntimeError(msg)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from typing import TYPE_CHECKING, Generic, NamedTuple, Protocol, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+K = TypeVar("K", bound="Hashable")
+V = TypeVar("V")
+C = TypeVar("C")
+
+parse_cache_size = 2**16
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ParseCache(Generic[K, V]):
+    """A bounded, thread safe, least recently used cache.
+
+    Values are interned: when two threads race to create the value for the
+    same key, both of them get back the instance that was stored first.
+    """
+
+    __slots__ = ("_entries", "_lock", "hits", "maxsize", "misses")
+
+    def __init__(self, maxsize: int = parse_cache_size) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: K, factory: Callable[[], V]) -> V:
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        created = factory()
+        with self._lock:
+            value = self._entries.setdefault(key, created)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                maxsize=self.maxsize,
+                currsize=len(self._entries),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class _Statistics(Protocol):
+    def info(self) -> CacheInfo: ...
+    def clear(self) -> None: ...
+
+
+_parse_caches: dict[str, _Statistics] = {}
+
+
+def named_cache(name: str) -> ParseCache[K, V]:
+    cache: ParseCache[K, V] = ParseCache()
+    _parse_caches[name] = cache
+    return cache
+
+
+def cached_parser(func: Callable[[C, str], V]) -> Callable[[C, str], V]:
+    cache: ParseCache[tuple[object, str], V] = named_cache(func.__qualname__)
+
+    @wraps(func)
+    def wrapper(owner: C, string: str) -> V:
+        return cache.get((owner, string), lambda: func(owner, string))
+
+    return wrapper
+
+
+def parse_cache_info() -> dict[str, CacheInfo]:
+    return {name: cache.info() for name, cache in _parse_caches.items()}
+
+
+def clear_parse_caches() -> None:
+    for cache in _parse_caches.values():
+        cache.clear()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import sys
-from argparse import ArgumentParser, BooleanOptionalAction, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, BooleanOptionalAction, Namespace
 
 from phosphorus.__version__ import __version__
 
@@ -48,9 +48,62 @@ def parse_args() -> Namespace:
         default=True,
         help="build the wheel distribution",
     )
+    build_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="rebuild the distributions whenever their source files change",
+    )
+    build_parser.add_argument(
+        "--report",
+        choices=["json"],
+        help="print a report of each build, with its sizes and timings, "
+        "on the standard output",
+    )
+    build_parser.add_argument(
+        "--progress",
+        action=BooleanOptionalAction,
+        default=True,
+        help="show the files and bytes built so far, on terminals",
+    )
+
+    resolve_parser = subparsers.add_parser(
+        "resolve",
+        parents=[parent_parser],
+        help="resolve the requirements of the package against a local wheelhouse",
+    )
+    resolve_parser.add_argument(
+        "requirements",
+        nargs="*",
+        help="requirements to resolve along with those of the package",
+    )
+    resolve_parser.add_argument(
+        "--wheelhouse",
+        required=True,
+        help="the directory of wheels and sdists to resolve against",
+    )
+    resolve_parser.add_argument(
+        "--python-version",
+        type=python_version,
+        help="the X.Y python version to resolve for, instead of the running one",
+    )
+    resolve_parser.add_argument(
+        "--platform",
+        action="append",
+        dest="platforms",
+        help="a platform tag to resolve for, from the most preferred, "
+        "instead of the running platform",
+    )
 
     args = parser.parse_args()
     if args.verbosity > 0:
         sys.tracebacklimit = 1000
 
     return args
+
+
+def python_version(value: str) -> tuple[int, int]:
+    major, _, minor = value.partition(".")
+    if not (major.isdigit() and minor.isdigit()):
+        msg = f"expected a python version such as 3.12, not {value!r}"
+        raise ArgumentTypeError(msg)
+    return int(major), int(minor)
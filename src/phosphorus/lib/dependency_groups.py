@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from phosphorus.lib.exceptions import (
+    DependencyGroupCycleError,
+    ImproperlyConfiguredProjectError,
+)
+from phosphorus.lib.requirements import Requirement
+from phosphorus.lib.utils import canonicalise_name
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from phosphorus.lib.type_defs import DependencyGroupMember
+
+
+class DependencyGroups:
+    """Expand dependency groups, and the groups that they include, once.
+
+    The include graph is resolved in topological order from the groups that
+    are asked for, so that groups that are never needed, such as those of
+    development tools in a build, are not parsed, and cannot fail it. Each
+    group is parsed once, however many groups include it, and is expanded
+    into the ordered names of the groups that it reaches. The requirements of
+    a group are only gathered from these names when they are first needed.
+    Group names are compared in their canonical form, so the same engine
+    also serves the extras of `optional-dependencies`.
+    """
+
+    __slots__ = ("_closures", "_expanded", "_members", "_requirements")
+
+    def __init__(self, groups: Mapping[str, Sequence[DependencyGroupMember]]) -> None:
+        self._members = {
+            canonicalise_name(name): group for name, group in groups.items()
+        }
+        self._requirements: dict[str, tuple[Requirement, ...]] = {}
+        self._closures: dict[str, tuple[str, ...]] = {}
+        self._expanded: dict[str, tuple[Requirement, ...]] = {}
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(self._members)
+
+    def requirements(self, *groups: str) -> tuple[Requirement, ...]:
+        """Return the requirements of the groups, in order and without duplicates."""
+        names: dict[str, None] = {}
+        for group in groups:
+            names.update(dict.fromkeys(self._closure(group)))
+        return self._gather(names)
+
+    def __getitem__(self, group: str) -> tuple[Requirement, ...]:
+        name = canonicalise_name(group)
+        if name not in self._expanded:
+            self._expanded[name] = self._gather(self._closure(name))
+        return self._expanded[name]
+
+    def __contains__(self, group: str) -> bool:
+        return canonicalise_name(group) in self._members
+
+    def _closure(self, group: str) -> tuple[str, ...]:
+        name = canonicalise_name(group)
+        if name not in self._members:
+            raise ImproperlyConfiguredProjectError(group)
+        return self._resolve(name, ())
+
+    def _gather(self, names: Iterable[str]) -> tuple[Requirement, ...]:
+        requirements: dict[Requirement, None] = {}
+        for name in names:
+            requirements.update(dict.fromkeys(self._requirements[name]))
+        return tuple(requirements)
+
+    def _resolve(self, name: str, path: tuple[str, ...]) -> tuple[str, ...]:
+        if name in self._closures:
+            return self._closures[name]
+        if name in path:
+            raise DependencyGroupCycleError((*path[path.index(name) :], name))
+        if name not in self._members:
+            key = f"dependency-groups.{name}"
+            raise ImproperlyConfiguredProjectError(key)
+
+        requirements = []
+        closure = {name: None}
+        for member in self._members[name]:
+            if isinstance(member, str):
+                requirements.append(Requirement.from_string(member))
+            else:
+                included = canonicalise_name(member["include-group"])
+                closure.update(dict.fromkeys(self._resolve(included, (*path, name))))
+        self._requirements[name] = tuple(requirements)
+        closure_names = self._closures[name] = tuple(closure)
+        return closure_names
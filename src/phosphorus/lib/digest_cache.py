@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import time
+import uuid
+from base64 import urlsafe_b64decode
+from contextlib import suppress
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, NamedTuple
+
+from phosphorus.lib.zipped_file import ArchiveFile
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+cache_dir_variable = "PHOSPHORUS_DIGEST_CACHE"
+digest_cache_version = 1
+# magic, version and number of entries
+header_format = struct.Struct("<4sBI")
+# inode, size, mtime, path length and digest, followed by the path
+entry_format = struct.Struct("<QQqH32s")
+magic = b"PHDC"
+# a file modified this soon before it is hashed may be modified again without
+# a change of mtime, given filesystem clocks that are coarse, or lag behind
+racy_seconds = 2
+
+_caches: dict[Path, DigestCache] = {}
+_caches_lock = Lock()
+
+
+class Entry(NamedTuple):
+    inode: int
+    size: int
+    mtime_ns: int
+    digest: bytes
+
+
+class DigestCache:
+    """The sha256 digests of files, by their stat data, kept between builds.
+
+    As with the index of git, a file whose path, inode, size and mtime are
+    unchanged is not read again. Only files whose mtime was safely in the past
+    when they were hashed are cached: a file modified within the same tick of
+    the filesystem clock could be modified again without a change of its stat
+    data, which would leave a stale digest in place.
+    """
+
+    __slots__ = ("_entries", "_lock", "_used", "dirty", "hits", "misses", "path")
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self._entries = read_entries(path)
+        self._used: set[bytes] = set()
+        self._lock = Lock()
+
+    def hash_file(self, file: Path, stat: os.stat_result | None = None) -> str:
+        """Return the digest of the file, as `ArchiveFile.hash_file` does."""
+        if stat is None:
+            stat = file.stat()
+        key = os.fsencode(file.absolute())
+        with self._lock:
+            self._used.add(key)
+            entry = self._entries.get(key)
+            if entry is not None and entry[:3] == (
+                stat.st_ino,
+                stat.st_size,
+                stat.st_mtime_ns,
+            ):
+                self.hits += 1
+                return ArchiveFile.format_digest(entry.digest)
+            self.misses += 1
+
+        started = time.time_ns()
+        digest = ArchiveFile.hash_file(file)
+        racy = stat.st_mtime_ns >= started - racy_seconds * 10**9
+        with self._lock:
+            if not racy:
+                raw = urlsafe_b64decode(f"{digest.removeprefix('sha256=')}=")
+                self._entries[key] = Entry(
+                    stat.st_ino, stat.st_size, stat.st_mtime_ns, raw
+                )
+                self.dirty = True
+            elif self._entries.pop(key, None) is not None:
+                self.dirty = True
+        return digest
+
+    def save(self) -> None:
+        """Write the cache, if it changed, without the files that were removed.
+
+        The cache is replaced whole, by renaming a temporary file, so that
+        concurrent builds read either version. A cache that cannot be written
+        is not an error: the files are merely hashed again.
+        """
+        with self._lock:
+            if not self.dirty:
+                return
+            entries = {
+                key: entry
+                for key, entry in self._entries.items()
+                if key in self._used or os.path.exists(key)  # noqa: PTH110
+            }
+            self._entries = entries
+            self.dirty = False
+
+        temporary = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with temporary.open("xb") as file:
+                file.write(pack_entries(entries))
+                file.flush()
+                os.fsync(file.fileno())
+            temporary.replace(self.path)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+
+
+def pack_entries(entries: dict[bytes, Entry]) -> bytes:
+    data = [header_format.pack(magic, digest_cache_version, len(entries))]
+    for key, entry in entries.items():
+        data.append(entry_format.pack(*entry[:3], len(key), entry.digest))
+        data.append(key)
+    return b"".join(data)
+
+
+def read_entries(path: Path) -> dict[bytes, Entry]:
+    """Read the entries of a cache file, or none if it is missing or invalid."""
+    entries: dict[bytes, Entry] = {}
+    with suppress(OSError, struct.error):
+        data = path.read_bytes()
+        file_magic, version, count = header_format.unpack_from(data)
+        if file_magic != magic or version != digest_cache_version:
+            return entries
+        offset = header_format.size
+        for _ in range(count):
+            inode, size, mtime_ns, length, digest = entry_format.unpack_from(
+                data, offset
+            )
+            offset += entry_format.size
+            key = data[offset : offset + length]
+            offset += length
+            entries[key] = Entry(inode, size, mtime_ns, digest)
+        if offset == len(data):
+            return entries
+    # a truncated, or otherwise corrupt, cache is started again
+    return {}
+
+
+def get_digest_cache(config: Mapping[str, str], base_dir: Path) -> DigestCache | None:
+    """Return the digest cache of the project, of the settings or environment.
+
+    There is none unless a directory is set, so that builds never write
+    outside of their output directory by default. Builds of the same project,
+    in the same process, share the same instance.
+    """
+    directory = config.get("digest-cache", os.environ.get(cache_dir_variable))
+    if not directory:
+        return None
+    project = os.fsencode(base_dir.resolve())
+    name = f"{hashlib.sha256(project).hexdigest()[:32]}.bin"
+    path = Path(directory, name).absolute()
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = DigestCache(path)
+        return _caches[path]
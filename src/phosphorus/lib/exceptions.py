@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 from phosphorus.lib.constants import pyproject_base_name
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     from pathlib import Path
 
 
@@ -43,3 +44,28 @@ class PythonSubprocessError(RuntimeError):
             f"code when run with `{python_binary}`"
         )
         super().__init__(msg)
+
+
+class DependencyGroupCycleError(RuntimeError):
+    """A dependency group includes itself, directly or through other groups."""
+
+    def __init__(self, path: Sequence[str]) -> None:
+        cycle = " -> ".join(path)
+        msg = f"The dependency group {path[0]} includes itself: {cycle}"
+        super().__init__(msg)
+
+
+class RequirementsFileError(ValueError):
+    """A line of a requirements file is invalid, or not supported."""
+
+    def __init__(self, path: Path, line_number: int, reason: str) -> None:
+        msg = f"{path}, line {line_number}: {reason}"
+        super().__init__(msg)
+
+
+class ResolutionImpossibleError(RuntimeError):
+    """No combination of the available artifacts satisfies the requirements."""
+
+    def __init__(self, name: str) -> None:
+        msg = f"No version of {name} satisfies the requirements"
+        super().__init__(msg)
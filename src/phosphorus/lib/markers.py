@@ -1,47 +1,155 @@
 from __future__ import annotations
 
-import ast
-from contextlib import contextmanager
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, Union, cast
-
+import operator
+import os
+import platform
+import sys
+from dataclasses import dataclass, field
+from functools import cache, partial, reduce
+from threading import Lock
+from types import MappingProxyType
+from typing import TYPE_CHECKING, TypeVar, cast
+from weakref import WeakValueDictionary
+
+from phosphorus.lib.cache import cached_parser, named_cache
 from phosphorus.lib.constants import (
     BooleanOperator,
     ComparisonOperator,
     MarkerVariable,
     TokenRule,
 )
+from phosphorus.lib.regex import marker_token_pattern
 from phosphorus.lib.utils import canonicalise_name
+from phosphorus.lib.versions import SpecifierSet, Version, VersionClause, VersionSet
 
 if TYPE_CHECKING:
-    import re
-    from collections.abc import Iterator
+    from collections.abc import Callable, Iterable, Mapping
+
+    from phosphorus.lib.cache import ParseCache
+
+    _Evaluator = Callable[["Mapping[str, str]", str], bool]
+
+MarkerT = TypeVar("MarkerT", bound="Marker | MarkerAtom")
 
-_MarkerList = list[Union["MarkerAtom", BooleanOperator, "_MarkerList"]]
+
+@cache
+def default_environment() -> Mapping[str, str]:
+    """Read the marker environment of the running interpreter, once per process."""
+    implementation_version = sys.implementation.version
+    full_version = ".".join(str(part) for part in implementation_version[:3])
+    if implementation_version.releaselevel != "final":
+        full_version += (
+            f"{implementation_version.releaselevel[0]}{implementation_version.serial}"
+        )
+    return MappingProxyType(
+        {
+            "implementation_name": sys.implementation.name,
+            "implementation_version": full_version,
+            "os_name": os.name,
+            "platform_machine": platform.machine(),
+            "platform_release": platform.release(),
+            "platform_system": platform.system(),
+            "platform_version": platform.version(),
+            "python_full_version": platform.python_version(),
+            "platform_python_implementation": platform.python_implementation(),
+            "python_version": ".".join(platform.python_version_tuple()[:2]),
+            "sys_platform": sys.platform,
+        }
+    )
+
+
+class _WeakReferable:
+    # upgrade: py3.11: use `dataclass(weakref_slot=True)` instead
+    __slots__ = ("__weakref__",)
 
 
 @dataclass(frozen=True, slots=True)
-class MarkerAtom:
+class MarkerAtom(_WeakReferable):
     variable: MarkerVariable
     operator: ComparisonOperator
     value: str
+    # the value is written before the variable, e.g. `'arm' in platform_machine`
+    value_first: bool = False
+    evaluator: _Evaluator = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "evaluator", _compile_atom(self))
 
     def __str__(self) -> str:
+        if self.value_first:
+            return f"'{self.value}' {self.operator} {self.variable}"
         return f"{self.variable} {self.operator} '{self.value}'"
 
 
 @dataclass(frozen=True, slots=True)
-class Marker:
+class Marker(_WeakReferable):
     boolean: BooleanOperator | None
     markers: tuple[Marker | MarkerAtom, ...]
+    evaluator: _Evaluator = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "evaluator", _compile_marker(self))
 
     @classmethod
+    @cached_parser
     def from_string(cls, marker_string: str) -> Marker:
         return MarkerParser(marker_string).parse()
 
+    def __lt__(self, other: Marker) -> bool:
+        return str(self) < str(other)
+
     def __bool__(self) -> bool:
         return bool(self.markers)
 
+    def canonical(self) -> Marker:
+        """Return the shared instance of the canonical form of the marker.
+
+        Markers that only differ by nesting of the same boolean operator, by
+        the order or repetition of operands, or by redundant parentheses have
+        the same canonical form, so their canonical markers are identical.
+        """
+        return _canonical_markers.get(self, partial(_canonical_marker, self))
+
+    def evaluate(
+        self,
+        environment: Mapping[str, str] | None = None,
+        *,
+        extras: Iterable[str] = (),
+    ) -> bool:
+        """Whether the marker holds in the environment, for any of the extras.
+
+        The given environment is laid over the default environment. Like pip,
+        the marker is evaluated once for each extra, or once with an empty
+        `extra` variable.
+        """
+        default = default_environment()
+        full_environment = (
+            default if environment is None else {**default, **environment}
+        )
+        requested = {canonicalise_name(extra) for extra in extras}
+        if not requested:
+            return self.evaluator(full_environment, "")
+        return any(self.evaluator(full_environment, extra) for extra in requested)
+
+    def partial_evaluate(
+        self,
+        environment: Mapping[str, str] | None = None,
+        *,
+        python: SpecifierSet | None = None,
+    ) -> Marker | bool:
+        """Substitute the known variables, and fold the marker as far as possible.
+
+        The environment holds the variables whose value is known, which may
+        include `extra`. When the python version is known to lie within
+        `python`, the comparisons of python_version and python_full_version
+        fold as well. The residual marker is flattened: a sub-marker that uses
+        the same boolean operator as its parent is merged into it.
+        """
+        residual = _fold(self, environment or {}, python)
+        if isinstance(residual, MarkerAtom):
+            return Marker(boolean=None, markers=(residual,))
+        return residual
+
     def __str__(self) -> str:
         if not self.markers:
             return ""
@@ -56,106 +164,148 @@ class Marker:
         )
 
 
+class EnvironmentMatrix:
+    """Evaluate markers against many environments at once.
+
+    Each marker evaluates to a bitset, whose bit `i` is set when the marker
+    holds in `environments[i]`. A marker atom is evaluated once for every
+    distinct value of its variable, rather than once for every environment,
+    and its bitset is cached. An environment may set `extra`, like the
+    environments of packaging, to evaluate the markers for an extra.
+    """
+
+    __slots__ = ("_atoms", "_values", "all_environments", "environments")
+
+    def __init__(self, environments: Iterable[Mapping[str, str]]) -> None:
+        default = default_environment()
+        self.environments = tuple({**default, **env} for env in environments)
+        self.all_environments = (1 << len(self.environments)) - 1
+        self._values: dict[str, dict[str, int]] = {}
+        for index, environment in enumerate(self.environments):
+            # the extra is canonicalised, as are the extras of `Marker.evaluate`
+            extra = canonicalise_name(environment.get("extra", ""))
+            for variable, value in {**environment, "extra": extra}.items():
+                values = self._values.setdefault(variable, {})
+                values[value] = values.get(value, 0) | 1 << index
+        self._atoms: dict[MarkerAtom, int] = {}
+
+    def evaluate(self, marker: Marker | MarkerAtom) -> int:
+        if isinstance(marker, MarkerAtom):
+            return self.evaluate_atom(marker)
+        if not marker.markers:
+            return self.all_environments
+
+        bitsets = (self.evaluate(sub_marker) for sub_marker in marker.markers)
+        if marker.boolean == BooleanOperator.OR:
+            return reduce(operator.or_, bitsets)
+        return reduce(operator.and_, bitsets)
+
+    def evaluate_many(self, markers: Iterable[Marker]) -> dict[Marker, int]:
+        return {marker: self.evaluate(marker) for marker in markers}
+
+    def evaluate_atom(self, atom: MarkerAtom) -> int:
+        if (bitset := self._atoms.get(atom)) is not None:
+            return bitset
+
+        variable = atom.variable.value
+        bitset = 0
+        for value, environments in self._values[variable].items():
+            if atom.variable == MarkerVariable.EXTRA:
+                holds = atom.evaluator({}, value)
+            else:
+                holds = atom.evaluator({variable: value}, "")
+            if holds:
+                bitset |= environments
+        self._atoms[atom] = bitset
+        return bitset
+
+    def select(self, bitset: int) -> tuple[Mapping[str, str], ...]:
+        return tuple(
+            environment
+            for index, environment in enumerate(self.environments)
+            if bitset >> index & 1
+        )
+
+
 @dataclass(frozen=True, slots=True)
 class Token:
-    name: re.Pattern[str]
+    rule: TokenRule
     text: str
     position: int
 
 
+def tokenize(marker_string: str, start: int = 0) -> list[Token]:
+    tokens = []
+    for match in marker_token_pattern.finditer(marker_string, start):
+        name = cast("str", match.lastgroup)
+        if name == "UNEXPECTED":
+            msg = f"Unexpected character at position {match.start()}"
+            raise ValueError(msg)
+        if name != "WHITESPACE":
+            tokens.append(Token(TokenRule[name], match[0], match.start()))
+    return tokens
+
+
 class MarkerParser:
-    def __init__(self, marker_string: str) -> None:
+    """Parse a marker by precedence climbing, where `and` binds tighter than `or`.
+
+    The marker may start after `start`, e.g. in a requirement, in which case the
+    positions in errors are relative to the whole string.
+    """
+
+    def __init__(self, marker_string: str, start: int = 0) -> None:
         self.string = marker_string
-        self.next_token: Token | None = None
-        self.position = 0
+        self.tokens = tokenize(marker_string, start)
+        self.index = 0
 
     def parse(self) -> Marker:
-        if not self.string:
+        if not self.tokens:
             return Marker(boolean=None, markers=())
 
-        marker = self.to_dict(self.parse_marker())
+        marker = self.parse_marker()
+        if self.index < len(self.tokens):
+            token = self.tokens[self.index]
+            msg = f"Unexpected {token.text!r} at position {token.position}"
+            raise ValueError(msg)
         if isinstance(marker, MarkerAtom):
             return Marker(boolean=None, markers=(marker,))
         return marker
 
-    @classmethod
-    def to_dict(cls, parsed_marker: _MarkerList | MarkerAtom) -> Marker | MarkerAtom:
-        if isinstance(parsed_marker, MarkerAtom):
-            return parsed_marker
-
-        if len(parsed_marker) == 1:
-            return cls.to_dict(cast("MarkerAtom", parsed_marker[0]))
+    def parse_marker(self, min_precedence: int = 0) -> Marker | MarkerAtom:
+        marker = self.parse_marker_atom()
+        while (boolean := self.peek_boolean()) and (
+            _precedence[boolean] >= min_precedence
+        ):
+            markers = [marker]
+            while self.peek_boolean() == boolean:
+                self.index += 1
+                markers.append(self.parse_marker(_precedence[boolean] + 1))
+            marker = Marker(boolean=boolean, markers=tuple(markers))
+        return marker
 
-        operators = {
-            operator for index, operator in enumerate(parsed_marker) if index % 2
-        }
-        if len(operators) == 1:
-            return Marker(
-                boolean=cast("BooleanOperator", parsed_marker[1]),
-                markers=tuple(
-                    cls.to_dict(cast("_MarkerList | MarkerAtom", sub_marker))
-                    for index, sub_marker in enumerate(parsed_marker)
-                    if not index % 2
-                ),
+    def parse_marker_atom(self) -> Marker | MarkerAtom:
+        token = self.peek()
+        if token is None or token.rule != TokenRule.LEFT_PARENTHESIS:
+            return self.parse_marker_item()
+
+        self.index += 1
+        marker = self.parse_marker()
+        if self.peek_rule() != TokenRule.RIGHT_PARENTHESIS:
+            msg = (
+                f"Expected matching {TokenRule.RIGHT_PARENTHESIS} for "
+                f"{TokenRule.LEFT_PARENTHESIS} at position {token.position}"
             )
-
-        grouped_markers = cls.group_boolean_operators(parsed_marker)
-        return cls.to_dict(grouped_markers)
-
-    @staticmethod
-    def group_boolean_operators(ungrouped: _MarkerList) -> _MarkerList:
-        output: _MarkerList = []
-        tmp: _MarkerList = []
-        for i in range(len(ungrouped) // 2):
-            op = ungrouped[2 * i + 1]
-            if op == BooleanOperator.OR and tmp:
-                tmp.append(ungrouped[2 * i])
-                output.extend([tmp, BooleanOperator.OR])
-                tmp = []
-            elif op == BooleanOperator.OR:
-                output.extend([ungrouped[2 * i], BooleanOperator.OR])
-            else:
-                tmp.extend([ungrouped[2 * i], BooleanOperator.AND])
-        if tmp:
-            tmp.append(ungrouped[-1])
-            output.append(tmp)
-        else:
-            output.append(ungrouped[-1])
-        return output
-
-    def parse_marker(self) -> _MarkerList:
-        expression: _MarkerList = [self.parse_marker_atom()]
-        while self.check(TokenRule.BOOLEAN_OPERATOR):
-            token = self.read()
-            expr_right = self.parse_marker_atom()
-            expression.extend([BooleanOperator(token.text), expr_right])
-        return expression
-
-    def parse_marker_atom(self) -> _MarkerList | MarkerAtom:
-        marker: _MarkerList | MarkerAtom
-        self.consume(TokenRule.WHITESPACE)
-        if self.check(TokenRule.LEFT_PARENTHESIS, prepare_token=False):
-            with self.enclosing_tokens(
-                TokenRule.LEFT_PARENTHESIS, TokenRule.RIGHT_PARENTHESIS
-            ):
-                self.consume(TokenRule.WHITESPACE)
-                marker = self.parse_marker()
-                self.consume(TokenRule.WHITESPACE)
-        else:
-            marker = self.parse_marker_item()
-        self.consume(TokenRule.WHITESPACE)
+            raise RuntimeError(msg)
+        self.index += 1
         return marker
 
     def parse_marker_item(self) -> MarkerAtom:
-        self.consume(TokenRule.WHITESPACE)
         marker_left = self.parse_marker_var_or_str()
-        self.consume(TokenRule.WHITESPACE)
         marker_op = self.parse_marker_op()
-        self.consume(TokenRule.WHITESPACE)
         marker_right = self.parse_marker_var_or_str()
-        self.consume(TokenRule.WHITESPACE)
 
-        if isinstance(marker_right, MarkerVariable):
+        value_first = isinstance(marker_right, MarkerVariable)
+        if value_first:
             marker_left, marker_right = marker_right, marker_left
         if not (
             isinstance(marker_left, MarkerVariable) and isinstance(marker_right, str)
@@ -165,73 +315,353 @@ class MarkerParser:
 
         if marker_left == MarkerVariable.EXTRA:
             marker_right = canonicalise_name(marker_right)
-        return MarkerAtom(variable=marker_left, operator=marker_op, value=marker_right)
+        return MarkerAtom(
+            variable=marker_left,
+            operator=marker_op,
+            value=marker_right,
+            value_first=value_first,
+        )
 
     def parse_marker_op(self) -> ComparisonOperator:
-        if self.check(TokenRule.IN):
-            self.read()
-            return ComparisonOperator.IN
-        if self.check(TokenRule.NOT_IN):
-            self.read()
-            return ComparisonOperator.NOT_IN
-        if self.check(TokenRule.OPERATOR):
-            return ComparisonOperator(self.read().text)
-        msg = "Expected a marker operator."
+        token = self.peek()
+        if token is not None and token.rule in _operator_rules:
+            self.index += 1
+            return ComparisonOperator(_operator_rules[token.rule] or token.text)
+        msg = f"Expected a marker operator at position {self.position}"
         raise ValueError(msg)
 
     def parse_marker_var_or_str(self) -> MarkerVariable | str:
-        if self.check(TokenRule.VARIABLE):
-            return MarkerVariable(self.read().text.replace(".", "_"))
-        if self.check(TokenRule.QUOTED_STRING):
-            return str(ast.literal_eval(self.read().text))
-        msg = "Expected a marker variable"
+        token = self.peek()
+        if token is not None and token.rule == TokenRule.VARIABLE:
+            self.index += 1
+            name = token.text.replace(".", "_")
+            return MarkerVariable(_variable_aliases.get(name, name))
+        if token is not None and token.rule == TokenRule.QUOTED_STRING:
+            self.index += 1
+            return token.text[1:-1]
+        msg = f"Expected a marker variable or a string at position {self.position}"
         raise ValueError(msg)
 
-    def consume(self, name: TokenRule) -> None:
-        if self.check(name):
-            self.read()
-
-    def check(self, rule: TokenRule, *, prepare_token: bool = True) -> bool:
-        expression = rule.value
-
-        match = expression.match(self.string, self.position)
-        if match is None:
-            return False
-
-        if prepare_token:
-            self.next_token = Token(expression, match[0], self.position)
+    @property
+    def position(self) -> int:
+        if self.index < len(self.tokens):
+            return self.tokens[self.index].position
+        return len(self.string)
+
+    def peek(self) -> Token | None:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def peek_rule(self) -> TokenRule | None:
+        token = self.peek()
+        return token.rule if token else None
+
+    def peek_boolean(self) -> BooleanOperator | None:
+        token = self.peek()
+        if token is None or token.rule != TokenRule.BOOLEAN_OPERATOR:
+            return None
+        return BooleanOperator(token.text)
+
+
+_precedence = {BooleanOperator.OR: 1, BooleanOperator.AND: 2}
+_operator_rules = {
+    TokenRule.OPERATOR: None,
+    TokenRule.IN: ComparisonOperator.IN.value,
+    TokenRule.NOT_IN: ComparisonOperator.NOT_IN.value,
+}
+_variable_aliases = {
+    "python_implementation": MarkerVariable.PLATFORM_PYTHON_IMPLEMENTATION.value
+}
+
+
+def _is_in(left: str, right: str) -> bool:
+    return left in right
+
+
+def _is_not_in(left: str, right: str) -> bool:
+    return left not in right
+
+
+# values that are not both versions are compared as python compares strings
+_string_operators: dict[ComparisonOperator, Callable[[str, str], bool]] = {
+    ComparisonOperator.IN: _is_in,
+    ComparisonOperator.NOT_IN: _is_not_in,
+    ComparisonOperator.EQUAL_TO: operator.eq,
+    ComparisonOperator.NOT_EQUAL: operator.ne,
+    ComparisonOperator.LESS_OR_EQUAL: operator.le,
+    ComparisonOperator.GREATER_OR_EQUAL: operator.ge,
+    ComparisonOperator.LESS_THAN: operator.lt,
+    ComparisonOperator.GREATER_THAN: operator.gt,
+}
+
+
+def _compile_marker(marker: Marker) -> _Evaluator:
+    evaluators = tuple(sub_marker.evaluator for sub_marker in marker.markers)
+    if not evaluators:
+        return _always
+    if len(evaluators) == 1:
+        return evaluators[0]
+    if marker.boolean == BooleanOperator.OR:
+        return partial(_any, evaluators)
+    return partial(_all, evaluators)
+
+
+def _compile_atom(atom: MarkerAtom) -> _Evaluator:
+    compare = _string_operators.get(atom.operator)
+    if atom.variable == MarkerVariable.EXTRA:
+        if compare is None:
+            return partial(_undefined, atom)
+        return partial(
+            _compare_extra, compare, atom.value, value_first=atom.value_first
+        )
 
+    # as in PEP 508, values are compared as versions when both of them are
+    # versions, and as strings otherwise
+    if atom.value_first:
+        return partial(_compare_to_environment, atom)
+    clause = _version_clause(atom.operator, atom.value)
+    if clause is not None:
+        return partial(_match_version, atom, clause, compare)
+    if compare is None:
+        return partial(_undefined, atom)
+    return partial(_compare_strings, atom.variable.value, compare, atom.value)
+
+
+# maps markers to their canonical form, which may be evicted and computed again
+_canonical_markers: ParseCache[Marker, Marker] = named_cache("Marker.canonical")
+# the shared instances of canonical markers, by their fields, so that equal
+# canonical markers stay identical for as long as any of them is in use, even
+# once the parse caches are cleared, while unused ones are dropped
+_interned: WeakValueDictionary[tuple[object, ...], Marker | MarkerAtom]
+_interned = WeakValueDictionary()
+_interned_lock = Lock()
+
+
+def _intern(marker: MarkerT) -> MarkerT:
+    # the key must not refer to the marker, which would then never be dropped
+    key: tuple[object, ...]
+    if isinstance(marker, MarkerAtom):
+        key = (marker.variable, marker.operator, marker.value, marker.value_first)
+    else:
+        key = (marker.boolean, marker.markers)
+    with _interned_lock:
+        return cast("MarkerT", _interned.setdefault(key, marker))
+
+
+def _canonical_marker(marker: Marker) -> Marker:
+    canonical = _canonicalise(marker)
+    if isinstance(canonical, Marker):
+        return canonical
+    if marker.boolean is None and marker.markers == (canonical,):
+        return _intern(marker)
+    return _intern(Marker(boolean=None, markers=(canonical,)))
+
+
+def _canonicalise(marker: Marker | MarkerAtom) -> Marker | MarkerAtom:
+    if isinstance(marker, MarkerAtom):
+        return _intern(marker)
+    if not marker.markers:
+        return _intern(marker)
+
+    operands: dict[Marker | MarkerAtom, None] = {}
+    for sub_marker in marker.markers:
+        operand = _canonicalise(sub_marker)
+        if isinstance(operand, Marker) and operand.boolean == marker.boolean:
+            operands.update(dict.fromkeys(operand.markers))
+        else:
+            operands[operand] = None
+    if len(operands) == 1:
+        return next(iter(operands))
+    ordered = tuple(sorted(operands, key=str))
+    if ordered != marker.markers:
+        marker = Marker(boolean=marker.boolean, markers=ordered)
+    return _intern(marker)
+
+
+def _fold(
+    marker: Marker | MarkerAtom,
+    environment: Mapping[str, str],
+    python: SpecifierSet | None,
+) -> Marker | MarkerAtom | bool:
+    if isinstance(marker, MarkerAtom):
+        return _fold_atom(marker, environment, python)
+    if not marker.markers:
         return True
 
-    def read(self) -> Token:
-        token = self.next_token
-
-        if token is None:
-            msg = "No token to read"
-            raise RuntimeError(msg)
-
-        self.position += len(token.text)
-        self.next_token = None
+    boolean = marker.boolean or BooleanOperator.AND
+    # the constant that decides the whole marker: true for `or`, false for `and`
+    decisive = boolean == BooleanOperator.OR
+    residuals: dict[Marker | MarkerAtom, None] = {}
+    for sub_marker in marker.markers:
+        residual = _fold(sub_marker, environment, python)
+        if isinstance(residual, bool):
+            if residual == decisive:
+                return decisive
+        elif isinstance(residual, Marker) and residual.boolean in {boolean, None}:
+            residuals.update(dict.fromkeys(residual.markers))
+        else:
+            residuals[residual] = None
+
+    if not residuals:
+        return not decisive
+    if len(residuals) == 1:
+        return next(iter(residuals))
+    return Marker(boolean=boolean, markers=tuple(residuals))
+
+
+def _fold_atom(
+    atom: MarkerAtom, environment: Mapping[str, str], python: SpecifierSet | None
+) -> MarkerAtom | bool:
+    variable = atom.variable.value
+    if variable in environment:
+        if atom.variable == MarkerVariable.EXTRA:
+            return atom.evaluator({}, canonicalise_name(environment[variable]))
+        return atom.evaluator({variable: environment[variable]}, "")
+
+    versions = _python_versions(atom) if python is not None else None
+    if python is None or versions is None:
+        return atom
+    if python.version_set.issubset(versions):
+        return True
+    if python.version_set.intersection(versions).is_empty():
+        return False
+    return atom
+
+
+def _python_versions(atom: MarkerAtom) -> VersionSet | None:
+    # the python_full_version values for which the atom holds, if they are known
+    if atom.value_first:
+        return None
+    if atom.variable == MarkerVariable.PYTHON_FULL_VERSION:
+        clause = _version_clause(atom.operator, atom.value)
+        return SpecifierSet((clause,)).version_set if clause else None
+    if atom.variable != MarkerVariable.PYTHON_VERSION:
+        return None
+
+    version = Version.from_string(atom.value)
+    if not (
+        version.pep_440_compliant
+        and version.is_base_version
+        and not version.prefix_match
+        and not version.epoch.epoch
+        and len(version.release.full_release) == 2  # noqa: PLR2004
+    ):
+        return None
+    # python_version is `major.minor`, which python_full_version extends
+    major, minor = version.release.full_release
+    following = f"{major}.{minor + 1}"
+    specifiers = {
+        ComparisonOperator.EQUAL_TO: f"=={major}.{minor}.*",
+        ComparisonOperator.NOT_EQUAL: f"!={major}.{minor}.*",
+        ComparisonOperator.LESS_THAN: f"<{major}.{minor}",
+        ComparisonOperator.LESS_OR_EQUAL: f"<{following}",
+        ComparisonOperator.GREATER_THAN: f">={following}.dev0",
+        ComparisonOperator.GREATER_OR_EQUAL: f">={major}.{minor}.dev0",
+        ComparisonOperator.COMPATIBLE_WITH: f">={major}.{minor}.dev0,=={major}.*",
+    }
+    if atom.operator not in specifiers:
+        return None
+    return SpecifierSet.from_string(specifiers[atom.operator]).version_set
+
+
+def _version_clause(
+    comparison: ComparisonOperator, version: str
+) -> VersionClause | None:
+    if comparison in ComparisonOperator.env_marker_operator():
+        return None
+    try:
+        return VersionClause(
+            operator=comparison, identifier=Version.from_string(version)
+        )
+    except RuntimeError:
+        return None
 
-        return token
 
-    @contextmanager
-    def enclosing_tokens(
-        self, open_token: TokenRule, close_token: TokenRule
-    ) -> Iterator[None]:
-        if self.check(open_token):
-            open_position = self.position
-            self.read()
-        else:
-            open_position = None
+def _always(environment: Mapping[str, str], extra: str) -> bool:  # noqa: ARG001
+    return True
 
-        yield
 
-        if open_position is None:
-            return
+def _any(
+    evaluators: tuple[_Evaluator, ...], environment: Mapping[str, str], extra: str
+) -> bool:
+    # plain loops, the generator expressions of any and all dominate the cost
+    for evaluator in evaluators:  # noqa: SIM110
+        if evaluator(environment, extra):
+            return True
+    return False
 
-        if not self.check(close_token):
-            msg = f"Expected matching {close_token} for {open_token}"
-            raise RuntimeError(msg)
 
-        self.read()
+def _all(
+    evaluators: tuple[_Evaluator, ...], environment: Mapping[str, str], extra: str
+) -> bool:
+    for evaluator in evaluators:  # noqa: SIM110
+        if not evaluator(environment, extra):
+            return False
+    return True
+
+
+def _compare_extra(
+    compare: Callable[[str, str], bool],
+    value: str,
+    environment: Mapping[str, str],  # noqa: ARG001
+    extra: str,
+    *,
+    value_first: bool,
+) -> bool:
+    return compare(value, extra) if value_first else compare(extra, value)
+
+
+def _match_version(
+    atom: MarkerAtom,
+    clause: VersionClause,
+    compare: Callable[[str, str], bool] | None,
+    environment: Mapping[str, str],
+    extra: str,
+) -> bool:
+    value = environment[atom.variable.value]
+    version = Version.from_string(value)
+    if _is_version(version) or atom.operator == ComparisonOperator.EXACT_MATCH:
+        return clause.match(version)
+    if compare is None:
+        return _undefined(atom, environment, extra)
+    return compare(value, atom.value)
+
+
+def _compare_strings(
+    variable: str,
+    compare: Callable[[str, str], bool],
+    value: str,
+    environment: Mapping[str, str],
+    extra: str,  # noqa: ARG001
+) -> bool:
+    return compare(environment[variable], value)
+
+
+def _compare_to_environment(
+    atom: MarkerAtom,
+    environment: Mapping[str, str],
+    extra: str,
+) -> bool:
+    # the value of the variable is the right hand side of the comparison
+    value = environment[atom.variable.value]
+    clause = _version_clause(atom.operator, value)
+    if clause is not None:
+        candidate = Version.from_string(atom.value)
+        if _is_version(candidate) or atom.operator == ComparisonOperator.EXACT_MATCH:
+            return clause.match(candidate)
+    if atom.operator in _string_operators:
+        return _string_operators[atom.operator](atom.value, value)
+    return _undefined(atom, environment, extra)
+
+
+def _is_version(version: Version) -> bool:
+    # a prefix, such as `3.*`, is not a version
+    return version.pep_440_compliant and not version.prefix_match
+
+
+def _undefined(
+    atom: MarkerAtom,
+    environment: Mapping[str, str],  # noqa: ARG001
+    extra: str,  # noqa: ARG001
+) -> bool:
+    msg = f"Cannot evaluate `{atom}`: {atom.operator} is undefined for its values"
+    raise ValueError(msg)
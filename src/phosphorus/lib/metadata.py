@@ -17,12 +17,13 @@ from phosphorus.lib.constants import (
     pyproject_base_name,
 )
 from phosphorus.lib.contributors import Contributor
+from phosphorus.lib.dependency_groups import DependencyGroups
 from phosphorus.lib.exceptions import (
     ImproperlyConfiguredProjectError,
     MissingProjectRootError,
 )
 from phosphorus.lib.packages import Package
-from phosphorus.lib.requirements import Requirement
+from phosphorus.lib.requirements import merge_requirements
 from phosphorus.lib.tags import Tag
 from phosphorus.lib.type_defs import (
     Author,
@@ -32,13 +33,16 @@ from phosphorus.lib.type_defs import (
     MetadataSettings,
     PyProjectSettings,
 )
-from phosphorus.lib.versions import Version, VersionClause
+from phosphorus.lib.utils import canonicalise_name
+from phosphorus.lib.versions import SpecifierSet, Version, VersionClause
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator, Sequence
+    from collections.abc import Iterable, Mapping, Sequence
 
     from typing_extensions import Self  # upgrade: py3.10: import from typing
 
+    from phosphorus.lib.requirements import Requirement
+
 
 T = TypeVar("T", bound=Comparable)
 
@@ -93,6 +97,8 @@ class Metadata:
     base_dir: Path
     package: Package
     version: Version
+    # the file that the version is read from, if it is dynamic
+    version_file: Path | None
     summary: str
     homepage: str
     license: str
@@ -104,9 +110,12 @@ class Metadata:
     python: tuple[VersionClause, ...]
     classifiers: tuple[str, ...]
     requirements: tuple[Requirement, ...]
+    extras: tuple[str, ...]
     scripts: tuple[Script, ...]
     project_urls: tuple[ProjectURL, ...]
     package_paths: tuple[LocalPackage, ...]
+    # whether, and how, wheels include the bytecode of their modules
+    compile_bytecode: str
 
     @classmethod
     def from_path(cls, path: Path | None = None) -> Self:
@@ -119,7 +128,8 @@ class Metadata:
         return cls(
             base_dir=settings_path.parent,
             package=get_package(settings),
-            version=get_version(settings),
+            version=get_version(settings, settings_path.parent),
+            version_file=get_version_file(settings, settings_path.parent),
             summary=settings.get("description", ""),
             homepage=urls.get("homepage", ""),
             license=get_license(settings),
@@ -128,13 +138,14 @@ class Metadata:
             tags=(Tag(interpreter="py3", abi=None, platform="any"),),
             authors=get_contributors(settings.get("authors", [])),
             maintainers=get_contributors(settings.get("maintainers", [])),
-            python=keep_unique(
-                VersionClause.from_string(clause) for clause in python.split(",")
-            ),
+            python=SpecifierSet.from_string(python).simplify().clauses,
             classifiers=get_classifiers(settings.get("classifiers", [])),
             requirements=get_requirements(
-                settings.get("dependencies", []), settings.get("dependency_groups", {})
+                settings.get("dependencies", []),
+                settings.get("dependency_groups", {}),
+                settings.get("optional-dependencies", {}),
             ),
+            extras=get_extras(settings.get("optional-dependencies", {})),
             project_urls=keep_unique(
                 ProjectURL(name=name, url=url)
                 for name, url in urls.items()
@@ -145,6 +156,7 @@ class Metadata:
                 for command, entrypoint in settings.get("scripts", {}).items()
             ),
             package_paths=get_package_paths(settings, settings_path.parent),
+            compile_bytecode=str(settings["compile_bytecode"]).lower(),
         )
 
     @property
@@ -189,6 +201,7 @@ def get_settings(settings_path: Path) -> MetadataSettings:
     phosphorus_settings = all_settings.get("tool", {}).get("phosphorus", {})
     settings["dynamic_definitions"] = phosphorus_settings.get("dynamic", {})
     settings["included_packages"] = phosphorus_settings.get("packages", {})
+    settings["compile_bytecode"] = phosphorus_settings.get("compile-bytecode", False)
     return settings
 
 
@@ -196,7 +209,7 @@ def get_package(settings: MetadataSettings) -> Package:
     return Package(name=settings["name"])
 
 
-def get_version(settings: MetadataSettings) -> Version:
+def get_version(settings: MetadataSettings, base_dir: Path) -> Version:
     version_key = "version"
     version = cast("str", settings.get(version_key))
     if version:
@@ -205,7 +218,7 @@ def get_version(settings: MetadataSettings) -> Version:
         version_file = settings["dynamic_definitions"][version_key]["file"]
     except KeyError as exc:
         raise ImproperlyConfiguredProjectError(version_key) from exc
-    spec = spec_from_file_location("_module", version_file)
+    spec = spec_from_file_location("_module", base_dir.joinpath(version_file))
     if spec is None or spec.loader is None:
         raise ImproperlyConfiguredProjectError(version_key)
     module = module_from_spec(spec)
@@ -214,6 +227,12 @@ def get_version(settings: MetadataSettings) -> Version:
     return Version.from_string(version)
 
 
+def get_version_file(settings: MetadataSettings, base_dir: Path) -> Path | None:
+    if settings.get("version"):
+        return None
+    return base_dir.joinpath(settings["dynamic_definitions"]["version"]["file"])
+
+
 def get_license(settings: MetadataSettings) -> str:
     license_info = settings.get("license", {})
     return license_info.get("text", "")
@@ -227,27 +246,22 @@ def get_classifiers(user_classifiers: list[str]) -> tuple[str, ...]:
     return unique_classifiers
 
 
-def _get_requirements(
-    dependency_groups: dict[str, Sequence[DependencyGroupMember]],
-    groups: set[str],
-) -> Iterator[Requirement]:
-    for group, requirements in dependency_groups.items():
-        if group not in groups:
-            continue
-        for requirement in requirements:
-            if isinstance(requirement, str):
-                yield Requirement.from_string(requirement)
-            elif isinstance(requirement, dict):
-                include_group = requirement["include-group"]
-                yield from _get_requirements(dependency_groups, {include_group})
-
-
 def get_requirements(
-    dependencies: Sequence[str],
-    dependency_groups: dict[str, Sequence[DependencyGroupMember]],
+    dependencies: Sequence[DependencyGroupMember],
+    dependency_groups: Mapping[str, Sequence[DependencyGroupMember]],
+    optional_dependencies: Mapping[str, Sequence[str]] | None = None,
 ) -> tuple[Requirement, ...]:
-    dependency_groups[""] = dependencies
-    return keep_unique(_get_requirements(dependency_groups, {""}))
+    requirements = list(DependencyGroups({**dependency_groups, "": dependencies})[""])
+    extras = DependencyGroups(optional_dependencies or {})
+    for extra in extras.names:
+        requirements.extend(
+            requirement.with_extra(extra) for requirement in extras[extra]
+        )
+    return merge_requirements(requirements)
+
+
+def get_extras(optional_dependencies: Mapping[str, Sequence[str]]) -> tuple[str, ...]:
+    return keep_unique(canonicalise_name(extra) for extra in optional_dependencies)
 
 
 def get_package_paths(
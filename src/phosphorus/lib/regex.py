@@ -1,5 +1,7 @@
 import re
 
+from phosphorus.lib.constants import TokenRule
+
 raw_version_pattern = r"""
     ^
     v?
@@ -32,10 +34,37 @@ raw_version_pattern = r"""
     (?:\+(?P<local>[a-z0-9]+(?:[-_\.][a-z0-9]+)*))?       # local version
     $
 """
-raw_requirement_pattern = r"""
-    (?P<name>[a-z0-9\[\]]+(?:[a-z0-9-_.])*)+               # package name
-    (?P<clauses>.*)                                        # comma-separated clauses
+raw_specifiers_pattern = r"""
+    (?:===|==|~=|!=|<=|>=|<|>)[ \t]*[^\s,;()]+             # first clause
+    (?:[ \t]*,[ \t]*(?:===|==|~=|!=|<=|>=|<|>)[ \t]*[^\s,;()]+)*
 """
 version_pattern = re.compile(raw_version_pattern, re.VERBOSE | re.IGNORECASE)
-requirement_pattern = re.compile(raw_requirement_pattern, re.VERBOSE | re.IGNORECASE)
+# the parts of a requirement, each of them matched where the previous one ended
+requirement_name_pattern = re.compile(
+    r"[ \t]*([a-z0-9](?:[a-z0-9._-]*[a-z0-9])?)[ \t]*", re.IGNORECASE
+)
+requirement_extras_pattern = re.compile(r"\[([^\]]*)\][ \t]*")
+requirement_url_pattern = re.compile(r"@[ \t]*([^ \t]+)[ \t]*")
+# a comment starts the line, or follows whitespace, so that URL fragments are kept
+requirement_comment_pattern = re.compile(r"(?:^|[ \t]+)#.*$")
+requirement_include_pattern = re.compile(
+    r"(?P<option>-r|-c|--requirement|--constraint)(?:[ \t]*=[ \t]*|[ \t]+|(?<=-[rc]))"
+    r"(?P<path>[^ \t]+)"
+)
+requirement_option_pattern = re.compile(r"--[a-z][a-z-]*|-[a-z]", re.IGNORECASE)
+requirement_options_pattern = re.compile(r"[ \t]+--[a-z][a-z-]*(?:[ \t=]|$)")
+requirement_specifiers_pattern = re.compile(
+    rf"""
+        \([ \t]*(?P<parenthesised>{raw_specifiers_pattern})[ \t]*\)[ \t]*
+        |
+        (?P<bare>{raw_specifiers_pattern})[ \t]*
+    """,
+    re.VERBOSE,
+)
 version_separators = re.compile(r"[._-]")
+# the last group matches any character that does not start a token
+marker_token_pattern = re.compile(
+    "|".join(f"(?P<{rule.name}>{rule.value.pattern})" for rule in TokenRule)
+    + "|(?P<UNEXPECTED>.)",
+    re.VERBOSE | re.DOTALL,
+)
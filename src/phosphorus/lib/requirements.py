@@ -1,16 +1,33 @@
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import partial
 from typing import TYPE_CHECKING
 
-from phosphorus.lib.markers import Marker
+from phosphorus.lib.cache import cached_parser, named_cache
+from phosphorus.lib.constants import BooleanOperator, ComparisonOperator, MarkerVariable
+from phosphorus.lib.exceptions import RequirementsFileError
+from phosphorus.lib.markers import Marker, MarkerAtom, MarkerParser
 from phosphorus.lib.packages import Package
-from phosphorus.lib.regex import requirement_pattern
-from phosphorus.lib.versions import VersionClause
+from phosphorus.lib.regex import (
+    requirement_comment_pattern,
+    requirement_extras_pattern,
+    requirement_include_pattern,
+    requirement_name_pattern,
+    requirement_option_pattern,
+    requirement_options_pattern,
+    requirement_specifiers_pattern,
+    requirement_url_pattern,
+)
+from phosphorus.lib.utils import canonicalise_name
+from phosphorus.lib.versions import SpecifierSet, VersionClause
 
 if TYPE_CHECKING:
-    from typing_extensions import Self  # upgrade: py3.10: import from typing
+    import re
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+    from phosphorus.lib.cache import ParseCache
 
 
 @dataclass(frozen=True, order=True, slots=True)
@@ -18,34 +35,348 @@ class Requirement:
     package: Package
     clauses: tuple[VersionClause, ...]
     marker: Marker
+    extras: tuple[str, ...] = ()
+    url: str = ""
 
     @classmethod
-    def from_string(cls, requirement: str) -> Self:
-        clause, *markers = requirement.split(";", maxsplit=1)
+    @cached_parser
+    def from_string(cls, requirement: str) -> Requirement:
+        return RequirementParser(requirement).parse()
+
+    def with_extra(self, extra: str) -> Requirement:
+        """Return the requirement, restricted to the installs of the extra."""
+        extra_atom = MarkerAtom(
+            variable=MarkerVariable.EXTRA,
+            operator=ComparisonOperator.EQUAL_TO,
+            value=canonicalise_name(extra),
+        )
         marker = (
-            Marker.from_string(markers[0].strip())
-            if markers
-            else Marker(boolean=None, markers=())
+            Marker(boolean=BooleanOperator.AND, markers=(self.marker, extra_atom))
+            if self.marker
+            else Marker(boolean=None, markers=(extra_atom,))
         )
-        full_match = re.fullmatch(requirement_pattern, clause.strip())
-        if not full_match:
-            msg = "Could not parse the requirement"
-            raise RuntimeError(msg)
-        name = full_match["name"].strip()
-        if full_match["clauses"]:
-            clauses = tuple(
-                VersionClause.from_string(matched_clause)
-                for matched_clause in full_match["clauses"].strip(" ()").split(",")
-            )
-        else:
-            clauses = ()
-        return cls(package=Package(name=name), clauses=clauses, marker=marker)
+        return replace(self, marker=marker.canonical())
 
     def __str__(self) -> str:
         parts = [self.package.name]
-        if self.clauses:
+        if self.extras:
+            parts[0] += f"[{','.join(self.extras)}]"
+        if self.url:
+            parts.append(f"@ {self.url}")
+        elif self.clauses:
             clauses = ",".join(str(clause) for clause in self.clauses)
             parts.append(f"({clauses})")
         if self.marker:
             parts.append(f"; {self.marker}")
         return " ".join(parts)
+
+
+class RequirementParser:
+    """Parse a PEP 508 requirement in a single pass, from left to right.
+
+    The marker, after the semicolon, is handed to the marker parser.
+    """
+
+    def __init__(self, requirement: str) -> None:
+        self.string = requirement
+        self.position = 0
+
+    def parse(self) -> Requirement:
+        name = self.parse_name()
+        extras = self.parse_extras()
+        url = self.parse_url()
+        clauses = () if url else self.parse_specifiers()
+        marker = self.parse_marker()
+        return Requirement(
+            package=Package(name=name),
+            clauses=clauses,
+            marker=marker,
+            extras=extras,
+            url=url,
+        )
+
+    def parse_name(self) -> str:
+        match = self.accept(requirement_name_pattern)
+        if match is None:
+            msg = f"Expected a package name at position {self.position}"
+            raise ValueError(msg)
+        return match[1]
+
+    def parse_extras(self) -> tuple[str, ...]:
+        match = self.accept(requirement_extras_pattern)
+        if match is None or not match[1].strip():
+            return ()
+
+        extras = set()
+        for extra in match[1].split(","):
+            if not requirement_name_pattern.fullmatch(extra):
+                msg = f"Expected an extra name at position {match.start(1)}"
+                raise ValueError(msg)
+            extras.add(canonicalise_name(extra.strip()))
+        return tuple(sorted(extras))
+
+    def parse_url(self) -> str:
+        match = self.accept(requirement_url_pattern)
+        return match[1] if match else ""
+
+    def parse_specifiers(self) -> tuple[VersionClause, ...]:
+        match = self.accept(requirement_specifiers_pattern)
+        if match is None:
+            return ()
+        specifiers = match["parenthesised"] or match["bare"]
+        return _specifier_clauses.get(specifiers, partial(_simplify, specifiers))
+
+    def parse_marker(self) -> Marker:
+        if self.position == len(self.string):
+            return Marker(boolean=None, markers=())
+        if self.string[self.position] != ";":
+            msg = f"Expected the end or ';' at position {self.position}"
+            raise ValueError(msg)
+
+        start = self.position + 1
+        try:
+            # the marker text repeats much more often than the requirement
+            marker = Marker.from_string(self.string[start:])
+        except (RuntimeError, ValueError):
+            # parse again, to report the position within the requirement
+            MarkerParser(self.string, start).parse()
+            raise
+        if not marker:
+            msg = f"Expected a marker after ';' at position {self.position}"
+            raise ValueError(msg)
+        return marker.canonical()
+
+    def accept(self, pattern: re.Pattern[str]) -> re.Match[str] | None:
+        match = pattern.match(self.string, self.position)
+        if match is not None:
+            self.position = match.end()
+        return match
+
+
+_specifier_clauses: ParseCache[str, tuple[VersionClause, ...]] = named_cache(
+    "RequirementParser.parse_specifiers"
+)
+
+
+_clause_intersections: ParseCache[frozenset[str], tuple[VersionClause, ...]] = (
+    named_cache("merge_requirements.intersections")
+)
+_clause_implications: ParseCache[
+    tuple[tuple[VersionClause, ...], tuple[VersionClause, ...]], bool
+] = named_cache("merge_requirements.implications")
+
+
+def _simplify(specifiers: str) -> tuple[VersionClause, ...]:
+    return SpecifierSet.from_string(specifiers).simplify().clauses
+
+
+def merge_requirements(requirements: Iterable[Requirement]) -> tuple[Requirement, ...]:
+    """Merge the requirements on the same package into as few as possible.
+
+    Requirements with the same marker apply together, so their clauses are
+    intersected and their extras joined. The requirements that then only
+    differ by their marker are joined by or-ing their markers. Last, a
+    conditional requirement is dropped when an unconditional one on the same
+    package implies it. The result is sorted.
+    """
+    by_marker: dict[tuple[Package, str, Marker], list[Requirement]] = {}
+    for requirement in requirements:
+        key = (requirement.package, requirement.url, requirement.marker)
+        by_marker.setdefault(key, []).append(requirement)
+
+    by_clauses: dict[
+        tuple[Package, str, tuple[VersionClause, ...], tuple[str, ...]], list[Marker]
+    ] = {}
+    for (package, url, marker), group in by_marker.items():
+        clauses = _all_clauses(group)
+        extras = tuple(sorted({extra for member in group for extra in member.extras}))
+        by_clauses.setdefault((package, url, clauses, extras), []).append(marker)
+
+    merged = [
+        Requirement(
+            package=package,
+            clauses=clauses,
+            marker=_any_marker(markers),
+            extras=extras,
+            url=url,
+        )
+        for (package, url, clauses, extras), markers in by_clauses.items()
+    ]
+    unconditional = {
+        (requirement.package, requirement.url): requirement
+        for requirement in merged
+        if not requirement.marker
+    }
+    # clauses with different operators are not ordered, so sort by the text
+    return tuple(
+        sorted(
+            (
+                requirement
+                for requirement in merged
+                if not _implied_by(
+                    requirement,
+                    unconditional.get((requirement.package, requirement.url)),
+                )
+            ),
+            key=str,
+        )
+    )
+
+
+def _all_clauses(requirements: list[Requirement]) -> tuple[VersionClause, ...]:
+    if len(requirements) == 1:
+        return tuple(sorted(requirements[0].clauses, key=str))
+    # equal clauses may be spelled differently, e.g. `>=1` and `>=1.0`, so the
+    # text is the key, to write back the clauses as they were given
+    clauses = {
+        str(clause): clause
+        for requirement in requirements
+        for clause in requirement.clauses
+    }
+    return _clause_intersections.get(
+        frozenset(clauses), partial(_intersect_clauses, tuple(clauses.values()))
+    )
+
+
+def _intersect_clauses(clauses: tuple[VersionClause, ...]) -> tuple[VersionClause, ...]:
+    return tuple(sorted(SpecifierSet(clauses).simplify().clauses, key=str))
+
+
+def _any_marker(markers: list[Marker]) -> Marker:
+    if len(markers) == 1:
+        return markers[0]
+    if not all(markers):
+        return Marker(boolean=None, markers=())
+    return Marker(boolean=BooleanOperator.OR, markers=tuple(markers)).canonical()
+
+
+def _implied_by(requirement: Requirement, other: Requirement | None) -> bool:
+    return (
+        other is not None
+        and other is not requirement
+        and set(requirement.extras).issubset(other.extras)
+        and _clause_implications.get(
+            (other.clauses, requirement.clauses),
+            partial(_implies, other.clauses, requirement.clauses),
+        )
+    )
+
+
+def _implies(
+    clauses: tuple[VersionClause, ...], other: tuple[VersionClause, ...]
+) -> bool:
+    return SpecifierSet(clauses).issubset(SpecifierSet(other))
+
+
+# the pip options that only choose where, and how, requirements are found
+index_options = frozenset(
+    {
+        "-i",
+        "--index-url",
+        "--extra-index-url",
+        "--no-index",
+        "-f",
+        "--find-links",
+        "--trusted-host",
+        "--pre",
+        "--prefer-binary",
+        "--only-binary",
+        "--no-binary",
+        "--require-hashes",
+        "--use-feature",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RequirementLine:
+    requirement: Requirement
+    path: Path
+    line_number: int
+    constraint: bool = False
+
+
+def parse_many(path: Path, *, constraint: bool = False) -> Iterator[RequirementLine]:
+    """Parse a requirements file lazily, line by line, following its includes.
+
+    Comments, blank lines and the pip options that only choose where
+    requirements are found, such as `--index-url`, are skipped, and a line
+    that ends with a backslash continues on the next one. The requirements of
+    a file that is included with `-c`, or that is included by a constraints
+    file, are constraints. Other options, such as `-e`, and lines that are
+    not requirements, such as bare paths, raise a `RequirementsFileError`
+    that names the line.
+    """
+    yield from _parse_file(path.resolve(), constraint=constraint, including=())
+
+
+def _parse_file(
+    path: Path, *, constraint: bool, including: tuple[Path, ...]
+) -> Iterator[RequirementLine]:
+    if path in including:
+        msg = f"{path} includes itself"
+        raise RuntimeError(msg)
+
+    including = (*including, path)
+    with path.open(encoding="utf-8") as lines:
+        for line_number, line in _logical_lines(lines):
+            if not line.startswith("-"):
+                yield RequirementLine(
+                    requirement=_parse_line(path, line_number, line),
+                    path=path,
+                    line_number=line_number,
+                    constraint=constraint,
+                )
+            elif include := requirement_include_pattern.match(line):
+                yield from _parse_file(
+                    path.parent.joinpath(include["path"]).resolve(),
+                    constraint=constraint
+                    or include["option"] in {"-c", "--constraint"},
+                    including=including,
+                )
+            else:
+                _check_option(path, line_number, line)
+
+
+def _parse_line(path: Path, line_number: int, line: str) -> Requirement:
+    options = requirement_options_pattern.search(line)
+    requirement = line[: options.start()] if options else line
+    try:
+        return Requirement.from_string(requirement)
+    except (ValueError, RuntimeError) as exc:
+        reason = f"Invalid requirement {requirement!r}, expected say name or name @ url"
+        raise RequirementsFileError(path, line_number, reason) from exc
+
+
+def _check_option(path: Path, line_number: int, line: str) -> None:
+    option = requirement_option_pattern.match(line)
+    name = option[0] if option else line.split(maxsplit=1)[0]
+    if name in index_options:
+        return
+    if name in {"-e", "--editable"}:
+        reason = f"Editable requirements are not supported: {line!r}"
+    else:
+        reason = f"Unsupported option {name}"
+    raise RequirementsFileError(path, line_number, reason)
+
+
+def _logical_lines(lines: Iterable[str]) -> Iterator[tuple[int, str]]:
+    parts: list[str] = []
+    first_line_number = 0
+    for line_number, line in enumerate(lines, start=1):
+        if not parts:
+            first_line_number = line_number
+        stripped = line.rstrip("\r\n")
+        if stripped.endswith("\\"):
+            parts.append(stripped[:-1])
+            continue
+
+        parts.append(stripped)
+        logical_line = requirement_comment_pattern.sub("", "".join(parts)).strip()
+        parts.clear()
+        if logical_line:
+            yield first_line_number, logical_line
+
+    logical_line = requirement_comment_pattern.sub("", "".join(parts)).strip()
+    if logical_line:
+        yield first_line_number, logical_line
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+from phosphorus.lib.constants import ComparisonOperator
+from phosphorus.lib.exceptions import ResolutionImpossibleError
+from phosphorus.lib.markers import default_environment
+from phosphorus.lib.tags import Tag, supported_tags
+from phosphorus.lib.utils import canonicalise_name
+from phosphorus.lib.versions import SpecifierSet, Version, VersionClause, VersionSet
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping, Sequence
+
+    from typing_extensions import Self  # upgrade: py3.10: import from typing
+
+    from phosphorus.lib.packages import Package
+    from phosphorus.lib.requirements import Requirement
+    from phosphorus.lib.wheelhouse import Artifact, Wheelhouse
+
+# a package, and one of its extras, or an empty string for the package itself
+Node = tuple["Package", str]
+Dependencies = tuple[tuple[Node, VersionSet], ...]
+Assignment = tuple[Node, Version]
+
+
+@dataclass(frozen=True, slots=True)
+class TargetEnvironment:
+    markers: Mapping[str, str]
+    # from the most to the least preferred
+    tags: tuple[Tag, ...]
+    python: Version
+
+    @classmethod
+    def current(
+        cls,
+        python_version: tuple[int, int] | None = None,
+        platforms: Sequence[str] | None = None,
+    ) -> Self:
+        """Describe the running interpreter, or another python version or platform.
+
+        Only the tags follow the platforms: the markers are those of the
+        running interpreter, apart from the python version.
+        """
+        markers = dict(default_environment())
+        if python_version:
+            major, minor = python_version
+            markers["python_version"] = f"{major}.{minor}"
+            markers["python_full_version"] = f"{major}.{minor}.0"
+        return cls(
+            markers=MappingProxyType(markers),
+            tags=supported_tags(python_version, platforms),
+            python=Version.from_string(markers["python_full_version"]),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Resolution:
+    artifacts: tuple[Artifact, ...]
+    backtracks: int
+    learned: int
+    seconds: float
+
+
+@dataclass(slots=True)
+class _Frame:
+    node: Node
+    candidates: tuple[Artifact, ...]
+    index: int = 0
+    # the nodes whose assignments rejected a candidate, or a later node
+    conflicts: set[Node] = field(default_factory=set)
+    # the nodes that the current candidate added constraints to
+    constrained: list[Node] = field(default_factory=list)
+
+
+class Resolver:
+    """Resolve requirements against a wheelhouse, for a target environment.
+
+    The search is depth first, and picks the package with the fewest remaining
+    candidates next. When no candidate of a package fits, the search jumps
+    back to the latest choice that took part in the conflict, rather than the
+    previous choice, and learns the combination of choices that caused it, so
+    that the combination is never tried again.
+
+    Pre-releases are only candidates when the given requirements of their
+    package allow them, or when a package has no final releases. Sdists are
+    only candidates for the versions that have no compatible wheel.
+    """
+
+    __slots__ = (
+        "_assigned",
+        "_candidates",
+        "_constraints",
+        "_dependencies",
+        "_frames",
+        "_nogoods",
+        "_prereleases",
+        "_ranks",
+        "_version_sets",
+        "backtracks",
+        "environment",
+        "learned",
+        "wheelhouse",
+    )
+
+    def __init__(self, wheelhouse: Wheelhouse, environment: TargetEnvironment) -> None:
+        self.wheelhouse = wheelhouse
+        self.environment = environment
+        self._ranks = {tag: rank for rank, tag in enumerate(environment.tags)}
+        self._candidates: dict[Package, tuple[Artifact, ...]] = {}
+        self._dependencies: dict[tuple[Node, Artifact], Dependencies | None] = {}
+        self._version_sets: dict[tuple[VersionClause, ...], VersionSet] = {}
+        self._reset(())
+
+    def resolve(self, requirements: Iterable[Requirement]) -> Resolution:
+        start = time.perf_counter()
+        requirements = tuple(requirements)
+        self._reset(requirements)
+        for node, versions in self._requirement_nodes(requirements, ""):
+            self._constraints.setdefault(node, []).append((None, versions))
+
+        frame: _Frame | None = None
+        while True:
+            if frame is None:
+                selected = self._select()
+                if selected is None:
+                    break
+                frame = _Frame(
+                    node=selected, candidates=self._candidates_of(selected[0])
+                )
+                self._frames.append(frame)
+            if self._assign_next(frame):
+                frame = None
+                continue
+            frame = self._backjump(frame)
+
+        artifacts = (
+            artifact for (_, extra), artifact in self._assigned.items() if not extra
+        )
+        return Resolution(
+            artifacts=tuple(sorted(artifacts, key=lambda artifact: artifact.package)),
+            backtracks=self.backtracks,
+            learned=self.learned,
+            seconds=time.perf_counter() - start,
+        )
+
+    def _reset(self, requirements: Sequence[Requirement]) -> None:
+        self._assigned: dict[Node, Artifact] = {}
+        self._constraints: dict[Node, list[tuple[Node | None, VersionSet]]] = {}
+        self._frames: list[_Frame] = []
+        self._nogoods: dict[Assignment, list[frozenset[Assignment]]] = {}
+        prereleases = {
+            requirement.package
+            for requirement in requirements
+            if SpecifierSet(clauses=requirement.clauses).implies_prereleases
+        }
+        if prereleases != getattr(self, "_prereleases", set()):
+            self._candidates.clear()
+        self._prereleases = prereleases
+        self.backtracks = 0
+        self.learned = 0
+
+    def _select(self) -> Node | None:
+        """Pick the unassigned node with the fewest candidates left."""
+        selected = None
+        fewest = 0
+        for node, constraints in self._constraints.items():
+            if node in self._assigned:
+                continue
+            remaining = sum(
+                all(artifact.version in versions for _, versions in constraints)
+                for artifact in self._candidates_of(node[0])
+            )
+            if selected is None or remaining < fewest:
+                selected, fewest = node, remaining
+                if not remaining:
+                    break
+        return selected
+
+    def _assign_next(self, frame: _Frame) -> bool:
+        node = frame.node
+        constraints = self._constraints[node]
+        while frame.index < len(frame.candidates):
+            artifact = frame.candidates[frame.index]
+            frame.index += 1
+            if not all(artifact.version in versions for _, versions in constraints):
+                continue
+            dependencies = self._dependencies_of(node, artifact)
+            if dependencies is None:
+                continue
+            culprits = self._culprits(node, artifact.version, dependencies)
+            if culprits is not None:
+                frame.conflicts.update(culprits)
+                continue
+
+            self._assigned[node] = artifact
+            for dependency, versions in dependencies:
+                if dependency != node:
+                    self._constraints.setdefault(dependency, []).append(
+                        (node, versions)
+                    )
+                    frame.constrained.append(dependency)
+            return True
+        return False
+
+    def _backjump(self, frame: _Frame) -> _Frame:
+        """Return to the latest choice that the exhausted frame depends on."""
+        conflicts = frame.conflicts | self._sources(frame.node)
+        conflicts.discard(frame.node)
+        self._frames.pop()
+        if not conflicts:
+            package, extra = frame.node
+            raise ResolutionImpossibleError(
+                f"{package}[{extra}]" if extra else package.name
+            )
+
+        self._learn(
+            frozenset((node, self._assigned[node].version) for node in conflicts)
+        )
+        self.backtracks += 1
+        while self._frames[-1].node not in conflicts:
+            self._undo(self._frames.pop())
+        target = self._frames[-1]
+        self._undo(target)
+        target.conflicts.update(conflicts)
+        target.conflicts.discard(target.node)
+        return target
+
+    def _undo(self, frame: _Frame) -> None:
+        del self._assigned[frame.node]
+        for dependency in reversed(frame.constrained):
+            constraints = self._constraints[dependency]
+            constraints.pop()
+            if not constraints:
+                del self._constraints[dependency]
+        frame.constrained.clear()
+
+    def _learn(self, nogood: frozenset[Assignment]) -> None:
+        self.learned += 1
+        for assignment in nogood:
+            self._nogoods.setdefault(assignment, []).append(nogood)
+
+    def _culprits(
+        self, node: Node, version: Version, dependencies: Dependencies
+    ) -> set[Node] | None:
+        """Find the assigned nodes that rule out a version of a node, if any."""
+        for nogood in self._nogoods.get((node, version), ()):
+            others = [assignment for assignment in nogood if assignment[0] != node]
+            if all(
+                other in self._assigned and self._assigned[other].version == assigned
+                for other, assigned in others
+            ):
+                return {other for other, _ in others}
+
+        for dependency, versions in dependencies:
+            if dependency == node:
+                if version not in versions:
+                    return set()
+            elif dependency in self._assigned:
+                if self._assigned[dependency].version not in versions:
+                    return {dependency}
+            elif not any(
+                artifact.version in versions
+                and all(
+                    artifact.version in constraint
+                    for _, constraint in self._constraints.get(dependency, ())
+                )
+                for artifact in self._candidates_of(dependency[0])
+            ):
+                return self._sources(dependency)
+        return None
+
+    def _sources(self, node: Node) -> set[Node]:
+        return {
+            source
+            for source, _ in self._constraints.get(node, ())
+            if source is not None
+        }
+
+    def _candidates_of(self, package: Package) -> tuple[Artifact, ...]:
+        """Return the best artifact of each usable version, newest first."""
+        if package in self._candidates:
+            return self._candidates[package]
+
+        sdist_rank = len(self._ranks)
+        best: dict[Version, tuple[int, Artifact]] = {}
+        for artifact in self.wheelhouse.artifacts(package):
+            rank = (
+                min(
+                    (self._ranks[tag] for tag in artifact.tags if tag in self._ranks),
+                    default=None,
+                )
+                if artifact.is_wheel
+                else sdist_rank
+            )
+            if rank is None:
+                continue
+            if artifact.version not in best or rank < best[artifact.version][0]:
+                best[artifact.version] = (rank, artifact)
+
+        candidates = sorted(
+            (artifact for _, artifact in best.values()),
+            key=lambda artifact: artifact.version,
+            reverse=True,
+        )
+        if package not in self._prereleases:
+            final_releases = [
+                artifact
+                for artifact in candidates
+                if not artifact.version.is_pre_or_dev_release
+            ]
+            candidates = final_releases or candidates
+        self._candidates[package] = tuple(candidates)
+        return self._candidates[package]
+
+    def _dependencies_of(self, node: Node, artifact: Artifact) -> Dependencies | None:
+        """Read the dependencies of a node, or None if the python is unsupported."""
+        key = (node, artifact)
+        if key not in self._dependencies:
+            metadata = self.wheelhouse.metadata(artifact)
+            if self.environment.python not in metadata.python.version_set:
+                self._dependencies[key] = None
+            else:
+                package, extra = node
+                dependencies = list(
+                    self._requirement_nodes(metadata.requirements, extra)
+                )
+                if extra:
+                    pin = VersionClause(
+                        operator=ComparisonOperator.EQUAL_TO,
+                        identifier=artifact.version,
+                    )
+                    dependencies.append(((package, ""), VersionSet(pin.intervals)))
+                self._dependencies[key] = tuple(dependencies)
+        return self._dependencies[key]
+
+    def _requirement_nodes(
+        self, requirements: Iterable[Requirement], extra: str
+    ) -> Iterator[tuple[Node, VersionSet]]:
+        extras = (extra,) if extra else ()
+        for requirement in requirements:
+            if requirement.marker and not requirement.marker.evaluate(
+                self.environment.markers, extras=extras
+            ):
+                continue
+            if requirement.url:
+                msg = f"{requirement} is a direct reference, outside of the wheelhouse"
+                raise ValueError(msg)
+            versions = self._version_set(requirement.clauses)
+            yield (requirement.package, ""), versions
+            for requirement_extra in requirement.extras:
+                yield (
+                    (requirement.package, canonicalise_name(requirement_extra)),
+                    versions,
+                )
+
+    def _version_set(self, clauses: tuple[VersionClause, ...]) -> VersionSet:
+        if clauses not in self._version_sets:
+            self._version_sets[clauses] = SpecifierSet(clauses=clauses).version_set
+        return self._version_sets[clauses]
@@ -1,6 +1,25 @@
 from __future__ import annotations
 
+import os
+import re
+import sys
+import sysconfig
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+    from typing_extensions import Self  # upgrade: py3.10: import from typing
+
+# the glibc versions of the legacy manylinux tags
+_legacy_manylinux = {
+    (2, 17): "manylinux2014",
+    (2, 12): "manylinux2010",
+    (2, 5): "manylinux1",
+}
+# the oldest glibc that the manylinux tags are generated down to
+_oldest_glibc = (2, 5)
 
 
 @dataclass(frozen=True)
@@ -9,6 +28,81 @@ class Tag:
     abi: str | None
     platform: str
 
+    @classmethod
+    def from_string(cls, tag: str) -> tuple[Self, ...]:
+        """Expand a compressed tag set, such as `py2.py3-none-any`."""
+        interpreters, abis, platforms = tag.split("-")
+        return tuple(
+            cls(
+                interpreter=interpreter,
+                abi=None if abi == "none" else abi,
+                platform=platform,
+            )
+            for interpreter in interpreters.split(".")
+            for abi in abis.split(".")
+            for platform in platforms.split(".")
+        )
+
     def __str__(self) -> str:
         abi = self.abi or "none"
         return f"{self.interpreter}-{abi}-{self.platform}"
+
+
+def supported_tags(
+    python_version: tuple[int, int] | None = None,
+    platforms: Sequence[str] | None = None,
+) -> tuple[Tag, ...]:
+    """Return the tags that CPython supports, from the most to the least specific.
+
+    The python version and platforms default to those of the running
+    interpreter.
+    """
+    major, minor = python_version or sys.version_info[:2]
+    platforms = list(platforms or current_platforms())
+    cpython = f"cp{major}{minor}"
+    tags = [Tag(cpython, cpython, platform) for platform in platforms]
+    tags.extend(Tag(cpython, "abi3", platform) for platform in platforms)
+    tags.extend(Tag(cpython, None, platform) for platform in platforms)
+    tags.extend(
+        Tag(f"cp{major}{older}", "abi3", platform)
+        for older in range(minor - 1, 1, -1)
+        for platform in platforms
+    )
+    for interpreter in _python_interpreters(major, minor):
+        tags.extend(Tag(interpreter, None, platform) for platform in platforms)
+    tags.append(Tag(cpython, None, "any"))
+    tags.extend(
+        Tag(interpreter, None, "any")
+        for interpreter in _python_interpreters(major, minor)
+    )
+    return tuple(dict.fromkeys(tags))
+
+
+def _python_interpreters(major: int, minor: int) -> Iterator[str]:
+    yield f"py{major}{minor}"
+    yield f"py{major}"
+    for older in range(minor - 1, -1, -1):
+        yield f"py{major}{older}"
+
+
+def current_platforms() -> list[str]:
+    platform = re.sub(r"[-.]", "_", sysconfig.get_platform())
+    if not platform.startswith("linux_"):
+        return [platform]
+
+    architecture = platform.removeprefix("linux_")
+    platforms = [platform]
+    for glibc in _glibc_versions():
+        platforms.append(f"manylinux_{glibc[0]}_{glibc[1]}_{architecture}")
+        if legacy := _legacy_manylinux.get(glibc):
+            platforms.append(f"{legacy}_{architecture}")
+    return platforms
+
+
+def _glibc_versions() -> list[tuple[int, int]]:
+    try:
+        _, version = os.confstr("CS_GNU_LIBC_VERSION").split()  # type: ignore[union-attr]
+        major, minor = (int(part) for part in version.split(".")[:2])
+    except (AttributeError, OSError, ValueError):
+        return []
+    return [(major, older) for older in range(minor, _oldest_glibc[1] - 1, -1)]
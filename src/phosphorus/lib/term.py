@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import sys
+import time
 from dataclasses import dataclass
 from enum import IntEnum, unique
 from typing import TYPE_CHECKING
@@ -70,7 +71,36 @@ def write(
             sgr_suffix = SGRParams.DEFAULT.sequence if obj.sgr else ""
         else:
             sgr_prefix = ""
-            clean_object = str(obj)
+            clean_object = obj.string if isinstance(obj, SGRString) else str(obj)
             sgr_suffix = ""
 
         print(sgr_prefix, clean_object, sgr_suffix, sep="", end=current_end, file=file)
+
+
+class ProgressLine:
+    """A status line, redrawn in place on the standard error of a terminal.
+
+    Redraws are throttled to one per `interval` seconds, and nothing is drawn
+    when the standard error is not a terminal.
+    """
+
+    __slots__ = ("_drawn", "enabled", "interval")
+
+    def __init__(self, *, enabled: bool = True, interval: float = 0.1) -> None:
+        self.enabled = enabled and sys.stderr.isatty()
+        self.interval = interval
+        self._drawn = 0.0
+
+    def update(self, text: str) -> None:
+        now = time.monotonic()
+        if not self.enabled or now - self._drawn < self.interval:
+            return
+        self._drawn = now
+        sys.stderr.write(f"\r{text}\033[K")
+        sys.stderr.flush()
+
+    def clear(self) -> None:
+        if self.enabled and self._drawn:
+            self._drawn = 0.0
+            sys.stderr.write("\r\033[K")
+            sys.stderr.flush()
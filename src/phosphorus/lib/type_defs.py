@@ -8,6 +8,10 @@ if TYPE_CHECKING:
     from typing_extensions import Self  # upgrade: py3.10: import from typing
 
 Match = str | None
+VersionKey = tuple[
+    int, tuple[int, ...], int, int, int, int, int, tuple[tuple[int, int | str], ...]
+]
+VersionBound = tuple[object, ...]
 JsonType = None | bool | int | float | str | list["JsonType"] | dict[str, "JsonType"]
 
 
@@ -16,9 +20,15 @@ class Comparable(Protocol):  # noqa: PLW1641
     def __lt__(self, other: Self) -> bool: ...
 
 
-class PhosphorusSettings(TypedDict, total=False):
-    dynamic: dict[str, dict[str, str]]
-    packages: dict[str, list[str]]
+PhosphorusSettings = TypedDict(
+    "PhosphorusSettings",
+    {
+        "compile-bytecode": bool | str,
+        "dynamic": dict[str, dict[str, str]],
+        "packages": dict[str, list[str]],
+    },
+    total=False,
+)
 
 
 class ToolSettings(TypedDict, total=False):
@@ -70,6 +80,7 @@ DependencyGroupMember = str | DependencyGroupDict
 
 
 class MetadataSettings(ProjectSettings, total=False):
+    compile_bytecode: bool | str
     dependency_groups: dict[str, Sequence[DependencyGroupMember]]
     dynamic_definitions: dict[str, dict[str, str]]
     included_packages: dict[str, list[str]]
@@ -1,18 +1,36 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from functools import total_ordering
-from itertools import dropwhile
-from typing import TYPE_CHECKING
-
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, replace
+from functools import partial
+from importlib import import_module
+from itertools import pairwise
+from string import digits
+from typing import TYPE_CHECKING, NamedTuple, cast
+
+from phosphorus.lib.cache import cached_parser
 from phosphorus.lib.constants import ComparisonOperator
 from phosphorus.lib.exceptions import UnreachableCodeError
 from phosphorus.lib.regex import version_pattern, version_separators
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+    from types import ModuleType
+
     from typing_extensions import Self  # upgrade: py3.10: import from typing
 
-    from phosphorus.lib.type_defs import Match
+    from phosphorus.lib.type_defs import Match, VersionBound, VersionKey
+
+pre_release_ranks = {"a": 0, "b": 1, "rc": 2}
+
+# the columns of a VersionArray, followed by the padded release, and by the
+# pre, post and dev segments
+_compliant_column = 0
+_local_id_column = 1
+_local_flag_column = 2
+_epoch_column = 3
+_release_column = 4
 
 
 @dataclass(frozen=True, order=True, slots=True)
@@ -33,9 +51,10 @@ class Release:
     full_release: tuple[int, ...] = field(repr=False, compare=False)
 
     def __init__(self, full_release: tuple[int, ...]) -> None:
-        release = tuple(
-            reversed(list(dropwhile(lambda x: x == 0, reversed(full_release))))
-        )
+        end = len(full_release)
+        while end and full_release[end - 1] == 0:
+            end -= 1
+        release = full_release[:end]
         object.__setattr__(self, "release", release)
         object.__setattr__(self, "full_release", full_release)
 
@@ -49,7 +68,7 @@ class Release:
 
     @property
     def canonical_form(self) -> str:
-        return ".".join(str(x) for x in self.release)
+        return ".".join(str(x) for x in self.release) or "0"
 
     @property
     def major(self) -> int:
@@ -167,8 +186,94 @@ class Local:
         return f"+{canonical_local}"
 
 
-@total_ordering
-@dataclass(frozen=True, slots=True)
+_no_epoch = Epoch(epoch=0)
+_no_pre = Pre(letter="z", number=0)
+_no_post = Post(post=-1)
+_no_dev = Dev(dev=float("inf"))
+_no_local = Local(local=())
+
+
+class VersionGroups(NamedTuple):
+    epoch: str | None
+    release: str
+    pre_l: str | None
+    pre_n: str | None
+    post_l: str | None
+    post_n: str | None
+    dev_l: str | None
+    dev_n: str | None
+    local: str | None
+
+
+def match_version(version: str) -> VersionGroups | None:
+    match = version_pattern.search(version)
+    if not match:
+        return None
+    return VersionGroups(
+        epoch=match.group("epoch"),
+        release=match.group("release"),
+        pre_l=match.group("pre_l"),
+        pre_n=match.group("pre_n"),
+        post_l=match.group("post_l"),
+        post_n=match.group("post_n1") or match.group("post_n2"),
+        dev_l=match.group("dev_l"),
+        dev_n=match.group("dev_n"),
+        local=match.group("local"),
+    )
+
+
+def scan_version(version: str) -> VersionGroups | None:
+    """Split the common, canonical versions without the version regex.
+
+    Only `N(.N)*`, followed by an optional `aN`, `bN` or `rcN`, `.postN` and
+    `.devN`, are recognised. Anything else returns None, and is left to the
+    regex.
+    """
+    if not version.isascii():
+        return None
+    rest, dev_l, dev_n = version.partition(".dev")
+    rest, post_l, post_n = rest.partition(".post")
+    if (dev_n and not dev_n.isdigit()) or (post_n and not post_n.isdigit()):
+        return None
+
+    pre_l = pre_n = None
+    stem = rest.rstrip(digits)
+    if stem[-1:].isalpha():
+        for letter in _canonical_pre_letters:
+            if stem.endswith(letter):
+                pre_l, pre_n = letter, rest[len(stem) :]
+                rest = stem[: -len(letter)]
+                break
+
+    if not _is_release(rest):
+        return None
+    return VersionGroups(
+        epoch=None,
+        release=rest,
+        pre_l=pre_l,
+        pre_n=pre_n or None,
+        post_l=post_l[1:] or None,
+        post_n=post_n or None,
+        dev_l=dev_l[1:] or None,
+        dev_n=dev_n or None,
+        local=None,
+    )
+
+
+_canonical_pre_letters = ("rc", "a", "b")
+
+
+def _is_release(release: str) -> bool:
+    # the callers exclude non ascii digits, for which isdigit is also true
+    return (
+        release.replace(".", "").isdigit()
+        and release[0] != "."
+        and release[-1] != "."
+        and ".." not in release
+    )
+
+
+@dataclass(frozen=True, eq=False, slots=True)
 class Version:
     epoch: Epoch
     release: Release
@@ -179,8 +284,15 @@ class Version:
     prefix_match: bool = field(repr=False, default=False)
     match_all: bool = field(repr=False, default=False)
     pep_440_compliant: bool = field(repr=False, default=True)
+    # the version as written, kept for versions that are not PEP 440 compliant
+    arbitrary: str = field(repr=False, default="")
+    sort_key: VersionKey = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "sort_key", self._get_sort_key())
 
     @classmethod
+    @cached_parser
     def from_string(cls, version: str) -> Self:
         if version == "*" or version.endswith("!*"):
             epoch = int(version[:-2]) if version.endswith("!*") else -1
@@ -194,13 +306,14 @@ class Version:
                 prefix_match=True,
                 match_all=True,
             )
+        arbitrary = version
         if version.endswith(".*"):
             prefix_match = True
             version = version[:-2]
         else:
             prefix_match = False
-        match = version_pattern.search(version.strip())
-        if not match:
+        groups = scan_version(version) or match_version(version.strip())
+        if groups is None:
             return cls(
                 epoch=Epoch(epoch=-2),
                 release=Release.from_string("0"),
@@ -209,20 +322,27 @@ class Version:
                 dev=Dev.from_string(None, None),
                 local=Local.from_string(version),
                 pep_440_compliant=False,
+                arbitrary=arbitrary,
             )
 
-        if prefix_match and (match.group("dev_l") or match.group("local")):
+        if prefix_match and (groups.dev_l or groups.local):
             msg = "Prefix match containing a dev or local release is invalid"
             raise RuntimeError(msg)
         return cls(
-            epoch=Epoch.from_string(match.group("epoch")),
-            release=Release.from_string(match.group("release")),
-            pre=Pre.from_string(match.group("pre_l"), match.group("pre_n")),
-            post=Post.from_string(
-                match.group("post_l"), match.group("post_n1") or match.group("post_n2")
+            epoch=Epoch.from_string(groups.epoch) if groups.epoch else _no_epoch,
+            release=Release.from_string(groups.release),
+            pre=Pre.from_string(groups.pre_l, groups.pre_n)
+            if groups.pre_l
+            else _no_pre,
+            post=(
+                Post.from_string(groups.post_l, groups.post_n)
+                if groups.post_l or groups.post_n
+                else _no_post
             ),
-            dev=Dev.from_string(match.group("dev_l"), match.group("dev_n")),
-            local=Local.from_string(match.group("local")),
+            dev=Dev.from_string(groups.dev_l, groups.dev_n)
+            if groups.dev_l
+            else _no_dev,
+            local=Local.from_string(groups.local) if groups.local else _no_local,
             prefix_match=prefix_match,
         )
 
@@ -242,31 +362,70 @@ class Version:
         )
 
     def __str__(self) -> str:
-        return f"{self.epoch}{self.release}{self.pre}{self.post}{self.dev}{self.local}"
+        if self.match_all:
+            return "*" if self.epoch.epoch == -1 else f"{self.epoch}*"
+        if not self.pep_440_compliant:
+            return self.arbitrary
+        version = (
+            f"{self.epoch}{self.release}{self.pre}{self.post}{self.dev}{self.local}"
+        )
+        return f"{version}.*" if self.prefix_match else version
 
-    def __lt__(self, other: object) -> bool:
+    def __eq__(self, other: object) -> bool:
         if not isinstance(other, Version):
             return NotImplemented
+        return (
+            self.sort_key == other.sort_key
+            and self.prefix_match == other.prefix_match
+            and self.match_all == other.match_all
+        )
 
-        if self.epoch != other.epoch:
-            return self.epoch < other.epoch
-
-        if self.release != other.release:
-            return self.release < other.release
-
-        if self.post != other.post:
-            return self.post < other.post
+    def __hash__(self) -> int:
+        return hash((self.sort_key, self.prefix_match, self.match_all))
 
-        if self.is_dev_release ^ other.is_dev_release:
-            return self.is_dev_release
+    def __lt__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.sort_key < other.sort_key
 
-        if self.pre != other.pre:
-            return self.pre < other.pre
+    def __le__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.sort_key <= other.sort_key
 
-        if self.dev != other.dev:
-            return self.dev < other.dev
+    def __gt__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.sort_key > other.sort_key
 
-        return self.local < other.local
+    def __ge__(self, other: object) -> bool:
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self.sort_key >= other.sort_key
+
+    def _get_sort_key(self) -> VersionKey:
+        if self.pre:
+            pre_rank = pre_release_ranks[self.pre.letter]
+        elif self.dev and not self.post:
+            # a dev release without a pre or post release precedes all of them
+            pre_rank = -1
+        else:
+            pre_rank = len(pre_release_ranks)
+        dev_flag, dev_number = (0, int(self.dev.dev)) if self.dev else (1, 0)
+        local = tuple(
+            (1, part) if isinstance(part, int) else (0, part)
+            for part in self.local.local
+        )
+        return (
+            self.epoch.epoch,
+            self.release.release,
+            pre_rank,
+            self.pre.number,
+            self.post.post,
+            dev_flag,
+            dev_number,
+            local,
+        )
 
     @property
     def major(self) -> int:
@@ -292,6 +451,10 @@ class Version:
     def is_dev_release(self) -> bool:
         return bool(self.dev)
 
+    @property
+    def is_pre_or_dev_release(self) -> bool:
+        return bool(self.pre or self.dev)
+
     @property
     def is_base_version(self) -> bool:
         return not (self.post or self.pre or self.dev or self.local)
@@ -335,8 +498,27 @@ class Version:
 class VersionClause:
     operator: ComparisonOperator
     identifier: Version
+    # `1.2` equals `1.2.0`, but `~=1.2` and `==1.2.*` differ from `~=1.2.0` and
+    # `==1.2.0.*`, so their clauses are told apart by the release as written
+    release: tuple[int, ...] = field(init=False, repr=False)
+    intervals: tuple[VersionInterval, ...] = field(
+        init=False, repr=False, compare=False
+    )
+    matcher: Callable[[Version], bool] = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
+        self._validate()
+        padded = (
+            self.operator == ComparisonOperator.COMPATIBLE_WITH
+            or self.identifier.prefix_match
+        )
+        object.__setattr__(
+            self, "release", self.identifier.release.full_release if padded else ()
+        )
+        object.__setattr__(self, "intervals", tuple(_clause_intervals(self)))
+        object.__setattr__(self, "matcher", _compile_matcher(self))
+
+    def _validate(self) -> None:
         if self.operator in ComparisonOperator.env_marker_operator():
             msg = f"Only environment markers are permitted to use `{self.operator}`"
             raise RuntimeError(msg)
@@ -371,6 +553,7 @@ class VersionClause:
         return f"{self.operator}{self.identifier}"
 
     @classmethod
+    @cached_parser
     def from_string(cls, clause: str) -> Self:
         for candidate in ComparisonOperator:
             if clause.startswith(candidate.value):
@@ -386,41 +569,15 @@ class VersionClause:
         )
 
     def match(self, candidate: Version) -> bool:
-        if not (self.identifier.pep_440_compliant and candidate.pep_440_compliant):
-            return self.match_exact(candidate)
-
-        match self.operator:
-            case ComparisonOperator.COMPATIBLE_WITH:
-                return self.match_compatible(candidate)
-            case ComparisonOperator.EQUAL_TO:
-                return self.match_equality(candidate)
-            case ComparisonOperator.NOT_EQUAL:
-                return not self.match_equality(candidate)
-            case ComparisonOperator.LESS_OR_EQUAL:
-                return self.match_leq(candidate)
-            case ComparisonOperator.GREATER_OR_EQUAL:
-                return self.match_geq(candidate)
-            case ComparisonOperator.LESS_THAN:
-                return self.match_lt(candidate)
-            case ComparisonOperator.GREATER_THAN:
-                return self.match_gt(candidate)
-            case ComparisonOperator.EXACT_MATCH:
-                return self.match_exact(candidate)
-            case _:
-                raise UnreachableCodeError
+        return self.matcher(candidate)
 
     def match_compatible(self, candidate: Version) -> bool:
-        if not self.match_geq(candidate):
-            return False
-
-        release_parts = str(self.identifier.release).split(".")
-        release_parts[-1] = "*"
-        wildcard = Version.from_string(
-            f"{self.identifier.epoch}{'.'.join(release_parts)}"
+        prefix = self.identifier.release.full_release[:-1]
+        return (
+            self.match_geq(candidate)
+            and candidate.epoch == self.identifier.epoch
+            and _has_release_prefix(candidate, prefix)
         )
-        return VersionClause(
-            operator=ComparisonOperator.EQUAL_TO, identifier=wildcard
-        ).match(candidate)
 
     def match_equality(self, candidate: Version) -> bool:
         if candidate.epoch != self.identifier.epoch:
@@ -437,13 +594,7 @@ class VersionClause:
         if not self.identifier.is_base_version:
             return candidate.canonical_form.startswith(self.identifier.canonical_form)
 
-        if not candidate.is_base_version:
-            candidate = candidate.base_version
-
-        n = len(self.identifier.release.full_release)
-        if len(candidate.release.full_release) <= n:
-            candidate = candidate.padded(n)
-        return str(candidate).startswith(str(self.identifier))
+        return _has_release_prefix(candidate, self.identifier.release.full_release)
 
     def match_leq(self, candidate: Version) -> bool:
         return candidate <= self.identifier
@@ -452,20 +603,688 @@ class VersionClause:
         return candidate >= self.identifier
 
     def match_lt(self, candidate: Version) -> bool:
-        candidate = candidate.public_version
+        return candidate < self.lower_than_bound()
 
-        if self.identifier.is_pre_release:
-            return candidate < self.identifier
+    def match_gt(self, candidate: Version) -> bool:
+        if bound := self.greater_than_bound():
+            return candidate >= bound
+
+        # the identifier, its local versions, and its post-releases are excluded
+        return candidate.sort_key[:4] > self.identifier.sort_key[:4]
+
+    def lower_than_bound(self) -> Version:
+        if self.identifier.is_pre_or_dev_release:
+            return self.identifier
+
+        # the earliest pre-release of the identifier is its dev0 release
+        return replace(self.identifier, dev=Dev(dev=0))
+
+    def greater_than_bound(self) -> Version | None:
+        identifier = self.identifier
+        if identifier.is_dev_release:
+            return replace(identifier, dev=Dev(dev=int(identifier.dev.dev) + 1))
+        if identifier.is_post_release:
+            return replace(
+                identifier, post=Post(post=identifier.post.post + 1), dev=Dev(dev=0)
+            )
+        return None
 
-        return candidate.base_version < self.identifier
+    def match_exact(self, candidate: Version) -> bool:
+        return candidate == self.identifier
 
-    def match_gt(self, candidate: Version) -> bool:
-        candidate = candidate.public_version
 
-        if self.identifier.is_post_release:
-            return candidate > self.identifier
+def _has_release_prefix(candidate: Version, prefix: tuple[int, ...]) -> bool:
+    release = candidate.release.release + (0,) * len(prefix)
+    return release[: len(prefix)] == prefix
 
-        return candidate.base_version > self.identifier
 
-    def match_exact(self, candidate: Version) -> bool:
-        return candidate == self.identifier
+def _import_numpy() -> ModuleType | None:
+    try:
+        return import_module("numpy")
+    except ImportError:
+        return None
+
+
+class VersionArray:
+    """Versions stored as rows of fixed-width integers, for matching in bulk.
+
+    Each row holds the PEP 440 compliance, the local segment (as an id and
+    as a flag), the epoch, the release padded with zeroes, and the pre, post
+    and dev segments. When numpy is installed the rows form a 2D array and
+    every clause is matched with a few vectorised operations, and the masks
+    returned are numpy boolean arrays. Otherwise, the rows are compared as
+    tuples, and the masks returned are lists.
+    """
+
+    __slots__ = ("_local_ids", "_numpy", "_rows", "_table", "versions", "width")
+
+    def __init__(self, versions: Iterable[Version], *, use_numpy: bool = True) -> None:
+        self.versions = tuple(versions)
+        if any(version.prefix_match for version in self.versions):
+            msg = "Wildcard versions cannot be matched against a clause"
+            raise ValueError(msg)
+        self._numpy = _import_numpy() if use_numpy else None
+        self._local_ids: dict[tuple[str | int, ...], int] = {(): 0}
+        for version in self.versions:
+            self._local_ids.setdefault(version.local.local, len(self._local_ids))
+        self.width = max(
+            (len(version.release.release) for version in self.versions), default=1
+        )
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    def select(self, clause: VersionClause) -> tuple[Version, ...]:
+        return tuple(
+            version
+            for version, selected in zip(self.versions, self.match(clause), strict=True)
+            if selected
+        )
+
+    def match(self, clause: VersionClause) -> Sequence[bool]:
+        identifier = clause.identifier
+        if (
+            not identifier.pep_440_compliant
+            or clause.operator == ComparisonOperator.EXACT_MATCH
+        ):
+            return self._match_exact(identifier)
+
+        self._widen(len(identifier.release.full_release))
+        compliant = self._column_equal(_compliant_column, 1)
+        # non PEP-440 candidates can only ever match exactly
+        return self._either(
+            self._both(compliant, self._match_compliant(clause)),
+            self._both(self._negate(compliant), self._match_exact(identifier)),
+        )
+
+    def _match_compliant(self, clause: VersionClause) -> Sequence[bool]:
+        identifier = clause.identifier
+        match clause.operator:
+            case ComparisonOperator.COMPATIBLE_WITH:
+                prefix = identifier.release.full_release[:-1]
+                return self._both(
+                    self._negate(self._compare_public(identifier)[0]),
+                    self._match_prefix(identifier.epoch.epoch, prefix),
+                )
+            case ComparisonOperator.EQUAL_TO:
+                return self._match_equality(clause)
+            case ComparisonOperator.NOT_EQUAL:
+                return self._negate(self._match_equality(clause))
+            case ComparisonOperator.LESS_OR_EQUAL:
+                less, equal = self._compare_public(identifier)
+                no_local = self._column_equal(_local_flag_column, 0)
+                return self._either(less, self._both(equal, no_local))
+            case ComparisonOperator.GREATER_OR_EQUAL:
+                return self._negate(self._compare_public(identifier)[0])
+            case ComparisonOperator.LESS_THAN:
+                return self._compare_public(clause.lower_than_bound())[0]
+            case ComparisonOperator.GREATER_THAN:
+                if bound := clause.greater_than_bound():
+                    return self._negate(self._compare_public(bound)[0])
+                row = self._public_row(identifier.sort_key)[: self.width + 3]
+                less, equal = self._compare(_epoch_column, self._tail + 2, row)
+                return self._negate(self._either(less, equal))
+            case _:
+                raise UnreachableCodeError
+
+    def _match_equality(self, clause: VersionClause) -> Sequence[bool]:
+        identifier = clause.identifier
+        if identifier.epoch.epoch == -1:
+            return self._constant(value=True)
+        same_epoch = self._column_equal(_epoch_column, identifier.epoch.epoch)
+        if identifier.match_all:
+            return same_epoch
+        if not identifier.prefix_match:
+            if identifier.local:
+                return self._match_exact(identifier)
+            return self._compare_public(identifier)[1]
+        if not identifier.is_base_version:
+            return self._from_list(
+                [clause.match_equality(version) for version in self.versions]
+            )
+        prefix = identifier.release.full_release
+        return self._match_prefix(identifier.epoch.epoch, prefix)
+
+    def _match_prefix(self, epoch: int, prefix: tuple[int, ...]) -> Sequence[bool]:
+        start = _epoch_column
+        return self._compare(start, start + 1 + len(prefix), (epoch, *prefix))[1]
+
+    def _match_exact(self, identifier: Version) -> Sequence[bool]:
+        if identifier.prefix_match:
+            return self._constant(value=False)
+        self._widen(len(identifier.release.release))
+        local_id = self._local_ids.get(identifier.local.local, -1)
+        return self._both(
+            self._column_equal(_local_id_column, local_id),
+            self._compare_public(identifier)[1],
+        )
+
+    def _compare_public(
+        self, identifier: Version
+    ) -> tuple[Sequence[bool], Sequence[bool]]:
+        return self._compare(
+            _epoch_column, self._end, self._public_row(identifier.sort_key)
+        )
+
+    @property
+    def _tail(self) -> int:
+        return _release_column + self.width
+
+    @property
+    def _end(self) -> int:
+        return self._tail + 5
+
+    def _public_row(self, key: VersionKey) -> tuple[int, ...]:
+        epoch, release, pre_rank, pre_number, post, dev_flag, dev_number, _ = key
+        padded = release + (0,) * (self.width - len(release))
+        return (epoch, *padded, pre_rank, pre_number, post, dev_flag, dev_number)
+
+    def _build(self) -> None:
+        self._rows = [
+            (
+                int(version.pep_440_compliant),
+                self._local_ids[version.local.local],
+                int(bool(version.local)),
+                *self._public_row(version.sort_key),
+            )
+            for version in self.versions
+        ]
+        if self._numpy is not None:
+            self._table = self._numpy.array(
+                self._rows, dtype=self._numpy.int64
+            ).reshape(len(self._rows), self._end)
+
+    def _widen(self, width: int) -> None:
+        if width > self.width:
+            self.width = width
+            self._build()
+
+    def _compare(
+        self, start: int, stop: int, values: tuple[int, ...]
+    ) -> tuple[Sequence[bool], Sequence[bool]]:
+        if self._numpy is None:
+            return (
+                [row[start:stop] < values for row in self._rows],
+                [row[start:stop] == values for row in self._rows],
+            )
+
+        block = self._table[:, start:stop]
+        scalar = self._numpy.array(values, dtype=self._numpy.int64)
+        different = block != scalar
+        first = different.argmax(axis=1)
+        rows = self._numpy.arange(len(block))
+        differs = different.any(axis=1)
+        less = differs & (block[rows, first] < scalar[first])
+        return cast("Sequence[bool]", less), cast("Sequence[bool]", ~differs)
+
+    def _column_equal(self, column: int, value: int) -> Sequence[bool]:
+        if self._numpy is None:
+            return [row[column] == value for row in self._rows]
+        return cast("Sequence[bool]", self._numpy.equal(self._table[:, column], value))
+
+    def _constant(self, *, value: bool) -> Sequence[bool]:
+        if self._numpy is None:
+            return [value] * len(self._rows)
+        return cast("Sequence[bool]", self._numpy.full(len(self._rows), value))
+
+    def _from_list(self, mask: list[bool]) -> Sequence[bool]:
+        if self._numpy is None:
+            return mask
+        return cast("Sequence[bool]", self._numpy.array(mask, dtype=bool))
+
+    def _both(self, left: Sequence[bool], right: Sequence[bool]) -> Sequence[bool]:
+        if self._numpy is None:
+            return [a and b for a, b in zip(left, right, strict=True)]
+        return cast("Sequence[bool]", self._numpy.logical_and(left, right))
+
+    def _either(self, left: Sequence[bool], right: Sequence[bool]) -> Sequence[bool]:
+        if self._numpy is None:
+            return [a or b for a, b in zip(left, right, strict=True)]
+        return cast("Sequence[bool]", self._numpy.logical_or(left, right))
+
+    def _negate(self, mask: Sequence[bool]) -> Sequence[bool]:
+        if self._numpy is None:
+            return [not value for value in mask]
+        return cast("Sequence[bool]", self._numpy.logical_not(mask))
+
+
+@dataclass(frozen=True, slots=True)
+class VersionInterval:
+    """The versions whose sort key lies in [lower, upper).
+
+    The bounds are tuples that compare against sort keys, but need not be
+    sort keys themselves. When there are predicates, only the versions in
+    the interval that satisfy all of them are included.
+    """
+
+    lower: VersionBound
+    upper: VersionBound
+    predicates: tuple[Callable[[Version], bool], ...] = ()
+
+    def __contains__(self, version: Version) -> bool:
+        return self.lower <= version.sort_key < self.upper and all(
+            predicate(version) for predicate in self.predicates
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class VersionSet:
+    """A union of disjoint version intervals, sorted by their lower bound.
+
+    Intervals with predicates are assumed to contain versions, so that
+    `is_empty` and `issubset` may return false negatives, but never false
+    positives.
+    """
+
+    intervals: tuple[VersionInterval, ...]
+
+    def __contains__(self, version: Version) -> bool:
+        interval = _covering(self.intervals, version.sort_key)
+        return interval is not None and version in interval
+
+    def intersection(self, other: VersionSet) -> VersionSet:
+        return VersionSet(tuple(_intersect(self.intervals, other.intervals)))
+
+    def union(self, other: VersionSet) -> VersionSet:
+        return VersionSet(tuple(_union(self.intervals, other.intervals)))
+
+    def complement(self) -> VersionSet:
+        return VersionSet(tuple(_complement(self.intervals)))
+
+    def is_empty(self) -> bool:
+        return not self.intervals
+
+    def issubset(self, other: VersionSet) -> bool:
+        return self.intersection(other.complement()).is_empty()
+
+
+@dataclass(frozen=True, slots=True)
+class SpecifierSet:
+    clauses: tuple[VersionClause, ...]
+    prereleases: bool | None = None
+    intervals: tuple[VersionInterval, ...] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        intervals = list(_unbounded)
+        for clause in self.clauses:
+            intervals = _intersect(intervals, clause.intervals)
+        object.__setattr__(self, "intervals", tuple(intervals))
+
+    @classmethod
+    def from_string(cls, specifiers: str, *, prereleases: bool | None = None) -> Self:
+        clauses = tuple(
+            VersionClause.from_string(clause.strip())
+            for clause in specifiers.split(",")
+            if clause.strip()
+        )
+        return cls(clauses=clauses, prereleases=prereleases)
+
+    def __str__(self) -> str:
+        return ",".join(str(clause) for clause in self.clauses)
+
+    @property
+    def implies_prereleases(self) -> bool:
+        return any(_implies_prereleases(clause) for clause in self.clauses)
+
+    @property
+    def version_set(self) -> VersionSet:
+        return VersionSet(self.intervals)
+
+    def intersection(self, other: SpecifierSet) -> SpecifierSet:
+        prereleases = (
+            self.prereleases if other.prereleases is None else other.prereleases
+        )
+        return SpecifierSet(
+            clauses=self.clauses + other.clauses, prereleases=prereleases
+        ).simplify()
+
+    def union(self, other: SpecifierSet) -> VersionSet:
+        return self.version_set.union(other.version_set)
+
+    def is_empty(self) -> bool:
+        return self.version_set.is_empty()
+
+    def issubset(self, other: SpecifierSet) -> bool:
+        return self.version_set.issubset(other.version_set)
+
+    def simplify(self) -> Self:
+        """Drop the duplicate clauses, and those implied by the other clauses.
+
+        A clause that is the only reason for allowing pre-releases is kept.
+        """
+        clauses = list(dict.fromkeys(self.clauses))
+        if len(clauses) == 1 and self.intervals != _unbounded:
+            # a single clause is only redundant when it allows every version
+            return (
+                self if len(self.clauses) == 1 else replace(self, clauses=(*clauses,))
+            )
+
+        # the other clauses are those kept so far, and those not yet visited,
+        # so the intersections of the latter are computed once, from the end
+        clause_intervals = [
+            _intersect(_unbounded, clause.intervals) for clause in clauses
+        ]
+        suffixes = [list(_unbounded)]
+        suffix_prereleases = [False]
+        for clause, intervals in zip(
+            reversed(clauses), reversed(clause_intervals), strict=True
+        ):
+            suffixes.append(_intersect(suffixes[-1], intervals))
+            suffix_prereleases.append(
+                suffix_prereleases[-1] or _implies_prereleases(clause)
+            )
+        suffixes.reverse()
+        suffix_prereleases.reverse()
+
+        kept = []
+        prefix = list(_unbounded)
+        prefix_prereleases = False
+        for index, clause in enumerate(clauses):
+            others = VersionSet(tuple(_intersect(prefix, suffixes[index + 1])))
+            implies_prereleases = _implies_prereleases(clause)
+            if not (
+                implies_prereleases
+                and not (prefix_prereleases or suffix_prereleases[index + 1])
+            ) and others.issubset(VersionSet(tuple(clause_intervals[index]))):
+                continue
+            kept.append(clause)
+            prefix = _intersect(prefix, clause_intervals[index])
+            prefix_prereleases = prefix_prereleases or implies_prereleases
+        return replace(self, clauses=tuple(kept))
+
+    def contains(self, version: Version, *, prereleases: bool | None = None) -> bool:
+        if version.is_pre_or_dev_release and not self._allow_prereleases(
+            prereleases=prereleases
+        ):
+            return False
+        return version in self.version_set
+
+    def filter(
+        self,
+        sorted_versions: Sequence[Version],
+        *,
+        prereleases: bool | None = None,
+    ) -> list[Version]:
+        matched = [
+            version
+            for interval in self.intervals
+            for version in _slice(sorted_versions, interval)
+            if all(predicate(version) for predicate in interval.predicates)
+        ]
+        allow_prereleases = self._allow_prereleases(prereleases=prereleases)
+        if allow_prereleases:
+            return matched
+
+        final_releases = [
+            version for version in matched if not version.is_pre_or_dev_release
+        ]
+        # with the default policy, pre-releases are used when nothing else matches
+        if final_releases or prereleases is False or self.prereleases is False:
+            return final_releases
+        return matched
+
+    def _allow_prereleases(self, *, prereleases: bool | None) -> bool:
+        if prereleases is not None:
+            return prereleases
+        if self.prereleases is not None:
+            return self.prereleases
+        return self.implies_prereleases
+
+
+# every PEP 440 compliant version lies in [_lowest_bound, _highest_bound)
+_lowest_bound: VersionBound = (0, (), -1, 0, -1, 0, 0, ())
+_highest_bound: VersionBound = (math.inf,)
+# the non compliant versions, which only `===` matches, have epoch -2, so sets
+# span from below them, and only `===` clauses reach below `_lowest_bound`
+_arbitrary_bound: VersionBound = (-2,)
+_unbounded = (VersionInterval(lower=_arbitrary_bound, upper=_highest_bound),)
+_compliant = (VersionInterval(lower=_lowest_bound, upper=_highest_bound),)
+# greater than every local segment
+_local_ceiling = ((2,),)
+
+
+def _lower_bound(interval: VersionInterval) -> VersionBound:
+    return interval.lower
+
+
+def _sort_key(version: Version) -> VersionBound:
+    return version.sort_key
+
+
+def _implies_prereleases(clause: VersionClause) -> bool:
+    return (
+        clause.identifier.is_pre_or_dev_release
+        and clause.operator != ComparisonOperator.NOT_EQUAL
+        and not clause.identifier.prefix_match
+    )
+
+
+def _covering(
+    intervals: Sequence[VersionInterval], key: VersionBound
+) -> VersionInterval | None:
+    index = bisect_right(intervals, key, key=_lower_bound) - 1
+    if index >= 0 and key < intervals[index].upper:
+        return intervals[index]
+    return None
+
+
+def _slice(
+    sorted_versions: Sequence[Version], interval: VersionInterval
+) -> Sequence[Version]:
+    start = bisect_left(sorted_versions, interval.lower, key=_sort_key)
+    stop = bisect_left(sorted_versions, interval.upper, lo=start, key=_sort_key)
+    return sorted_versions[start:stop]
+
+
+def _release_floor(epoch: int, release: tuple[int, ...]) -> VersionBound:
+    # the sort key of the lowest version with this release: `{release}.dev0`
+    return (epoch, Release(release).release, -1, 0, -1, 0, 0, ())
+
+
+def _release_ceiling(epoch: int, release: tuple[int, ...]) -> VersionBound:
+    return (epoch, Release(release).release, len(pre_release_ranks) + 1)
+
+
+def _after(version: Version) -> VersionBound:
+    return (*version.sort_key, 0)
+
+
+def _after_locals(version: Version) -> VersionBound:
+    return (*version.sort_key[:7], _local_ceiling)
+
+
+def _prefix_interval(epoch: int, prefix: tuple[int, ...]) -> VersionInterval:
+    next_prefix = (*prefix[:-1], prefix[-1] + 1)
+    return VersionInterval(
+        lower=_release_floor(epoch, prefix), upper=_release_floor(epoch, next_prefix)
+    )
+
+
+def _equality_intervals(clause: VersionClause) -> list[VersionInterval]:
+    identifier = clause.identifier
+    epoch = identifier.epoch.epoch
+    if identifier.match_all:
+        if epoch == -1:
+            return [VersionInterval(lower=_lowest_bound, upper=_highest_bound)]
+        return [
+            VersionInterval(
+                lower=_release_floor(epoch, ()), upper=_release_floor(epoch + 1, ())
+            )
+        ]
+    if not identifier.prefix_match:
+        upper = _after(identifier) if identifier.local else _after_locals(identifier)
+        return [VersionInterval(lower=identifier.sort_key, upper=upper)]
+    release = identifier.release.full_release
+    if identifier.is_base_version:
+        return [_prefix_interval(epoch, release)]
+    return [
+        VersionInterval(
+            lower=_release_floor(epoch, release),
+            upper=_release_ceiling(epoch, release),
+            predicates=(clause.match_equality,),
+        )
+    ]
+
+
+def _clause_intervals(clause: VersionClause) -> list[VersionInterval]:
+    identifier = clause.identifier
+    if (
+        not identifier.pep_440_compliant
+        or clause.operator == ComparisonOperator.EXACT_MATCH
+    ):
+        return [VersionInterval(lower=identifier.sort_key, upper=_after(identifier))]
+
+    match clause.operator:
+        case ComparisonOperator.COMPATIBLE_WITH:
+            prefix = identifier.release.full_release[:-1]
+            return _intersect(
+                [VersionInterval(lower=identifier.sort_key, upper=_highest_bound)],
+                [_prefix_interval(identifier.epoch.epoch, prefix)],
+            )
+        case ComparisonOperator.EQUAL_TO:
+            return _equality_intervals(clause)
+        case ComparisonOperator.NOT_EQUAL:
+            return _intersect(_compliant, _complement(_equality_intervals(clause)))
+        case ComparisonOperator.LESS_OR_EQUAL:
+            return [VersionInterval(lower=_lowest_bound, upper=_after(identifier))]
+        case ComparisonOperator.GREATER_OR_EQUAL:
+            return [VersionInterval(lower=identifier.sort_key, upper=_highest_bound)]
+        case ComparisonOperator.LESS_THAN:
+            upper = clause.lower_than_bound().sort_key
+            return [VersionInterval(lower=_lowest_bound, upper=upper)]
+        case ComparisonOperator.GREATER_THAN:
+            lower: VersionBound
+            if bound := clause.greater_than_bound():
+                lower = bound.sort_key
+            else:
+                lower = (*identifier.sort_key[:4], math.inf)
+            return [VersionInterval(lower=lower, upper=_highest_bound)]
+        case _:
+            raise UnreachableCodeError
+
+
+def _intersect(
+    left: Sequence[VersionInterval], right: Sequence[VersionInterval]
+) -> list[VersionInterval]:
+    output = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        first, second = left[i], right[j]
+        lower = max(first.lower, second.lower)
+        upper = min(first.upper, second.upper)
+        if lower < upper:
+            predicates = first.predicates + second.predicates
+            output.append(
+                VersionInterval(lower=lower, upper=upper, predicates=predicates)
+            )
+        if first.upper < second.upper:
+            i += 1
+        else:
+            j += 1
+    return output
+
+
+def _complement(intervals: Sequence[VersionInterval]) -> list[VersionInterval]:
+    output = []
+    lower = _arbitrary_bound
+    for interval in intervals:
+        if lower < interval.lower:
+            output.append(VersionInterval(lower=lower, upper=interval.lower))
+        if interval.predicates:
+            output.append(
+                VersionInterval(
+                    lower=interval.lower,
+                    upper=interval.upper,
+                    predicates=(partial(_fails_any, interval.predicates),),
+                )
+            )
+        lower = max(lower, interval.upper)
+    if lower < _highest_bound:
+        output.append(VersionInterval(lower=lower, upper=_highest_bound))
+    return output
+
+
+def _union(
+    left: Sequence[VersionInterval], right: Sequence[VersionInterval]
+) -> list[VersionInterval]:
+    bounds = sorted(
+        {
+            bound
+            for interval in (*left, *right)
+            for bound in (interval.lower, interval.upper)
+        }
+    )
+    output: list[VersionInterval] = []
+    for lower, upper in pairwise(bounds):
+        covering = [
+            interval
+            for interval in (_covering(left, lower), _covering(right, lower))
+            if interval is not None
+        ]
+        if not covering:
+            continue
+        if not all(interval.predicates for interval in covering):
+            predicates: tuple[Callable[[Version], bool], ...] = ()
+        elif len(covering) == 1:
+            predicates = covering[0].predicates
+        else:
+            alternatives = tuple(interval.predicates for interval in covering)
+            predicates = (partial(_satisfies_any, alternatives),)
+
+        start = lower
+        if output and output[-1].upper == lower and output[-1].predicates == predicates:
+            start = output.pop().lower
+        output.append(VersionInterval(lower=start, upper=upper, predicates=predicates))
+    return output
+
+
+def _satisfies_any(
+    alternatives: tuple[tuple[Callable[[Version], bool], ...], ...], version: Version
+) -> bool:
+    return any(
+        all(predicate(version) for predicate in predicates)
+        for predicates in alternatives
+    )
+
+
+def _fails_any(
+    predicates: tuple[Callable[[Version], bool], ...], version: Version
+) -> bool:
+    return not all(predicate(version) for predicate in predicates)
+
+
+def _compile_matcher(clause: VersionClause) -> Callable[[Version], bool]:
+    if (
+        clause.operator == ComparisonOperator.NOT_EQUAL
+        and len(excluded := _equality_intervals(clause)) == 1
+        and not excluded[0].predicates
+    ):
+        return partial(_outside, excluded[0].lower, excluded[0].upper)
+
+    intervals = clause.intervals
+    if len(intervals) == 1 and not intervals[0].predicates:
+        (interval,) = intervals
+        if interval.upper == _highest_bound:
+            return partial(_at_least, interval.lower)
+        return partial(_between, interval.lower, interval.upper)
+    return partial(_within, intervals)
+
+
+def _at_least(lower: VersionBound, version: Version) -> bool:
+    return version.sort_key >= lower
+
+
+def _between(lower: VersionBound, upper: VersionBound, version: Version) -> bool:
+    return lower <= version.sort_key < upper
+
+
+def _outside(lower: VersionBound, upper: VersionBound, version: Version) -> bool:
+    return _lowest_bound <= version.sort_key and not lower <= version.sort_key < upper
+
+
+def _within(intervals: tuple[VersionInterval, ...], version: Version) -> bool:
+    interval = _covering(intervals, version.sort_key)
+    return interval is not None and version in interval
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+default_debounce = 0.1
+default_poll_interval = 0.25
+
+# the inotify events of a file being written, created, removed or renamed
+_in_modify = 0x2
+_in_attrib = 0x4
+_in_close_write = 0x8
+_in_moved_from = 0x40
+_in_moved_to = 0x80
+_in_create = 0x100
+_in_delete = 0x200
+_in_queue_overflow = 0x4000
+_in_is_directory = 0x40000000
+_in_changes = (
+    _in_modify
+    | _in_attrib
+    | _in_close_write
+    | _in_moved_from
+    | _in_moved_to
+    | _in_create
+    | _in_delete
+)
+_inotify_event = struct.Struct("iIII")
+
+# the inode, size, mtime and mode of each file, as a chmod is a change too
+Snapshot = dict[Path, tuple[int, int, int, int]]
+
+
+class Watcher(Protocol):
+    def wait(self) -> set[Path]:
+        """Block until files change, and return them once the changes settle."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class WatchedPaths:
+    """The files, and the directories whose files, that are watched."""
+
+    __slots__ = ("directories", "files")
+
+    def __init__(self, paths: Iterable[Path]) -> None:
+        self.files: set[Path] = set()
+        self.directories: set[Path] = set()
+        for path in paths:
+            (self.directories if path.is_dir() else self.files).add(path)
+
+    def __contains__(self, path: Path) -> bool:
+        return path in self.files or any(
+            path.is_relative_to(directory) for directory in self.directories
+        )
+
+    def snapshot(self) -> Snapshot:
+        snapshot: Snapshot = {}
+        for path in self._walk():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (
+                stat.st_ino,
+                stat.st_size,
+                stat.st_mtime_ns,
+                stat.st_mode,
+            )
+        return snapshot
+
+    def _walk(self) -> Iterator[Path]:
+        yield from self.files
+        for directory in self.directories:
+            # unlike `rglob`, `walk` skips directories that vanish meanwhile
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    yield Path(root, name)
+
+
+def create_watcher(
+    paths: Iterable[Path], *, debounce: float = default_debounce
+) -> Watcher:
+    """Watch with inotify where it is available, or else by polling."""
+    watched = WatchedPaths(paths)
+    if sys.platform == "linux":
+        try:
+            return InotifyWatcher(watched, debounce=debounce)
+        except OSError:
+            pass
+    return PollingWatcher(watched, debounce=debounce)
+
+
+class PollingWatcher:
+    """Find changes by comparing stat snapshots of the watched files."""
+
+    __slots__ = ("_snapshot", "debounce", "interval", "watched")
+
+    def __init__(
+        self,
+        watched: WatchedPaths,
+        *,
+        debounce: float = default_debounce,
+        interval: float = default_poll_interval,
+    ) -> None:
+        self.watched = watched
+        self.debounce = debounce
+        self.interval = interval
+        self._snapshot = watched.snapshot()
+
+    def wait(self) -> set[Path]:
+        changes: set[Path] = set()
+        while True:
+            time.sleep(self.debounce if changes else self.interval)
+            snapshot = self.watched.snapshot()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                changes.update(changed)
+            elif changes:
+                return changes
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Find changes from the inotify events of the watched directories.
+
+    The directories of the watched files are watched, rather than the files,
+    so that editors that save by renaming a new file over the old one are
+    followed. New subdirectories of watched directories are watched as they
+    are created.
+    """
+
+    __slots__ = ("_descriptor", "_directories", "_libc", "debounce", "watched")
+
+    def __init__(
+        self, watched: WatchedPaths, *, debounce: float = default_debounce
+    ) -> None:
+        self.watched = watched
+        self.debounce = debounce
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._descriptor = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._descriptor < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._directories: dict[int, Path] = {}
+        for file in watched.files:
+            self._add_watch(file.parent)
+        for directory in watched.directories:
+            self._add_tree(directory)
+
+    def wait(self) -> set[Path]:
+        changes: set[Path] = set()
+        while True:
+            timeout = self.debounce if changes else None
+            ready, _, _ = select.select([self._descriptor], [], [], timeout)
+            if not ready:
+                return changes
+            changes.update(self._read_events())
+
+    def close(self) -> None:
+        if self._descriptor >= 0:
+            os.close(self._descriptor)
+            self._descriptor = -1
+
+    def _read_events(self) -> Iterator[Path]:
+        data = os.read(self._descriptor, 2**16)
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, length = _inotify_event.unpack_from(data, offset)
+            offset += _inotify_event.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & _in_queue_overflow:
+                # events were lost, so every watched path may have changed
+                yield from self.watched.files
+                yield from self.watched.directories
+                continue
+            directory = self._directories.get(descriptor)
+            if directory is None:
+                continue
+            path = directory.joinpath(name) if name else directory
+            if path not in self.watched:
+                continue
+            yield path
+            if mask & _in_is_directory and mask & (_in_create | _in_moved_to):
+                # files may have been created before the directory was watched
+                yield from self._add_tree(path)
+
+    def _add_tree(self, directory: Path) -> list[Path]:
+        """Watch a directory and its subdirectories, and return their files."""
+        files: list[Path] = []
+        for root, _, names in os.walk(directory):
+            self._add_watch(Path(root))
+            files.extend(Path(root, name) for name in names)
+        return files
+
+    def _add_watch(self, directory: Path) -> None:
+        descriptor = self._libc.inotify_add_watch(
+            self._descriptor, os.fsencode(directory), _in_changes
+        )
+        if descriptor >= 0:
+            self._directories[descriptor] = directory
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, cast
+
+from phosphorus.lib.artifact_metadata import ArtifactMetadata
+from phosphorus.lib.packages import Package
+from phosphorus.lib.tags import Tag
+from phosphorus.lib.utils import canonicalise_name
+from phosphorus.lib.versions import Version
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from phosphorus.lib.type_defs import JsonType
+
+wheelhouse_index_name = ".phosphorus-index.json"
+wheelhouse_index_version = 1
+sdist_suffixes = (".tar.gz", ".zip")
+
+# the size, mtime, canonical name, version and tags of an artifact, as indexed
+IndexEntry = tuple[int, int, str, str, list[str]]
+
+
+@dataclass(frozen=True, order=True, slots=True)
+class Artifact:
+    package: Package
+    version: Version
+    path: Path
+    # the tags of a wheel, or no tags for an sdist
+    tags: tuple[Tag, ...] = ()
+
+    @property
+    def is_wheel(self) -> bool:
+        return bool(self.tags)
+
+
+def parse_filename(filename: str) -> tuple[str, str, tuple[str, ...]] | None:
+    """Split the filename of a wheel or an sdist into its name, version and tags.
+
+    None is returned for files that are not artifacts.
+    """
+    if filename.endswith(".whl"):
+        parts = filename.removesuffix(".whl").split("-")
+        if len(parts) not in {5, 6}:
+            return None
+        return parts[0], parts[1], ("-".join(parts[-3:]),)
+
+    for suffix in sdist_suffixes:
+        if filename.endswith(suffix):
+            name, _, version = filename.removesuffix(suffix).rpartition("-")
+            return (name, version, ()) if name else None
+    return None
+
+
+class Wheelhouse:
+    """Index the wheels and sdists of a directory by their filenames.
+
+    The index is kept next to the artifacts, and only the files that were
+    added or changed since it was written have their filenames parsed again.
+    The artifacts of a package are built the first time that they are asked
+    for, and the metadata of an artifact the first time that it is needed.
+    """
+
+    __slots__ = (
+        "_artifacts",
+        "_entries",
+        "_filenames",
+        "directory",
+        "index_path",
+    )
+
+    def __init__(self, directory: Path, *, index_path: Path | None = None) -> None:
+        self.directory = directory
+        self.index_path = index_path or directory.joinpath(wheelhouse_index_name)
+        self._entries: dict[str, IndexEntry] = {}
+        self._filenames: dict[str, list[str]] = {}
+        self._artifacts: dict[Package, tuple[Artifact, ...]] = {}
+        self.refresh()
+
+    def __len__(self) -> int:
+        # the files whose versions are not PEP 440 compliant are only skipped
+        # when the artifacts of their package are built
+        return len(self._entries)
+
+    @property
+    def packages(self) -> tuple[Package, ...]:
+        return tuple(Package(name=name) for name in sorted(self._filenames))
+
+    def refresh(self) -> None:
+        index = self._read_index()
+        entries: dict[str, IndexEntry] = {}
+        with os.scandir(self.directory) as directory:
+            for entry in directory:
+                # the index, and the temporary files of concurrent refreshes
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # removed since the directory was listed
+                    continue
+                cached = index.get(entry.name)
+                if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+                    entries[entry.name] = cached
+                elif parsed := parse_filename(entry.name):
+                    name, version, tags = parsed
+                    entries[entry.name] = (
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                        canonicalise_name(name),
+                        version,
+                        list(tags),
+                    )
+
+        self._entries = entries
+        self._filenames = {}
+        for filename, (_, _, name, _, _) in entries.items():
+            self._filenames.setdefault(name, []).append(filename)
+        self._artifacts = {}
+        if entries != index:
+            self._write_index(entries)
+
+    def artifacts(self, package: Package) -> tuple[Artifact, ...]:
+        """Return the artifacts of a package, from the newest version."""
+        if package not in self._artifacts:
+            artifacts = []
+            for filename in self._filenames.get(package.name, ()):
+                _, _, _, version_string, tag_sets = self._entries[filename]
+                version = Version.from_string(version_string)
+                if not version.pep_440_compliant:
+                    continue
+                artifacts.append(
+                    Artifact(
+                        package=package,
+                        version=version,
+                        path=self.directory.joinpath(filename),
+                        tags=tuple(
+                            tag
+                            for tag_set in tag_sets
+                            for tag in Tag.from_string(tag_set)
+                        ),
+                    )
+                )
+            artifacts.sort(key=lambda artifact: artifact.version, reverse=True)
+            self._artifacts[package] = tuple(artifacts)
+        return self._artifacts[package]
+
+    @staticmethod
+    def metadata(artifact: Artifact) -> ArtifactMetadata:
+        return ArtifactMetadata.from_path(artifact.path)
+
+    def _read_index(self) -> dict[str, IndexEntry]:
+        try:
+            with self.index_path.open(encoding="utf-8") as index_file:
+                index = cast("dict[str, JsonType]", json.load(index_file))
+        except (OSError, ValueError):
+            return {}
+        if index.get("version") != wheelhouse_index_version:
+            return {}
+        entries = cast("dict[str, list[JsonType]]", index["entries"])
+        return {
+            filename: cast("IndexEntry", tuple(entry))
+            for filename, entry in entries.items()
+        }
+
+    def _write_index(self, entries: dict[str, IndexEntry]) -> None:
+        index = {"version": wheelhouse_index_version, "entries": entries}
+        # concurrent refreshes each write their own file, and the last one wins
+        temporary = self.index_path.with_name(
+            f"{self.index_path.name}.{uuid.uuid4().hex}"
+        )
+        try:
+            with temporary.open("x", encoding="utf-8") as index_file:
+                index_file.write(json.dumps(index, separators=(",", ":")))
+                index_file.flush()
+                os.fsync(index_file.fileno())
+            temporary.replace(self.index_path)
+        except OSError:
+            # a wheelhouse may well be read only, in which case it is indexed
+            # every time
+            temporary.unlink(missing_ok=True)
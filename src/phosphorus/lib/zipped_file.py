@@ -37,6 +37,21 @@ class ArchiveFile:
             meta=metadata,
         )
 
+    @classmethod
+    def from_data(
+        cls, source: Path, base_dir: Path, metadata: Metadata, data: bytes
+    ) -> Self:
+        stat = source.stat()
+
+        return cls(
+            absolute_path=source,
+            base_dir=base_dir,
+            digest=cls.hash_data(data),
+            size=len(data),
+            mode=stat.st_mode,
+            meta=metadata,
+        )
+
     @property
     def relative_path(self) -> Path:
         return self.absolute_path.relative_to(self.base_dir)
@@ -82,5 +97,13 @@ class ArchiveFile:
             while data := f.read(buffer_size):
                 sha256.update(data)
 
-        hash_value = urlsafe_b64encode(sha256.digest()).decode("ascii").rstrip("=")
+        return ArchiveFile.format_digest(sha256.digest())
+
+    @staticmethod
+    def hash_data(data: bytes) -> str:
+        return ArchiveFile.format_digest(hashlib.sha256(data).digest())
+
+    @staticmethod
+    def format_digest(digest: bytes) -> str:
+        hash_value = urlsafe_b64encode(digest).decode("ascii").rstrip("=")
         return f"sha256={hash_value}"
@@ -1,51 +1,198 @@
 from __future__ import annotations
 
+import json
+import time
 from typing import TYPE_CHECKING
 
-from phosphorus.construction.api import build_sdist, build_wheel
-from phosphorus.lib.term import SGRParams, SGRString, write
+from phosphorus.__version__ import __version__
+from phosphorus.construction.artifact_cache import get_artifact_cache
+from phosphorus.construction.incremental import MemberCache
+from phosphorus.construction.report import megabyte
+from phosphorus.construction.sdist import SdistBuilder
+from phosphorus.construction.wheel import WheelBuilder
+from phosphorus.lib.licenses import get_license_files
+from phosphorus.lib.metadata import Metadata
+from phosphorus.lib.term import ProgressLine, SGRParams, SGRString, write
+from phosphorus.lib.watch import create_watcher
 from phosphorus.subcommands.base import BaseCommand
 
 if TYPE_CHECKING:
     from argparse import Namespace
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from phosphorus.construction.report import BuildReport
 
 
 class BuildCommand(BaseCommand):
-    __slots__ = ("build_sdist", "build_wheel")
+    __slots__ = (
+        "build_sdist",
+        "build_wheel",
+        "members",
+        "progress",
+        "report_format",
+        "watch",
+    )
 
     def __init__(self, args: Namespace, /) -> None:
         super().__init__(args)
         self.build_sdist = args.sdist
         self.build_wheel = args.wheel
+        self.watch = args.watch
+        self.report_format = args.report
+        self.progress = ProgressLine(enabled=args.progress)
+        # the compressed files of the wheel, kept between the builds of a watch
+        self.members = MemberCache() if self.watch else None
 
     def run(self) -> None:
         package_name = SGRString(self.meta.package.name, params=[SGRParams.CYAN])
         version = SGRString(f"({self.meta.version})", params=[SGRParams.BOLD])
-        write(["Building ", package_name, version, "..."])
+        self._write(["Building ", package_name, version, "..."])
 
         dist_dir = self.meta.base_dir.joinpath("dist")
         dist_dir.mkdir(exist_ok=True)
+        reports = []
+        for build_type, builder in self._builders(dist_dir):
+            self._print_building_start(build_type)
+            artifact = self._build(build_type, builder)
+            self._print_building_end(artifact.name)
+            if builder.report is not None:
+                reports.append(builder.report)
+        self._print_cache()
+        self._print_report(reports)
+        if self.watch:
+            self._watch(dist_dir)
+
+    def _builders(
+        self, dist_dir: Path
+    ) -> Iterator[tuple[str, SdistBuilder | WheelBuilder]]:
+        source_dir = self.meta.base_dir
         if self.build_sdist:
-            self._print_building_start("sdist")
-            sdist = build_sdist(dist_dir.as_posix())
-            self._print_building_end(sdist)
+            yield "sdist", SdistBuilder(dist_dir, None, None, source_dir=source_dir)
         if self.build_wheel:
-            self._print_building_start("wheel")
-            wheel = build_wheel(dist_dir.as_posix())
-            self._print_building_end(wheel)
+            yield (
+                "wheel",
+                WheelBuilder(
+                    dist_dir, None, None, source_dir=source_dir, members=self.members
+                ),
+            )
+
+    def _build(self, build_type: str, builder: SdistBuilder | WheelBuilder) -> Path:
+        def show_progress(report: BuildReport) -> None:
+            self.progress.update(
+                f"🔧 {build_type}: {report.files} files, "
+                f"{report.size / megabyte:.1f} MB"
+            )
+
+        builder.progress = show_progress
+        try:
+            return builder.build()
+        finally:
+            self.progress.clear()
+
+    def _watch(self, dist_dir: Path) -> None:
+        watcher = create_watcher(watched_paths(self.meta))
+        self._write(["👀 Watching for changes, press Ctrl+C to stop..."])
+        try:
+            while True:
+                changes = watcher.wait()
+                started = time.perf_counter()
+                try:
+                    reports = self._rebuild(dist_dir)
+                except (OSError, RuntimeError, SyntaxError, ValueError) as exc:
+                    # a half saved file should not end the session
+                    write(
+                        ["❌ ", SGRString(exc, params=[SGRParams.RED])],
+                        is_error=True,
+                    )
+                    continue
+                elapsed = time.perf_counter() - started
+                self._write(
+                    [
+                        "✅ Rebuilt after ",
+                        SGRString(len(changes), params=[SGRParams.BOLD]),
+                        f" changed files in {elapsed:.3f}s",
+                    ]
+                )
+                self._print_report(reports)
+                if self.meta.pyproject in changes:
+                    # the packages, readme and licences may have moved
+                    watcher.close()
+                    self.meta = Metadata.from_path(self.meta.base_dir)
+                    watcher = create_watcher(watched_paths(self.meta))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+
+    def _rebuild(self, dist_dir: Path) -> list[BuildReport]:
+        reports = []
+        for build_type, builder in self._builders(dist_dir):
+            self._build(build_type, builder)
+            if builder.report is not None:
+                reports.append(builder.report)
+        return reports
+
+    def _print_report(self, reports: list[BuildReport]) -> None:
+        if self.report_format != "json":
+            return
+        cache = get_artifact_cache({})
+        document = {
+            "package": self.meta.package.name,
+            "version": str(self.meta.version),
+            "generator": f"phosphorus {__version__}",
+            "artifacts": [report.to_json() for report in reports],
+            "artifact_cache": None
+            if cache is None
+            else {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "hit_rate": round(cache.hit_rate, 4),
+            },
+        }
+        # one line per build, so that the reports of a watch are JSON lines
+        write([json.dumps(document, separators=(",", ":"))])
 
-    @staticmethod
-    def _print_building_start(build_type: str) -> None:
-        write(
+    def _print_cache(self) -> None:
+        cache = get_artifact_cache({})
+        if cache is None or not cache.hits + cache.misses:
+            return
+        self._write(
+            [
+                "♻️  Artifact cache: ",
+                SGRString(cache.hits, params=[SGRParams.BOLD]),
+                " hits, ",
+                SGRString(cache.misses, params=[SGRParams.BOLD]),
+                f" misses ({cache.hit_rate:.0%})",
+            ]
+        )
+
+    def _write(self, objects: list[object]) -> None:
+        # the standard output is kept for the report, when there is one
+        write(objects, is_error=self.report_format is not None)
+
+    def _print_building_start(self, build_type: str) -> None:
+        self._write(
             ["🔧 Building ", SGRString(build_type, params=[SGRParams.MAGENTA]), "..."]
         )
 
-    @staticmethod
-    def _print_building_end(file_path: str) -> None:
-        write(
+    def _print_building_end(self, file_path: str) -> None:
+        self._write(
             [
                 "✅ ",
                 SGRString(file_path, params=[SGRParams.BLUE]),
                 " built successfully!",
             ]
         )
+
+
+def watched_paths(meta: Metadata) -> Iterator[Path]:
+    """Yield the files and directories that the distributions are built from."""
+    yield meta.pyproject
+    yield from get_license_files(meta.base_dir)
+    if meta.readme.is_file():
+        yield meta.readme
+    if meta.version_file is not None:
+        yield meta.version_file
+    for package in meta.package_paths:
+        yield package.absolute_path
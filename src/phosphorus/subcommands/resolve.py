@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from phosphorus.lib.requirements import Requirement
+from phosphorus.lib.resolver import Resolver, TargetEnvironment
+from phosphorus.lib.term import SGRParams, SGRString, write
+from phosphorus.lib.wheelhouse import Wheelhouse
+from phosphorus.subcommands.base import BaseCommand
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+
+
+class ResolveCommand(BaseCommand):
+    __slots__ = ("environment", "requirements", "wheelhouse")
+
+    def __init__(self, args: Namespace, /) -> None:
+        super().__init__(args)
+        self.wheelhouse = Path(args.wheelhouse)
+        self.requirements = [
+            Requirement.from_string(requirement) for requirement in args.requirements
+        ]
+        self.environment = TargetEnvironment.current(
+            python_version=args.python_version, platforms=args.platforms
+        )
+
+    def run(self) -> None:
+        wheelhouse = Wheelhouse(self.wheelhouse)
+        write(
+            [
+                "🔍 Resolving against ",
+                SGRString(len(wheelhouse), params=[SGRParams.BOLD]),
+                " artifacts...",
+            ]
+        )
+        resolution = Resolver(wheelhouse, self.environment).resolve(
+            [*self.meta.requirements, *self.requirements]
+        )
+        for artifact in resolution.artifacts:
+            write(
+                [
+                    SGRString(artifact.package.name, params=[SGRParams.CYAN]),
+                    f"=={artifact.version}",
+                ]
+            )
+        write(
+            [
+                "✅ Resolved ",
+                SGRString(len(resolution.artifacts), params=[SGRParams.BOLD]),
+                f" packages in {resolution.seconds:.3f}s",
+                f" ({resolution.backtracks} backtracks)",
+            ]
+        )
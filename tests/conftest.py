@@ -0,0 +1,13 @@
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def digest_cache(
+    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+) -> Path:
+    """Cache the digests of every build, apart from those of the other tests."""
+    directory = tmp_path_factory.mktemp("digests")
+    monkeypatch.setenv("PHOSPHORUS_DIGEST_CACHE", directory.as_posix())
+    return directory
@@ -0,0 +1,112 @@
+import os
+import shutil
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from phosphorus.construction import api
+from phosphorus.construction.artifact_cache import (
+    ArtifactCache,
+    get_artifact_cache,
+    parse_size,
+)
+from phosphorus.construction.wheel import WheelBuilder
+
+PYPROJECT = """\
+[project]
+name = "Friendly.Bard"
+version = "1.2.3"
+requires-python = ">=3.10"
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    source_dir = tmp_path.joinpath("project")
+    package_dir = source_dir.joinpath("src", "friendly_bard")
+    package_dir.mkdir(parents=True)
+    source_dir.joinpath("pyproject.toml").write_text(PYPROJECT)
+    package_dir.joinpath("__init__.py").write_text("SONG = 'la'\n")
+    monkeypatch.chdir(source_dir)
+    return source_dir
+
+
+def test_copies_of_a_project_share_artifacts(
+    project: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config = {"artifact-cache": tmp_path.joinpath("cache").as_posix()}
+    cache = get_artifact_cache(config)
+    assert cache is not None
+    wheel = api.build_wheel(tmp_path.joinpath("dist").as_posix(), config)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    copy = tmp_path.joinpath("copy")
+    shutil.copytree(project, copy)
+    monkeypatch.chdir(copy)
+    with mock.patch.object(WheelBuilder, "prepare_output") as prepare_output:
+        assert api.build_wheel(copy.joinpath("dist").as_posix(), config) == wheel
+    prepare_output.assert_not_called()
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate == 0.5
+    built = tmp_path.joinpath("dist", wheel).read_bytes()
+    assert copy.joinpath("dist", wheel).read_bytes() == built
+
+    # a change in the copy is a miss, which does not evict the original
+    copy.joinpath("src", "friendly_bard", "songs.py").write_text("la = 'la'\n")
+    api.build_wheel(copy.joinpath("dist").as_posix(), config)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(list(cache.directory.glob("*/*"))) == 2
+
+
+@pytest.mark.usefixtures("project")
+def test_editable_wheels_are_not_cached(tmp_path: Path) -> None:
+    config = {"artifact-cache": tmp_path.joinpath("cache").as_posix()}
+    api.build_editable(tmp_path.joinpath("dist").as_posix(), config)
+    assert not tmp_path.joinpath("cache").exists()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    cache = ArtifactCache(tmp_path.joinpath("cache"), max_size=25)
+    artifact = tmp_path.joinpath("artifact")
+    artifact.write_bytes(b"x" * 10)
+    for index, key in enumerate(["aa1", "bb2"]):
+        cache.insert(key, artifact)
+        entry = cache.directory.joinpath(key[:2], key)
+        os.utime(entry, ns=(index * 10**9, entry.stat().st_mtime_ns))
+    # using the oldest entry keeps it
+    assert cache.fetch("aa1", tmp_path.joinpath("fetched"))
+    assert tmp_path.joinpath("fetched").read_bytes() == b"x" * 10
+
+    cache.insert("cc3", artifact)
+    assert sorted(path.name for path in cache.directory.glob("*/*")) == ["aa1", "cc3"]
+    assert not cache.fetch("bb2", tmp_path.joinpath("fetched"))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_stale_temporary_files_are_removed(tmp_path: Path) -> None:
+    cache = ArtifactCache(tmp_path)
+    shard = tmp_path.joinpath("aa")
+    shard.mkdir()
+    stale, fresh = shard.joinpath(".aa1.stale"), shard.joinpath(".aa2.fresh")
+    stale.touch()
+    fresh.touch()
+    hours_ago = time.time() - 2 * 3600
+    os.utime(stale, (hours_ago, hours_ago))
+    assert cache.evict() == 0
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [("1024", 1024), ("500M", 500 * 2**20), ("1.5g", 3 * 2**29), (" 2T ", 2**41)],
+)
+def test_parse_size(size: str, expected: int) -> None:
+    assert parse_size(size) == expected
+
+
+def test_invalid_size() -> None:
+    with pytest.raises(ValueError, match="Invalid artifact cache size 'lots'"):
+        parse_size("lots")
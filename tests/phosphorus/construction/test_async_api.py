@@ -0,0 +1,127 @@
+import asyncio
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from phosphorus.construction import api, async_api
+from phosphorus.construction.pipeline import ByteBudget
+from phosphorus.construction.wheel import WheelBuilder
+
+PYPROJECT = """\
+[project]
+name = "Friendly.Bard"
+version = "1.2.3"
+description = "A friendly bard"
+readme = "README.md"
+requires-python = ">=3.10"
+dependencies = ["lute>=1.0", "harp; python_version<'3.11'"]
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    source_dir = tmp_path.joinpath("project")
+    package_dir = source_dir.joinpath("src", "friendly_bard")
+    package_dir.mkdir(parents=True)
+    source_dir.joinpath("pyproject.toml").write_text(PYPROJECT)
+    source_dir.joinpath("README.md").write_text("# Friendly bard\n")
+    source_dir.joinpath("LICENSE").write_text("Do as thou wilt\n")
+    package_dir.joinpath("__init__.py").write_text("SONG = 'la'\n")
+    package_dir.joinpath("songs.py").write_text("la = 'la'\n" * 50_000)
+    monkeypatch.chdir(source_dir)
+    return source_dir
+
+
+@pytest.mark.parametrize("max_in_flight_bytes", [1, 2**10, 2**30])
+def test_async_hooks_match_sync_hooks(
+    project: Path, tmp_path: Path, max_in_flight_bytes: int
+) -> None:
+    sync_dir = tmp_path.joinpath("sync")
+    async_dir = tmp_path.joinpath("async")
+    sync_names = [
+        api.build_wheel(sync_dir.as_posix()),
+        api.build_sdist(sync_dir.as_posix()),
+    ]
+
+    async def build() -> list[str]:
+        return await asyncio.gather(
+            async_api.build_wheel(
+                async_dir.as_posix(),
+                source_directory=project.as_posix(),
+                max_in_flight_bytes=max_in_flight_bytes,
+            ),
+            async_api.build_sdist(
+                async_dir.as_posix(),
+                source_directory=project.as_posix(),
+                max_in_flight_bytes=max_in_flight_bytes,
+            ),
+        )
+
+    async_names = asyncio.run(build())
+
+    assert async_names == sync_names
+    for name in sync_names:
+        sync_bytes = sync_dir.joinpath(name).read_bytes()
+        assert async_dir.joinpath(name).read_bytes() == sync_bytes
+
+
+def test_cancelled_build_leaves_no_artifact(project: Path, tmp_path: Path) -> None:
+    output_dir = tmp_path.joinpath("dist")
+    wheel_name = "friendly_bard-1.2.3-py3-none-any.whl"
+
+    async def build() -> None:
+        task = asyncio.create_task(
+            async_api.build_wheel(
+                output_dir.as_posix(),
+                source_directory=project.as_posix(),
+                max_in_flight_bytes=1,
+            )
+        )
+        while not output_dir.joinpath(wheel_name).exists():  # noqa: ASYNC110
+            await asyncio.sleep(0)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(build())
+    assert not output_dir.joinpath(wheel_name).exists()
+
+
+def test_unchanged_async_builds_are_skipped(project: Path, tmp_path: Path) -> None:
+    output_dir = tmp_path.joinpath("dist")
+
+    async def build() -> Path:
+        name = await async_api.build_wheel(
+            output_dir.as_posix(), source_directory=project.as_posix()
+        )
+        return output_dir.joinpath(name)
+
+    wheel = asyncio.run(build())
+    built = wheel.stat().st_mtime_ns
+    with mock.patch.object(WheelBuilder, "prepare_output") as prepare_output:
+        assert asyncio.run(build()) == wheel
+    prepare_output.assert_not_called()
+    assert wheel.stat().st_mtime_ns == built
+    # the synchronous hooks share the fingerprint
+    assert api.build_wheel(output_dir.as_posix()) == wheel.name
+    assert wheel.stat().st_mtime_ns == built
+
+    project.joinpath("src", "friendly_bard", "__init__.py").write_text("SONG = 'lo'\n")
+    assert asyncio.run(build()) == wheel
+    assert wheel.stat().st_mtime_ns != built
+
+
+def test_byte_budget_grants_oversized_reservations_alone() -> None:
+    async def reserve() -> list[int]:
+        budget = ByteBudget(10)
+        first = await budget.acquire(4)
+        pending = asyncio.create_task(budget.acquire(100))
+        await asyncio.sleep(0)
+        assert not pending.done()
+        await budget.release(first)
+        second = await pending
+        assert budget.in_flight == 10
+        return [first, second]
+
+    assert asyncio.run(reserve()) == [4, 10]
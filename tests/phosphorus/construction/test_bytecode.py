@@ -0,0 +1,83 @@
+import importlib.util
+import sys
+from pathlib import Path
+from zipfile import ZipFile
+
+import pytest
+
+from phosphorus.construction import bytecode
+from phosphorus.construction.wheel import WheelBuilder
+
+PYPROJECT = """\
+[project]
+name = "Friendly.Bard"
+version = "1.2.3"
+requires-python = ">=3.10"
+
+[tool.phosphorus]
+compile-bytecode = true
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    source_dir = tmp_path.joinpath("project")
+    package_dir = source_dir.joinpath("src", "friendly_bard")
+    package_dir.joinpath("__pycache__").mkdir(parents=True)
+    source_dir.joinpath("pyproject.toml").write_text(PYPROJECT)
+    package_dir.joinpath("__init__.py").write_text("SONG = 'la'\n")
+    package_dir.joinpath("__pycache__", "stale.cpython-311.pyc").write_bytes(b"")
+    package_dir.joinpath("notes.txt").touch()
+    monkeypatch.chdir(source_dir)
+    return source_dir
+
+
+def build(output_dir: Path, config: dict[str, str] | None = None) -> Path:
+    return WheelBuilder(output_dir, config, None).build()
+
+
+@pytest.mark.usefixtures("project")
+@pytest.mark.parametrize("parallel", [False, True])
+def test_compiled_wheel(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, parallel: bool
+) -> None:
+    if parallel:
+        monkeypatch.setattr(bytecode, "min_parallel_modules", 0)
+        monkeypatch.setattr(bytecode.os, "cpu_count", lambda: 2)
+    wheel = build(tmp_path.joinpath("dist"))
+    pyc = f"friendly_bard/__pycache__/__init__.{sys.implementation.cache_tag}.pyc"
+    with ZipFile(wheel) as archive:
+        names = archive.namelist()
+        data = archive.read(pyc)
+        record = archive.read("friendly_bard-1.2.3.dist-info/RECORD").decode()
+    assert pyc in names
+    assert "friendly_bard/__pycache__/stale.cpython-311.pyc" not in names
+    assert f"{pyc},sha256=" in record
+    assert data[:4] == importlib.util.MAGIC_NUMBER
+    # unchecked hash based bytecode
+    assert int.from_bytes(data[4:8], "little") == 0b01
+
+    # the wheel does not depend on when, or where, it is built
+    assert build(tmp_path.joinpath("again")).read_bytes() == wheel.read_bytes()
+
+
+@pytest.mark.usefixtures("project")
+def test_bytecode_settings(tmp_path: Path) -> None:
+    dist = tmp_path.joinpath("dist")
+    pyc = f"friendly_bard/__pycache__/__init__.{sys.implementation.cache_tag}.pyc"
+    with ZipFile(build(dist, {"compile-bytecode": "false"})) as archive:
+        assert pyc not in archive.namelist()
+        # the bytecode of the source tree is left as is
+        assert "friendly_bard/__pycache__/stale.cpython-311.pyc" in archive.namelist()
+
+    with ZipFile(build(dist, {"compile-bytecode": "checked-hash"})) as archive:
+        assert int.from_bytes(archive.read(pyc)[4:8], "little") == 0b11
+
+    with pytest.raises(ValueError, match="Unknown compile-bytecode 'timestamp'"):
+        build(dist, {"compile-bytecode": "timestamp"})
+
+
+def test_syntax_errors(project: Path, tmp_path: Path) -> None:
+    project.joinpath("src", "friendly_bard", "broken.py").write_text("def (:\n")
+    with pytest.raises(ValueError, match=r"broken\.py"):
+        build(tmp_path.joinpath("dist"))
@@ -0,0 +1,141 @@
+import subprocess
+import sys
+from importlib.machinery import PathFinder
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+from zipfile import ZipFile
+
+import pytest
+
+from phosphorus.construction.editable import finder_source, module_index
+from phosphorus.construction.wheel import WheelBuilder
+
+PYPROJECT = """\
+[project]
+name = "Friendly.Bard"
+version = "1.2.3"
+requires-python = ">=3.10"
+"""
+
+CHECK_IMPORTS = """\
+import site
+import sys
+
+site.addsitedir(sys.argv[1])
+import friendly_bard.songs
+import friendly_bard.verses.first
+import chorus.refrain
+import ballad
+
+assert friendly_bard.songs.SONG == "la"
+assert friendly_bard.verses.first.__file__.endswith("first.py")
+assert chorus.refrain.__file__.endswith("refrain.py")
+assert sys.argv[2] not in sys.path
+try:
+    import friendly_bard.missing
+except ModuleNotFoundError:
+    pass
+else:
+    raise AssertionError
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    source_dir = tmp_path.joinpath("project")
+    package_dir = source_dir.joinpath("src", "friendly_bard")
+    package_dir.joinpath("__pycache__").mkdir(parents=True)
+    source_dir.joinpath("pyproject.toml").write_text(PYPROJECT)
+    package_dir.joinpath("__init__.py").touch()
+    package_dir.joinpath("songs.py").write_text("SONG = 'la'\n")
+    package_dir.joinpath("__pycache__", "songs.cpython-311.pyc").touch()
+    package_dir.joinpath("not-a-module.py").touch()
+    source_dir.joinpath("src", "chorus").mkdir()
+    source_dir.joinpath("src", "chorus", "refrain.py").touch()
+    source_dir.joinpath("src", "ballad.py").touch()
+    monkeypatch.chdir(source_dir)
+    return source_dir
+
+
+def test_module_index(project: Path) -> None:
+    src = project.joinpath("src")
+    modules, namespaces = module_index([src])
+    assert modules == {
+        "ballad": str(src.joinpath("ballad.py")),
+        "chorus.refrain": str(src.joinpath("chorus", "refrain.py")),
+        "friendly_bard": str(src.joinpath("friendly_bard", "__init__.py")),
+        "friendly_bard.songs": str(src.joinpath("friendly_bard", "songs.py")),
+    }
+    assert namespaces == {"chorus": [str(src.joinpath("chorus"))]}
+
+    # the first roots shadow the later ones
+    other = project.joinpath("other")
+    other.joinpath("chorus").mkdir(parents=True)
+    other.joinpath("ballad.py").touch()
+    other.joinpath("chorus.py").touch()
+    modules, namespaces = module_index([src, other])
+    assert modules["ballad"] == str(src.joinpath("ballad.py"))
+    assert modules["chorus"] == str(other.joinpath("chorus.py"))
+    assert namespaces == {}
+
+
+def test_editable_finder(project: Path, tmp_path: Path) -> None:
+    wheel = WheelBuilder(
+        tmp_path.joinpath("dist"), {"editable-mode": "finder"}, None, editable=True
+    ).build()
+    site_dir = tmp_path.joinpath("site")
+    with ZipFile(wheel) as archive:
+        assert sorted(archive.namelist())[:2] == [
+            "__editable___friendly_bard_finder.py",
+            "friendly-bard.pth",
+        ]
+        archive.extractall(site_dir)
+
+    # submodules that are new since the build are found through their package
+    verses = project.joinpath("src", "friendly_bard", "verses")
+    verses.mkdir()
+    verses.joinpath("__init__.py").touch()
+    verses.joinpath("first.py").touch()
+    src = project.joinpath("src").as_posix()
+    subprocess.run(  # noqa: S603
+        [sys.executable, "-I", "-c", CHECK_IMPORTS, site_dir.as_posix(), src],
+        check=True,
+    )
+
+
+@pytest.mark.usefixtures("project")
+def test_unknown_editable_mode(tmp_path: Path) -> None:
+    builder = WheelBuilder(
+        tmp_path.joinpath("dist"), {"editable-mode": "symlink"}, None, editable=True
+    )
+    with pytest.raises(ValueError, match="Unknown editable-mode 'symlink'"):
+        builder.build()
+
+
+def test_installs_share_a_finder(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(sys, "meta_path", list(sys.meta_path))
+    for name in ["lute", "harp"]:
+        source = tmp_path.joinpath(f"{name}.py")
+        source.write_text(f"NAME = {name!r}\n")
+        finder = tmp_path.joinpath(f"__editable___{name}_finder.py")
+        finder.write_text(finder_source({name: str(source)}, {}))
+        spec = spec_from_file_location(finder.stem, finder)
+        assert spec is not None
+        assert spec.loader is not None
+        module = module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.install()
+
+    finders = [
+        finder
+        for finder in sys.meta_path
+        if hasattr(finder, "phosphorus_editable_finder")
+    ]
+    assert len(finders) == 1
+    assert sys.meta_path.index(finders[0]) < sys.meta_path.index(PathFinder)
+    spec = finders[0].find_spec("harp")
+    assert spec is not None
+    assert spec.origin == str(tmp_path.joinpath("harp.py"))
+    assert finders[0].find_spec("json") is None
@@ -0,0 +1,131 @@
+import os
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from phosphorus.construction import api
+from phosphorus.lib.zipped_file import ArchiveFile
+
+PYPROJECT = """\
+[project]
+name = "Friendly.Bard"
+version = "1.2.3"
+description = "A friendly bard"
+readme = "README.md"
+requires-python = ">=3.10"
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    source_dir = tmp_path.joinpath("project")
+    package_dir = source_dir.joinpath("src", "friendly_bard")
+    package_dir.mkdir(parents=True)
+    source_dir.joinpath("pyproject.toml").write_text(PYPROJECT)
+    source_dir.joinpath("README.md").write_text("# Friendly bard\n")
+    source_dir.joinpath("LICENSE").write_text("Do as thou wilt\n")
+    package_dir.joinpath("__init__.py").write_text("SONG = 'la'\n")
+    monkeypatch.chdir(source_dir)
+    return source_dir
+
+
+def build(output_dir: Path, config: dict[str, str] | None = None) -> list[int]:
+    """Build both artifacts, and return their mtimes."""
+    names = [
+        api.build_wheel(output_dir.as_posix(), config),
+        api.build_sdist(output_dir.as_posix(), config),
+    ]
+    return [output_dir.joinpath(name).stat().st_mtime_ns for name in names]
+
+
+def test_unchanged_builds_are_skipped(project: Path, tmp_path: Path) -> None:
+    dist = tmp_path.joinpath("dist")
+    built = build(dist)
+    assert sorted(path.name for path in dist.iterdir()) == [
+        ".friendly_bard-1.2.3-py3-none-any.whl.fingerprint.json",
+        ".friendly_bard-1.2.3.tar.gz.fingerprint.json",
+        "friendly_bard-1.2.3-py3-none-any.whl",
+        "friendly_bard-1.2.3.tar.gz",
+    ]
+
+    with mock.patch.object(ArchiveFile, "hash_file") as hash_file:
+        assert build(dist) == built
+    hash_file.assert_not_called()
+
+    # touched, but unchanged, files are hashed once more
+    init = project.joinpath("src", "friendly_bard", "__init__.py")
+    os.utime(init)
+    assert build(dist) == built
+    with mock.patch.object(ArchiveFile, "hash_file") as hash_file:
+        assert build(dist) == built
+    hash_file.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        "src/friendly_bard/songs.py",
+        "src/friendly_bard/__init__.py",
+        "README.md",
+        "LICENSE",
+    ],
+)
+def test_changed_inputs_rebuild(project: Path, tmp_path: Path, change: str) -> None:
+    dist = tmp_path.joinpath("dist")
+    built = build(dist)
+    project.joinpath(change).write_text("la = 'la'\n")
+    rebuilt = build(dist)
+    assert all(new != old for new, old in zip(rebuilt, built, strict=True))
+    assert build(dist) == rebuilt
+
+
+@pytest.mark.usefixtures("project")
+def test_settings_and_missing_artifacts_rebuild(tmp_path: Path) -> None:
+    dist = tmp_path.joinpath("dist")
+    built = build(dist)
+    assert build(dist, {"interpreter": "py3"}) != built
+
+    wheel = api.build_wheel(dist.as_posix())
+    dist.joinpath(wheel).unlink()
+    assert api.build_wheel(dist.as_posix()) == wheel
+    assert dist.joinpath(wheel).exists()
+
+    editable = dist.joinpath(api.build_editable(dist.as_posix()))
+    with editable.open("rb") as file:
+        assert b".pth" in file.read()
+    assert api.build_wheel(dist.as_posix()) == wheel
+    with editable.open("rb") as file:
+        assert b".pth" not in file.read()
+
+
+def test_changed_modes_rebuild(project: Path, tmp_path: Path) -> None:
+    dist = tmp_path.joinpath("dist")
+    built = build(dist)
+    project.joinpath("src", "friendly_bard", "__init__.py").chmod(0o755)
+    assert build(dist) != built
+
+
+def test_changed_sources_are_hashed_once(project: Path, tmp_path: Path) -> None:
+    dist = tmp_path.joinpath("dist")
+    build(dist)
+    init = project.joinpath("src", "friendly_bard", "__init__.py")
+    init.write_text("SONG = 'fa'\n")
+    # modified well before the build, so that the fingerprint can be trusted
+    past = time.time() - 60
+    os.utime(init, (past, past))
+
+    with (
+        mock.patch.object(
+            ArchiveFile, "hash_file", wraps=ArchiveFile.hash_file
+        ) as hash_file,
+        mock.patch.object(
+            ArchiveFile, "hash_data", wraps=ArchiveFile.hash_data
+        ) as hash_data,
+    ):
+        build(dist)
+    assert [path for (path,), _ in hash_file.call_args_list].count(init) == 1
+    hashed = {data for (data,), _ in hash_data.call_args_list}
+    assert init.read_bytes() not in hashed
+    assert project.joinpath("pyproject.toml").read_bytes() not in hashed
@@ -0,0 +1,114 @@
+import zlib
+from pathlib import Path
+from unittest import mock
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
+
+import pytest
+
+from phosphorus.construction import incremental
+from phosphorus.construction.incremental import MemberCache, write_deflated
+from phosphorus.construction.wheel import WheelBuilder
+
+PYPROJECT = """\
+[project]
+name = "Friendly.Bard"
+version = "1.2.3"
+requires-python = ">=3.10"
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    source_dir = tmp_path.joinpath("project")
+    package_dir = source_dir.joinpath("src", "friendly_bard")
+    package_dir.mkdir(parents=True)
+    source_dir.joinpath("pyproject.toml").write_text(PYPROJECT)
+    for index in range(10):
+        package_dir.joinpath(f"song_{index}.py").write_text(f"VERSE = {index}\n" * 50)
+    monkeypatch.chdir(source_dir)
+    return source_dir
+
+
+def test_cached_members_build_the_same_wheel(project: Path, tmp_path: Path) -> None:
+    members = MemberCache()
+    wheel = WheelBuilder(tmp_path.joinpath("cached"), None, None, members=members)
+    plain = WheelBuilder(tmp_path.joinpath("plain"), None, None)
+    assert wheel.build().read_bytes() == plain.build().read_bytes()
+    assert len(members) == 10
+
+    song = project.joinpath("src", "friendly_bard", "song_3.py")
+    song.write_text("VERSE = 'changed'\n")
+    project.joinpath("src", "friendly_bard", "song_4.py").unlink()
+    with mock.patch.object(
+        incremental, "deflate", wraps=incremental.deflate
+    ) as deflate:
+        cached = wheel.build()
+    # only the changed file, and the generated metadata files, are compressed
+    compressed = [call.args[0] for call in deflate.call_args_list]
+    assert b"VERSE = 'changed'\n" in compressed
+    assert not any(data.startswith(b"VERSE = 0") for data in compressed)
+    assert len(compressed) == 4
+    assert cached.read_bytes() == plain.build().read_bytes()
+    assert len(members) == 9
+
+
+def test_cached_members_follow_mode_changes(project: Path, tmp_path: Path) -> None:
+    members = MemberCache()
+    wheel = WheelBuilder(tmp_path.joinpath("cached"), None, None, members=members)
+    wheel.build()
+    song = project.joinpath("src", "friendly_bard", "song_3.py")
+    song.chmod(0o755)
+
+    with mock.patch.object(
+        incremental, "deflate", wraps=incremental.deflate
+    ) as deflate:
+        cached = wheel.build()
+    assert b"VERSE = 3\n" * 50 not in [call.args[0] for call in deflate.call_args_list]
+    plain = WheelBuilder(tmp_path.joinpath("plain"), None, None).build()
+    assert cached.read_bytes() == plain.read_bytes()
+    with ZipFile(cached) as archive:
+        info = archive.getinfo("friendly_bard/song_3.py")
+    assert info.external_attr >> 16 == 0o100755
+
+
+def write_song(archive: ZipFile, name: str, data: bytes) -> None:
+    zip_info = ZipInfo(name, date_time=(2020, 2, 2, 0, 0, 0))
+    zip_info.external_attr = 0o644 << 16
+    write_deflated(
+        archive, zip_info, len(data), zlib.crc32(data), incremental.deflate(data)
+    )
+
+
+def test_deflated_members_match_writestr(tmp_path: Path) -> None:
+    data = b"la " * 1000
+    with ZipFile(tmp_path.joinpath("spliced.zip"), "w") as archive:
+        write_song(archive, "song.txt", data)
+    with ZipFile(tmp_path.joinpath("written.zip"), "w") as archive:
+        zip_info = ZipInfo("song.txt", date_time=(2020, 2, 2, 0, 0, 0))
+        zip_info.external_attr = 0o644 << 16
+        archive.writestr(zip_info, data, compress_type=ZIP_DEFLATED)
+    spliced = tmp_path.joinpath("spliced.zip").read_bytes()
+    assert spliced == tmp_path.joinpath("written.zip").read_bytes()
+
+
+def test_deflated_members_fall_back_to_writestr(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("songs.zip")
+    with ZipFile(path, "w") as archive:
+        write_song(archive, "song.txt", b"la")
+        with pytest.warns(UserWarning, match="Duplicate name"):
+            write_song(archive, "song.txt", b"la")
+        with (
+            archive.open("open.txt", "w"),
+            pytest.raises(ValueError, match="open writing handle"),
+        ):
+            write_song(archive, "other.txt", b"fa")
+    with pytest.raises(ValueError, match="already closed"):
+        write_song(archive, "late.txt", b"so")
+
+    # appending is left to `writestr` altogether
+    with ZipFile(path, "a") as archive:
+        write_song(archive, "appended.txt", b"mi")
+    with ZipFile(path) as archive:
+        assert archive.testzip() is None
+        assert archive.read("appended.txt") == b"mi"
+        assert "other.txt" not in archive.NameToInfo
@@ -0,0 +1,82 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from phosphorus.construction.report import BuildReport
+from phosphorus.construction.sdist import SdistBuilder
+from phosphorus.construction.wheel import WheelBuilder
+
+PYPROJECT = """\
+[project]
+name = "Friendly.Bard"
+version = "1.2.3"
+requires-python = ">=3.10"
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    source_dir = tmp_path.joinpath("project")
+    package_dir = source_dir.joinpath("src", "friendly_bard")
+    package_dir.mkdir(parents=True)
+    source_dir.joinpath("pyproject.toml").write_text(PYPROJECT)
+    for index in range(5):
+        package_dir.joinpath(f"song_{index}.py").write_text("VERSE = 'la'\n" * 100)
+    monkeypatch.chdir(source_dir)
+    return source_dir
+
+
+@pytest.mark.usefixtures("project")
+@pytest.mark.parametrize("builder_class", [WheelBuilder, SdistBuilder])
+def test_build_report(
+    tmp_path: Path, builder_class: type[WheelBuilder | SdistBuilder]
+) -> None:
+    progress: list[int] = []
+    builder = builder_class(
+        tmp_path.joinpath("dist"),
+        None,
+        None,
+        progress=lambda report: progress.append(report.files),
+    )
+    artifact = builder.build()
+    assert builder.report is not None
+    report = builder.report.to_json()
+    files = report["files"]
+    assert isinstance(files, int)
+    assert progress == list(range(1, files + 1))
+    assert files >= 6
+    assert report["filename"] == artifact.name
+    assert report["skipped"] is False
+    assert report["compressed_bytes"] == artifact.stat().st_size
+    assert report["sha256"] == hashlib.sha256(artifact.read_bytes()).hexdigest()
+    ratio = report["compression_ratio"]
+    assert isinstance(ratio, float)
+    assert 0 < ratio < 1
+    stages = report["stages"]
+    assert isinstance(stages, dict)
+    assert list(stages) == [
+        "fingerprint",
+        "collect",
+        "read",
+        "write",
+        "metadata",
+        "record",
+    ]
+
+    builder.build()
+    skipped = builder.report.to_json()
+    assert skipped["skipped"] is True
+    assert skipped["files"] is None
+    assert skipped["sha256"] == report["sha256"]
+
+
+def test_stages_accumulate(tmp_path: Path) -> None:
+    report = BuildReport(tmp_path.joinpath("lute.whl"))
+    for _ in range(3):
+        with report.stage("read"):
+            report.add(10)
+    assert report.files == 3
+    assert report.size == 30
+    assert list(report.stages) == ["read"]
+    assert report.stages["read"] > 0
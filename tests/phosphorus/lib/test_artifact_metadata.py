@@ -0,0 +1,120 @@
+import io
+import os
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+import pytest
+
+from phosphorus.lib import artifact_metadata
+from phosphorus.lib.contributors import Contributor
+
+METADATA = """\
+Metadata-Version: 2.1
+Name: Lute
+Version: 1.0
+Summary: A lute
+  with strings
+Author: Ann, Bob
+Author-email: "Ann" <ann@example.com>, cid@example.com
+Requires-Python: >=3.10
+Requires-Dist: harp>=1
+Requires-Dist: drum; extra == 'loud'
+Provides-Extra: loud
+
+Requires-Dist: not-a-header
+"""
+
+
+def make_wheel(path: Path, *, compression: int = ZIP_DEFLATED) -> Path:
+    with ZipFile(path, "w", compression=compression) as archive:
+        for index in range(50):
+            archive.writestr(f"lute/module_{index}.py", "pass\n" * 100)
+        archive.writestr("lute-1.0.dist-info/METADATA", METADATA)
+        archive.comment = b"a comment"
+    return path
+
+
+def make_sdist(path: Path, *, pkg_info: bool = True) -> Path:
+    with tarfile.open(path, "w:gz") as archive:
+        members = {"lute-1.0/setup.py": b"pass\n"}
+        if pkg_info:
+            members["lute-1.0/PKG-INFO"] = METADATA.encode()
+        members["lute-1.0/lute/data.bin"] = os.urandom(10_000)
+        for name, contents in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(contents)
+            archive.addfile(info, io.BytesIO(contents))
+    return path
+
+
+def test_parse_metadata() -> None:
+    metadata = artifact_metadata.ArtifactMetadata.from_string(METADATA)
+    assert metadata.package.name == "lute"
+    assert str(metadata.version) == "1.0"
+    assert metadata.summary == "A lute\nwith strings"
+    assert str(metadata.python) == ">=3.10"
+    assert [str(requirement) for requirement in metadata.requirements] == [
+        "harp (>=1)",
+        "drum ; extra == 'loud'",
+    ]
+    assert metadata.extras == ("loud",)
+    assert metadata.authors == (
+        Contributor(name="Ann", email="ann@example.com"),
+        Contributor(name="", email="cid@example.com"),
+        Contributor(name="Bob", email=""),
+    )
+    assert metadata.maintainers == ()
+
+    with pytest.raises(ValueError, match="Version"):
+        artifact_metadata.ArtifactMetadata.from_string("Name: lute\n")
+
+
+@pytest.mark.parametrize("compression", [ZIP_DEFLATED, ZIP_STORED])
+def test_read_wheel_metadata(tmp_path: Path, compression: int) -> None:
+    wheel = make_wheel(
+        tmp_path.joinpath("lute-1.0-py3-none-any.whl"), compression=compression
+    )
+    with mock.patch.object(artifact_metadata, "ZipFile") as zip_file:
+        assert artifact_metadata.read_metadata_text(wheel) == METADATA
+    zip_file.assert_not_called()
+
+
+def test_read_prefixed_zip(tmp_path: Path) -> None:
+    archive = make_wheel(tmp_path.joinpath("lute.whl"))
+    prefixed = tmp_path.joinpath("lute-1.0.zip")
+    prefixed.write_bytes(b"#!/usr/bin/env python\n" + archive.read_bytes())
+    with pytest.raises(RuntimeError, match="has no PKG-INFO"):
+        artifact_metadata.read_metadata_text(prefixed)
+
+    prefixed = tmp_path.joinpath("lute-1.0-py3-none-any.whl")
+    prefixed.write_bytes(b"#!/usr/bin/env python\n" + archive.read_bytes())
+    assert artifact_metadata.read_metadata_text(prefixed) == METADATA
+
+
+def test_read_sdist_metadata(tmp_path: Path) -> None:
+    sdist = make_sdist(tmp_path.joinpath("lute-1.0.tar.gz"))
+    assert artifact_metadata.read_metadata_text(sdist) == METADATA
+
+    sdist = make_sdist(tmp_path.joinpath("harp-1.0.tar.gz"), pkg_info=False)
+    with pytest.raises(RuntimeError, match="has no PKG-INFO"):
+        artifact_metadata.read_metadata_text(sdist)
+
+
+def test_read_directory(tmp_path: Path) -> None:
+    wheel = make_wheel(tmp_path.joinpath("lute-1.0-py3-none-any.whl"))
+    sdist = make_sdist(tmp_path.joinpath("lute-1.0.tar.gz"))
+    tmp_path.joinpath("notes.txt").touch()
+
+    metadata = artifact_metadata.read_directory(tmp_path)
+    assert list(metadata) == [wheel, sdist]
+    assert metadata[wheel] == metadata[sdist]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        cached = artifact_metadata.read_directory(tmp_path, executor=executor)
+    assert cached[wheel] is metadata[wheel]
+
+    make_wheel(wheel, compression=ZIP_STORED)
+    os.utime(wheel, ns=(0, 0))
+    assert artifact_metadata.read_directory(tmp_path)[wheel] is not metadata[wheel]
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from phosphorus.lib import cache
+from phosphorus.lib.markers import Marker
+from phosphorus.lib.requirements import Requirement
+from phosphorus.lib.versions import Version, VersionClause
+
+
+def test_equal_inputs_share_an_instance() -> None:
+    assert Version.from_string("1.2.3") is Version.from_string("1.2.3")
+    assert VersionClause.from_string(">=1.0") is VersionClause.from_string(">=1.0")
+    marker = "python_version < '3.11'"
+    assert Marker.from_string(marker) is Marker.from_string(marker)
+    requirement = Requirement.from_string("tomli~=2.0; python_version < '3.11'")
+    assert (
+        requirement.marker is Marker.from_string("python_version < '3.11'").canonical()
+    )
+
+
+def test_parse_cache_statistics() -> None:
+    cache.clear_parse_caches()
+    Version.from_string("4.2")
+    Version.from_string("4.2")
+    Version.from_string("4.3")
+
+    info = cache.parse_cache_info()["Version.from_string"]
+    assert info.hits == 1
+    assert info.misses == 2
+    assert info.currsize == 2
+
+
+def test_parse_cache_evicts_least_recently_used() -> None:
+    parse_cache: cache.ParseCache[str, str] = cache.ParseCache(maxsize=2)
+    parse_cache.get("a", lambda: "A")
+    parse_cache.get("b", lambda: "B")
+    parse_cache.get("a", lambda: "A")
+    parse_cache.get("c", lambda: "C")
+
+    assert parse_cache.get("b", lambda: "new B") == "new B"
+    assert parse_cache.get("a", lambda: "new A") == "new A"
+    assert parse_cache.info() == cache.CacheInfo(
+        hits=1, misses=5, maxsize=2, currsize=2
+    )
+
+
+def test_parse_cache_interns_across_threads() -> None:
+    parse_cache: cache.ParseCache[str, object] = cache.ParseCache()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(
+            executor.map(lambda _: parse_cache.get("key", object), range(100))
+        )
+
+    assert all(value is values[0] for value in values)
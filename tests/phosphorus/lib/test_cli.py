@@ -26,9 +26,51 @@ def test_phosphorus_run_build_mode(options: str, sdist: bool, wheel: bool) -> No
     assert args.sdist is sdist
     assert args.wheel is wheel
     assert args.verbosity == 0
+    assert args.watch is False
+
+
+def test_phosphorus_run_build_watch() -> None:
+    with mock.patch("sys.argv", ["p", "build", "--no-sdist", "--watch"]):
+        args = parse_args()
+    assert args.watch is True
+    assert args.sdist is False
+
+
+def test_phosphorus_run_build_report() -> None:
+    with mock.patch("sys.argv", ["p", "build"]):
+        args = parse_args()
+    assert args.report is None
+    assert args.progress is True
+
+    with mock.patch("sys.argv", ["p", "build", "--report", "json", "--no-progress"]):
+        args = parse_args()
+    assert args.report == "json"
+    assert args.progress is False
+
+    with (
+        mock.patch("sys.argv", ["p", "build", "--report", "xml"]),
+        pytest.raises(SystemExit, match="2"),
+    ):
+        parse_args()
 
 
 @mock.patch("sys.argv", ["p", "new_subcommand"])
 def test_phosphorus_unknown_subcommand() -> None:
     with pytest.raises(SystemExit, match="2"):
         parse_args()
+
+
+def test_phosphorus_resolve() -> None:
+    argv = ["p", "resolve", "lute>=1", "--wheelhouse", "wheels", "--python-version"]
+    with mock.patch("sys.argv", [*argv, "3.12", "--platform", "win_amd64"]):
+        args = parse_args()
+    assert args.requirements == ["lute>=1"]
+    assert args.wheelhouse == "wheels"
+    assert args.python_version == (3, 12)
+    assert args.platforms == ["win_amd64"]
+
+    with (
+        mock.patch("sys.argv", [*argv, "three"]),
+        pytest.raises(SystemExit, match="2"),
+    ):
+        parse_args()
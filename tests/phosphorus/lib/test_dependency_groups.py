@@ -0,0 +1,100 @@
+import pytest
+
+from phosphorus.lib import dependency_groups, exceptions, metadata
+from phosphorus.lib.type_defs import DependencyGroupMember
+
+GROUPS: dict[str, list[DependencyGroupMember]] = {
+    "test": ["lute>=1.0", {"include-group": "Typing"}],
+    "typing": ["harp", {"include-group": "base"}],
+    "base": ["drum", "lute>=1.0"],
+    "all": [{"include-group": "test"}, {"include-group": "typing"}],
+}
+
+
+def test_dependency_groups_expand() -> None:
+    groups = dependency_groups.DependencyGroups(GROUPS)
+    assert [str(requirement) for requirement in groups["all"]] == [
+        "lute (>=1.0)",
+        "harp",
+        "drum",
+    ]
+    assert [
+        str(requirement) for requirement in groups.requirements("base", "TEST")
+    ] == [
+        "drum",
+        "lute (>=1.0)",
+        "harp",
+    ]
+    assert "Typing" in groups
+    assert "docs" not in groups
+
+
+def test_dependency_groups_share_their_requirements() -> None:
+    groups = dependency_groups.DependencyGroups(GROUPS)
+    assert groups["typing"][1] is groups["base"][0]
+    assert groups["all"] is not groups["test"]
+
+
+@pytest.mark.parametrize(
+    ("groups", "message"),
+    [
+        (
+            {"a": [{"include-group": "b"}], "b": ["lute", {"include-group": "A"}]},
+            "a -> b -> a",
+        ),
+        (
+            {"a": [{"include-group": "b"}], "b": [{"include-group": "b"}]},
+            "b -> b",
+        ),
+    ],
+)
+def test_dependency_group_cycles(
+    groups: dict[str, list[DependencyGroupMember]], message: str
+) -> None:
+    resolved = dependency_groups.DependencyGroups(groups)
+    with pytest.raises(exceptions.DependencyGroupCycleError, match=message):
+        resolved[next(iter(groups))]
+
+
+def test_dependency_group_missing_include() -> None:
+    groups = dependency_groups.DependencyGroups({"a": [{"include-group": "docs"}]})
+    with pytest.raises(exceptions.ImproperlyConfiguredProjectError, match="docs"):
+        groups["a"]
+
+
+def test_get_requirements() -> None:
+    groups = dict(GROUPS)
+    requirements = metadata.get_requirements(
+        ["bell", {"include-group": "typing"}],
+        groups,
+        {"Full_Band": ["flute; os_name == 'nt'", "bell"]},
+    )
+    assert groups == GROUPS
+    assert [str(requirement) for requirement in requirements] == [
+        "bell",
+        "drum",
+        "flute ; extra == 'full-band' and os_name == 'nt'",
+        "harp",
+        "lute (>=1.0)",
+    ]
+
+
+@pytest.mark.parametrize(
+    "broken",
+    [
+        ["lute >=>= 1"],
+        [{"include-group": "docs"}],
+        [{"include-group": "dev"}],
+    ],
+)
+def test_get_requirements_ignores_unrelated_groups(
+    broken: list[DependencyGroupMember],
+) -> None:
+    requirements = metadata.get_requirements(
+        ["bell", {"include-group": "base"}], {**GROUPS, "dev": broken}
+    )
+    assert [str(requirement) for requirement in requirements] == [
+        "bell",
+        "drum",
+        "lute (>=1.0)",
+    ]
@@ -0,0 +1,147 @@
+import os
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from phosphorus.construction import api
+from phosphorus.lib.digest_cache import DigestCache, get_digest_cache, read_entries
+from phosphorus.lib.zipped_file import ArchiveFile
+
+PYPROJECT = """\
+[project]
+name = "Friendly.Bard"
+version = "1.2.3"
+requires-python = ">=3.10"
+"""
+
+
+def backdate(path: Path, seconds: float = 60) -> None:
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_unchanged_files_are_not_hashed(tmp_path: Path) -> None:
+    cache_file = tmp_path.joinpath("cache", "digests.bin")
+    song = tmp_path.joinpath("song.txt")
+    song.write_text("la la la\n")
+    backdate(song)
+    expected = ArchiveFile.hash_file(song)
+
+    cache = DigestCache(cache_file)
+    assert cache.hash_file(song) == expected
+    cache.save()
+    assert cache_file.stat().st_size == 5 + 4 + 58 + len(os.fsencode(song))
+
+    reloaded = DigestCache(cache_file)
+    with mock.patch.object(ArchiveFile, "hash_file") as hash_file:
+        assert reloaded.hash_file(song) == expected
+    hash_file.assert_not_called()
+    assert (reloaded.hits, reloaded.misses) == (1, 0)
+
+    # the same size and mtime, but another inode
+    song.unlink()
+    song.write_text("lo lo lo\n")
+    backdate(song)
+    assert reloaded.hash_file(song) == ArchiveFile.hash_file(song)
+    assert (reloaded.hits, reloaded.misses) == (1, 1)
+
+
+def test_racy_files_are_hashed_again(tmp_path: Path) -> None:
+    song = tmp_path.joinpath("song.txt")
+    song.write_text("la la la\n")
+    cache = DigestCache(tmp_path.joinpath("digests.bin"))
+    cache.hash_file(song)
+    stat = song.stat()
+
+    # modified within the same tick of the filesystem clock
+    song.write_text("lo lo lo\n")
+    os.utime(song, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.hash_file(song) == ArchiveFile.hash_file(song)
+    assert cache.hits == 0
+    cache.save()
+    assert not tmp_path.joinpath("digests.bin").exists()
+
+
+def test_removed_files_are_dropped(tmp_path: Path) -> None:
+    cache_file = tmp_path.joinpath("digests.bin")
+    songs = [tmp_path.joinpath(f"song{index}.txt") for index in range(2)]
+    cache = DigestCache(cache_file)
+    for song in songs:
+        song.write_text(song.name)
+        backdate(song)
+        cache.hash_file(song)
+    cache.save()
+    assert len(read_entries(cache_file)) == 2
+
+    songs[0].unlink()
+    reloaded = DigestCache(cache_file)
+    new_song = tmp_path.joinpath("new_song.txt")
+    new_song.write_text("la")
+    backdate(new_song)
+    reloaded.hash_file(new_song)
+    reloaded.save()
+    assert sorted(read_entries(cache_file)) == sorted(
+        os.fsencode(path) for path in (songs[1], new_song)
+    )
+
+
+@pytest.mark.parametrize(
+    "data", [b"", b"PHDC", b"XXXX\x01\x00\x00\x00\x00", b"PHDC\x01\x01\x00\x00\x00"]
+)
+def test_invalid_caches_are_ignored(tmp_path: Path, data: bytes) -> None:
+    cache_file = tmp_path.joinpath("digests.bin")
+    cache_file.write_bytes(data)
+    assert read_entries(cache_file) == {}
+
+
+def test_new_output_directories_reuse_digests(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    source_dir = tmp_path.joinpath("project")
+    package_dir = source_dir.joinpath("src", "friendly_bard")
+    package_dir.mkdir(parents=True)
+    source_dir.joinpath("pyproject.toml").write_text(PYPROJECT)
+    package_dir.joinpath("__init__.py").write_text("SONG = 'la'\n")
+    for path in source_dir.rglob("*"):
+        backdate(path)
+    monkeypatch.chdir(source_dir)
+
+    wheel = api.build_wheel(tmp_path.joinpath("first").as_posix())
+    cache = get_digest_cache({}, source_dir)
+    assert cache is not None
+    assert cache.path.exists()
+    with mock.patch.object(ArchiveFile, "hash_file") as hash_file:
+        assert api.build_wheel(tmp_path.joinpath("second").as_posix()) == wheel
+    # only the metadata files, which are generated by the build, are hashed
+    hashed = [path for (path,), _ in hash_file.call_args_list]
+    assert not any(path.is_relative_to(source_dir) for path in hashed)
+
+
+def test_disabled_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("PHOSPHORUS_DIGEST_CACHE", "")
+    assert get_digest_cache({}, tmp_path) is None
+    monkeypatch.delenv("PHOSPHORUS_DIGEST_CACHE")
+    assert get_digest_cache({}, tmp_path) is None
+
+    cache = get_digest_cache({"digest-cache": tmp_path.as_posix()}, tmp_path)
+    assert cache is not None
+    assert cache.path.parent == tmp_path.resolve()
+
+
+def test_cache_settings_are_not_build_inputs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    source_dir = tmp_path.joinpath("project")
+    source_dir.joinpath("src", "friendly_bard").mkdir(parents=True)
+    source_dir.joinpath("pyproject.toml").write_text(PYPROJECT)
+    monkeypatch.chdir(source_dir)
+    monkeypatch.delenv("PHOSPHORUS_DIGEST_CACHE")
+
+    output_dir = tmp_path.joinpath("dist").as_posix()
+    wheel = tmp_path.joinpath("dist", api.build_wheel(output_dir))
+    built = wheel.stat().st_mtime_ns
+    config = {"digest-cache": tmp_path.joinpath("digests").as_posix()}
+    api.build_wheel(output_dir, config)
+    assert wheel.stat().st_mtime_ns == built
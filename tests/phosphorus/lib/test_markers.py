@@ -1,7 +1,13 @@
+import gc
+import weakref
+
 import pytest
 
-from phosphorus.lib import markers
+from phosphorus.lib import markers, versions
+from phosphorus.lib.cache import ParseCache, clear_parse_caches
 from phosphorus.lib.constants import BooleanOperator, ComparisonOperator, MarkerVariable
+from phosphorus.lib.metadata import keep_unique
+from phosphorus.lib.requirements import Requirement
 
 
 @pytest.mark.parametrize(
@@ -72,3 +78,279 @@ from phosphorus.lib.constants import BooleanOperator, ComparisonOperator, Marker
 )
 def test_marker_from_string(marker_string: str, expected: markers.Marker) -> None:
     assert markers.Marker.from_string(marker_string) == expected
+
+
+ENVIRONMENT = {
+    "python_version": "3.11",
+    "python_full_version": "3.11.4",
+    "platform_release": "5.15.0-1034-azure",
+    "platform_machine": "x86_64",
+    "sys_platform": "linux",
+    "platform_version": "10.0.22631",
+}
+
+
+@pytest.mark.parametrize(
+    ("marker_string", "extras", "expected"),
+    [
+        ("", (), True),
+        ("python_version >= '3.10'", (), True),
+        ("python_version > '3.11'", (), False),
+        ("python_version == '3.*'", (), True),
+        ("python_full_version < '3.11.4rc1'", (), False),
+        ("'3.9' < python_version", (), True),
+        ("sys_platform == 'linux' and python_version < '3.10'", (), False),
+        ("sys_platform == 'win32' or python_version < '3.12'", (), True),
+        ("'86' in platform_machine", (), True),
+        ("platform_machine in 'x86_64 aarch64'", (), True),
+        ("platform_machine not in 'arm64'", (), True),
+        # as strings, unless both values are versions
+        ("platform_machine < 'y'", (), True),
+        ("platform_machine > 'x86_64'", (), False),
+        ("platform_machine >= 'x86_64'", (), True),
+        ("platform_release == '5.15.0-1034-azure'", (), True),
+        ("platform_release >= '5.15'", (), True),
+        ("platform_release < '5.9'", (), True),
+        ("'5.9' > platform_release", (), True),
+        ("python_full_version < '3.9'", (), False),
+        ("'3.11.4' === python_full_version", (), True),
+        ("platform_version >= '10.0.19041'", (), True),
+        ("platform_version < '9'", (), False),
+        ("extra == 'Test_Utils'", ("test-utils",), True),
+        ("extra == 'test'", ("doc", "test"), True),
+        ("extra != 'doc'", ("doc",), False),
+        ("extra != 'doc'", (), True),
+    ],
+)
+def test_marker_evaluate(
+    marker_string: str, extras: tuple[str, ...], expected: bool
+) -> None:
+    marker = markers.Marker.from_string(marker_string)
+    assert marker.evaluate(ENVIRONMENT, extras=extras) is expected
+
+
+@pytest.mark.parametrize(
+    "marker_string", ["os_name ~= 'posix'", "platform_release ~= '5.15'"]
+)
+def test_marker_evaluate_undefined_comparison(marker_string: str) -> None:
+    marker = markers.Marker.from_string(marker_string)
+    with pytest.raises(ValueError, match="undefined"):
+        marker.evaluate(ENVIRONMENT)
+
+
+def test_default_environment_is_a_snapshot() -> None:
+    environment = markers.default_environment()
+    assert environment is markers.default_environment()
+    assert markers.Marker.from_string(
+        f"python_full_version == '{environment['python_full_version']}'"
+    ).evaluate()
+
+
+A = "os_name == 'a'"
+B = "os_name == 'b'"
+C = "os_name == 'c'"
+D = "os_name == 'd'"
+
+
+@pytest.mark.parametrize(
+    ("marker_string", "expected"),
+    [
+        (f"{A} or {B} and {C} or {D}", f"{A} or ({B} and {C}) or {D}"),
+        (f"({A} or {B}) and {C}", f"({A} or {B}) and {C}"),
+        (f"(({A}))", A),
+        (f"{A} and {B} and ({C} or {D})", f"{A} and {B} and ({C} or {D})"),
+    ],
+)
+def test_marker_precedence(marker_string: str, expected: str) -> None:
+    assert str(markers.Marker.from_string(marker_string)) == expected
+
+
+def test_marker_aliases() -> None:
+    marker = markers.Marker.from_string("python_implementation == 'CPython'")
+    assert marker == markers.Marker.from_string(
+        "platform_python_implementation == 'CPython'"
+    )
+    assert markers.Marker.from_string("os.name == 'nt'") == markers.Marker.from_string(
+        "os_name == 'nt'"
+    )
+
+
+@pytest.mark.parametrize(
+    ("marker_string", "error", "position"),
+    [
+        ("os_name == 'nt' $", ValueError, 16),
+        ("os_name = 'nt'", ValueError, 8),
+        ("os_name == ", ValueError, 11),
+        ("os_name == 'nt' sys_platform", ValueError, 16),
+        ("(os_name == 'nt'", RuntimeError, 0),
+        ("os_name == 'nt' and (os_name == 'nt'", RuntimeError, 20),
+    ],
+)
+def test_marker_error_positions(
+    marker_string: str, error: type[Exception], position: int
+) -> None:
+    with pytest.raises(error, match=f"at position {position}$"):
+        markers.MarkerParser(marker_string).parse()
+
+
+MATRIX = [
+    {"python_version": python_version, "sys_platform": platform, "extra": extra}
+    for python_version in ("3.10", "3.12", "3.14")
+    for platform in ("linux", "win32")
+    # the extras of the environments are canonicalised, as by `Marker.evaluate`
+    for extra in ("", "test", "Foo_Bar")
+]
+
+
+@pytest.mark.parametrize(
+    "marker_string",
+    [
+        "",
+        "python_version >= '3.12'",
+        "python_version < '3.12' or sys_platform == 'win32'",
+        "(python_version == '3.14' or extra == 'test') and sys_platform != 'linux'",
+        "extra != 'test'",
+        "extra == 'foo-bar'",
+        "extra == 'Foo.Bar' or extra == 'test'",
+    ],
+)
+def test_environment_matrix(marker_string: str) -> None:
+    marker = markers.Marker.from_string(marker_string)
+    matrix = markers.EnvironmentMatrix(MATRIX)
+    bitset = matrix.evaluate(marker)
+
+    expected = [
+        environment
+        for environment in matrix.environments
+        if marker.evaluate(environment, extras=[environment["extra"]])
+    ]
+    assert list(matrix.select(bitset)) == expected
+    assert matrix.evaluate_many([marker]) == {marker: bitset}
+
+
+@pytest.mark.parametrize(
+    ("marker_string", "environment", "python", "expected"),
+    [
+        (
+            "python_version < '3.8' or sys_platform == 'win32'",
+            {},
+            ">=3.10",
+            "sys_platform == 'win32'",
+        ),
+        (
+            "python_version >= '3.10' and extra == 'test'",
+            {},
+            ">=3.10",
+            "extra == 'test'",
+        ),
+        ("python_version > '3.10'", {}, ">=3.10", "python_version > '3.10'"),
+        ("python_full_version >= '3.10.2'", {}, "~=3.11", True),
+        ("python_version == '3.9' and os_name == 'nt'", {}, ">=3.10", False),
+        (
+            "sys_platform == 'linux' or os_name == 'nt'",
+            {"sys_platform": "win32"},
+            "",
+            "os_name == 'nt'",
+        ),
+        ("extra == 'Test'", {"extra": "test"}, "", True),
+        (
+            "(os_name == 'nt' and (sys_platform == 'a' and sys_platform == 'b'))",
+            {},
+            "",
+            "os_name == 'nt' and sys_platform == 'a' and sys_platform == 'b'",
+        ),
+        ("os_name == 'nt' or os_name == 'nt'", {}, "", "os_name == 'nt'"),
+        ("", {}, ">=3.10", True),
+    ],
+)
+def test_marker_partial_evaluate(
+    marker_string: str,
+    environment: dict[str, str],
+    python: str,
+    expected: str | bool,
+) -> None:
+    marker = markers.Marker.from_string(marker_string)
+    specifiers = versions.SpecifierSet.from_string(python) if python else None
+    residual = marker.partial_evaluate(environment, python=specifiers)
+    if isinstance(expected, bool):
+        assert residual is expected
+    else:
+        assert str(residual) == expected
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [
+        ('os.name=="nt"', "(os_name == 'nt')"),
+        (
+            "os_name == 'nt' and python_version >= '3.10'",
+            "python_version>='3.10' and os_name=='nt'",
+        ),
+        (
+            "os_name == 'nt' and (os_name == 'java' and os_name == 'posix')",
+            "(os_name == 'nt' and os_name == 'java') and os_name == 'posix'",
+        ),
+        ("os_name == 'nt' or os_name == 'nt'", "os_name == 'nt'"),
+        (
+            "(os_name == 'nt' or os_name == 'java') and os_name == 'posix'",
+            "os_name == 'posix' and (os_name == 'java' or os_name == 'nt')",
+        ),
+        ("", ""),
+    ],
+)
+def test_marker_canonical_identity(first: str, second: str) -> None:
+    first_marker = markers.Marker.from_string(first).canonical()
+    second_marker = markers.Marker.from_string(second).canonical()
+    assert first_marker is second_marker
+    assert markers.Marker.from_string(str(first_marker)).canonical() is first_marker
+
+
+def test_marker_canonical_identity_outlives_the_parse_caches(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    marker_string = "python_version >= '3.10' and os_name == 'nt'"
+    canonical = markers.Marker.from_string(marker_string).canonical()
+    clear_parse_caches()
+    assert markers.Marker.from_string(marker_string).canonical() is canonical
+
+    # evicted from a full cache
+    monkeypatch.setattr(markers, "_canonical_markers", ParseCache(maxsize=1))
+    markers.Marker.from_string("os_name == 'posix'").canonical()
+    reordered = "os_name == 'nt' and python_version >= '3.10'"
+    assert markers.Marker.from_string(reordered).canonical() is canonical
+
+
+def test_unused_canonical_markers_are_dropped() -> None:
+    marker_string = "platform_release == '1.0-dropped' or os_name == 'dropped'"
+    canonical = weakref.ref(markers.Marker.from_string(marker_string).canonical())
+    assert canonical() is not None
+    clear_parse_caches()
+    gc.collect()
+    assert canonical() is None
+
+
+def test_marker_canonical_keeps_meaning() -> None:
+    different = [
+        "os_name == 'nt' and python_version >= '3.10'",
+        "os_name == 'nt' or python_version >= '3.10'",
+        "(os_name == 'nt' or os_name == 'java') and os_name == 'posix'",
+        "os_name == 'nt' or (os_name == 'java' and os_name == 'posix')",
+    ]
+    canonical = [markers.Marker.from_string(s).canonical() for s in different]
+    assert len({id(marker) for marker in canonical}) == len(different)
+
+
+def test_requirements_with_equivalent_markers_are_unique() -> None:
+    unique = keep_unique(
+        Requirement.from_string(requirement)
+        for requirement in [
+            "foo>=1; os_name=='nt' and python_version>='3.10'",
+            "foo>=1; python_version >= '3.10' and os.name == \"nt\"",
+            "foo>=1; (python_version>='3.10') and (os_name=='nt')",
+            "foo>=1; os_name=='posix'",
+        ]
+    )
+    assert [str(requirement.marker) for requirement in unique] == [
+        "os_name == 'nt' and python_version >= '3.10'",
+        "os_name == 'posix'",
+    ]
@@ -0,0 +1,157 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from phosphorus.lib import requirements
+from phosphorus.lib.exceptions import RequirementsFileError
+
+
+@pytest.mark.parametrize(
+    ("requirement_string", "expected"),
+    [
+        ("Friendly_Bard", "friendly-bard"),
+        ("friendly-bard>=1.0,<2", "friendly-bard (>=1.0,<2)"),
+        ("friendly-bard ( >=1.0 , <2 )", "friendly-bard (>=1.0,<2)"),
+        ("friendly-bard[Lute, harp,lute]", "friendly-bard[harp,lute]"),
+        ("friendly-bard[]==1.2.*", "friendly-bard (==1.2.*)"),
+        ("friendly-bard===1.0-custom", "friendly-bard (===1.0-custom)"),
+        ("friendly-bard ===Foo_Bar", "friendly-bard (===Foo_Bar)"),
+        (
+            "friendly-bard[lute]>=1;python_version<'3.11'",
+            "friendly-bard[lute] (>=1) ; python_version < '3.11'",
+        ),
+        (
+            "friendly-bard@ https://example.com/bard.whl#sha256=00",
+            "friendly-bard @ https://example.com/bard.whl#sha256=00",
+        ),
+        (
+            "friendly-bard [lute] @ git+https://example.com/bard.git ; os_name=='nt'",
+            "friendly-bard[lute] @ git+https://example.com/bard.git ; os_name == 'nt'",
+        ),
+    ],
+)
+def test_requirement_from_string(requirement_string: str, expected: str) -> None:
+    requirement = requirements.Requirement.from_string(requirement_string)
+    assert str(requirement) == expected
+    assert requirements.Requirement.from_string(expected) == requirement
+
+
+@pytest.mark.parametrize(
+    ("requirement_string", "message"),
+    [
+        ("[lute]", "Expected a package name at position 0"),
+        ("bard[lute harp]", "Expected an extra name at position 5"),
+        ("bard lute", "Expected the end or ';' at position 5"),
+        ("bard (>=1.0", "Expected the end or ';' at position 5"),
+        ("bard>=1;", "Expected a marker after ';' at position 7"),
+        ("bard; os_name ==", "Expected a marker variable or a string at position 16"),
+    ],
+)
+def test_requirement_errors(requirement_string: str, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        requirements.RequirementParser(requirement_string).parse()
+
+
+def test_parse_many(tmp_path: Path) -> None:
+    tmp_path.joinpath("requirements.txt").write_text(
+        "# the band\n"
+        "lute>=1.0  # strings\n"
+        "\n"
+        "harp \\\n"
+        "  >=2.0 \\\n"
+        "  ; python_version < '3.11'\n"
+        "--index-url https://example.com/simple\n"
+        "drum==1.0 --hash=sha256:00\n"
+        "-r extra/more.txt\n"
+        "--constraint=constraints.txt\n"
+        "flute @ https://example.com/flute.whl#egg=flute",
+        encoding="utf-8",
+    )
+    tmp_path.joinpath("extra").mkdir()
+    tmp_path.joinpath("extra", "more.txt").write_text("bell\n", encoding="utf-8")
+    tmp_path.joinpath("constraints.txt").write_text(
+        "-r extra/more.txt\n", encoding="utf-8"
+    )
+
+    lines = list(requirements.parse_many(tmp_path.joinpath("requirements.txt")))
+    assert [
+        (str(line.requirement), line.path.name, line.line_number, line.constraint)
+        for line in lines
+    ] == [
+        ("lute (>=1.0)", "requirements.txt", 2, False),
+        ("harp (>=2.0) ; python_version < '3.11'", "requirements.txt", 4, False),
+        ("drum (==1.0)", "requirements.txt", 8, False),
+        ("bell", "more.txt", 1, False),
+        ("bell", "more.txt", 1, True),
+        (
+            "flute @ https://example.com/flute.whl#egg=flute",
+            "requirements.txt",
+            11,
+            False,
+        ),
+    ]
+
+
+def test_parse_many_include_cycle(tmp_path: Path) -> None:
+    tmp_path.joinpath("a.txt").write_text("lute\n-r b.txt\n", encoding="utf-8")
+    tmp_path.joinpath("b.txt").write_text("-c a.txt\n", encoding="utf-8")
+    with pytest.raises(RuntimeError, match="includes itself"):
+        list(requirements.parse_many(tmp_path.joinpath("a.txt")))
+
+
+@pytest.mark.parametrize(
+    ("line", "message"),
+    [
+        ("-e ./lute", "line 2: Editable requirements are not supported: '-e ./lute'"),
+        ("--editable=./lute", "line 2: Editable requirements are not supported"),
+        ("-e./lute", "line 2: Editable requirements are not supported"),
+        ("--no-deps", "line 2: Unsupported option --no-deps"),
+        ("./lute", "line 2: Invalid requirement './lute'"),
+        (
+            "https://example.com/lute.whl",
+            "line 2: Invalid requirement 'https://example.com/lute.whl'",
+        ),
+    ],
+)
+def test_parse_many_unsupported_lines(tmp_path: Path, line: str, message: str) -> None:
+    requirements_file = tmp_path.joinpath("requirements.txt")
+    requirements_file.write_text(f"harp\n{line}\n", encoding="utf-8")
+    with pytest.raises(RequirementsFileError, match=re.escape(message)) as exc_info:
+        list(requirements.parse_many(requirements_file))
+    assert str(exc_info.value).startswith(f"{requirements_file}, line 2: ")
+
+
+@pytest.mark.parametrize(
+    ("requirement_strings", "expected"),
+    [
+        (
+            ["lute>=1", "lute<3", "lute>=1.2; python_version>='3.11'", "harp"],
+            ["harp", "lute (<3,>=1)", "lute (>=1.2) ; python_version >= '3.11'"],
+        ),
+        (
+            ["lute>=1; os_name=='nt'", "lute>=1; sys_platform=='linux'"],
+            ["lute (>=1) ; os_name == 'nt' or sys_platform == 'linux'"],
+        ),
+        (
+            ["lute[strings]>=1", "lute[Bows]>=1.5", "lute>=2; os_name == 'nt'"],
+            ["lute[bows,strings] (>=1.5)", "lute (>=2) ; os_name == 'nt'"],
+        ),
+        (
+            ["lute>=2", "lute>=1; os_name == 'nt'", "lute>=1; os_name != 'nt'"],
+            ["lute (>=2)"],
+        ),
+        (
+            ["lute @ https://example.com/lute.whl", "lute>=1; os_name == 'nt'"],
+            ["lute @ https://example.com/lute.whl", "lute (>=1) ; os_name == 'nt'"],
+        ),
+    ],
+)
+def test_merge_requirements(
+    requirement_strings: list[str], expected: list[str]
+) -> None:
+    merged = requirements.merge_requirements(
+        requirements.Requirement.from_string(requirement)
+        for requirement in requirement_strings
+    )
+    assert sorted(str(requirement) for requirement in merged) == sorted(expected)
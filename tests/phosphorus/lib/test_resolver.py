@@ -0,0 +1,165 @@
+import io
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from zipfile import ZipFile
+
+import pytest
+
+from phosphorus.lib import exceptions, resolver, tags, wheelhouse
+from phosphorus.lib.packages import Package
+from phosphorus.lib.requirements import Requirement
+
+ENVIRONMENT = resolver.TargetEnvironment.current(
+    python_version=(3, 12), platforms=["manylinux_2_17_x86_64", "linux_x86_64"]
+)
+
+
+def make_wheel(
+    directory: Path,
+    name: str,
+    version: str,
+    *requirements: str,
+    tag: str = "py3-none-any",
+    python: str = "",
+) -> Path:
+    path = directory.joinpath(f"{name}-{version}-{tag}.whl")
+    headers = [f"Name: {name}", f"Version: {version}"]
+    headers.extend(f"Requires-Dist: {requirement}" for requirement in requirements)
+    if python:
+        headers.append(f"Requires-Python: {python}")
+    with ZipFile(path, "w") as archive:
+        archive.writestr(f"{name}-{version}.dist-info/METADATA", "\n".join(headers))
+    return path
+
+
+def make_sdist(directory: Path, name: str, version: str, *requirements: str) -> None:
+    headers = [f"Name: {name}", f"Version: {version}"]
+    headers.extend(f"Requires-Dist: {requirement}" for requirement in requirements)
+    contents = "\n".join(headers).encode()
+    info = tarfile.TarInfo(f"{name}-{version}/PKG-INFO")
+    info.size = len(contents)
+    path = directory.joinpath(f"{name}-{version}.tar.gz")
+    with tarfile.open(path, "w:gz") as archive:
+        archive.addfile(info, io.BytesIO(contents))
+
+
+def resolve(directory: Path, *requirements: str) -> dict[str, str]:
+    house = wheelhouse.Wheelhouse(directory)
+    resolution = resolver.Resolver(house, ENVIRONMENT).resolve(
+        Requirement.from_string(requirement) for requirement in requirements
+    )
+    return {
+        artifact.package.name: artifact.path.name for artifact in resolution.artifacts
+    }
+
+
+def test_tag_from_string() -> None:
+    assert [str(tag) for tag in tags.Tag.from_string("py2.py3-none-any")] == [
+        "py2-none-any",
+        "py3-none-any",
+    ]
+
+
+def test_supported_tags() -> None:
+    supported = [str(tag) for tag in tags.supported_tags((3, 12), ["linux_x86_64"])]
+    assert supported[:3] == [
+        "cp312-cp312-linux_x86_64",
+        "cp312-abi3-linux_x86_64",
+        "cp312-none-linux_x86_64",
+    ]
+    assert supported.index("cp311-abi3-linux_x86_64") < supported.index(
+        "py312-none-linux_x86_64"
+    )
+    assert supported[-1] == "py30-none-any"
+
+
+def test_wheelhouse_index(tmp_path: Path) -> None:
+    make_wheel(tmp_path, "lute", "1.0")
+    make_wheel(tmp_path, "lute", "2.0")
+    make_sdist(tmp_path, "harp", "0.1")
+    tmp_path.joinpath("lute-notes.txt").touch()
+    tmp_path.joinpath("lute-abc-py3-none-any.whl").touch()
+
+    house = wheelhouse.Wheelhouse(tmp_path)
+    assert len(house) == 4
+    assert [str(artifact.version) for artifact in house.artifacts(Package("Lute"))] == [
+        "2.0",
+        "1.0",
+    ]
+    assert house.packages == (Package("harp"), Package("lute"))
+    assert tmp_path.joinpath(wheelhouse.wheelhouse_index_name).exists()
+
+    make_wheel(tmp_path, "lute", "3.0")
+    assert len(wheelhouse.Wheelhouse(tmp_path)) == 5
+
+
+def test_concurrent_wheelhouse_indexes(tmp_path: Path) -> None:
+    for version in range(20):
+        make_wheel(tmp_path, "lute", f"{version}.0")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        sizes = list(
+            executor.map(lambda _: len(wheelhouse.Wheelhouse(tmp_path)), range(16))
+        )
+    assert sizes == [20] * 16
+    assert [path.name for path in tmp_path.glob(".phosphorus-index*")] == [
+        wheelhouse.wheelhouse_index_name
+    ]
+    assert len(wheelhouse.Wheelhouse(tmp_path)) == 20
+
+
+def test_resolve_newest(tmp_path: Path) -> None:
+    make_wheel(tmp_path, "lute", "1.0")
+    make_wheel(tmp_path, "lute", "2.0", "harp>=1")
+    make_wheel(tmp_path, "harp", "1.5")
+    make_wheel(tmp_path, "harp", "2.0b1")
+    assert resolve(tmp_path, "lute") == {
+        "harp": "harp-1.5-py3-none-any.whl",
+        "lute": "lute-2.0-py3-none-any.whl",
+    }
+
+
+def test_resolve_backtracks(tmp_path: Path) -> None:
+    make_wheel(tmp_path, "lute", "2.0", "harp<1")
+    make_wheel(tmp_path, "lute", "1.0", "harp>=1")
+    make_wheel(tmp_path, "harp", "1.0")
+    make_wheel(tmp_path, "harp", "0.5")
+    make_wheel(tmp_path, "drum", "1.0", "harp>=1")
+    assert resolve(tmp_path, "drum", "lute") == {
+        "drum": "drum-1.0-py3-none-any.whl",
+        "harp": "harp-1.0-py3-none-any.whl",
+        "lute": "lute-1.0-py3-none-any.whl",
+    }
+
+
+def test_resolve_target_environment(tmp_path: Path) -> None:
+    make_wheel(tmp_path, "lute", "2.0", python=">=3.13")
+    make_wheel(tmp_path, "lute", "1.0", "harp; python_version < '3.13'")
+    make_wheel(tmp_path, "harp", "1.0", tag="cp312-cp312-win_amd64")
+    make_wheel(tmp_path, "harp", "1.0", tag="cp312-abi3-manylinux_2_17_x86_64")
+    make_sdist(tmp_path, "harp", "1.0")
+    assert resolve(tmp_path, "lute") == {
+        "harp": "harp-1.0-cp312-abi3-manylinux_2_17_x86_64.whl",
+        "lute": "lute-1.0-py3-none-any.whl",
+    }
+
+
+def test_resolve_extras(tmp_path: Path) -> None:
+    make_wheel(tmp_path, "lute", "2.0", "harp; extra == 'strings'")
+    make_wheel(tmp_path, "lute", "1.0")
+    make_sdist(tmp_path, "harp", "1.0", "drum")
+    make_wheel(tmp_path, "drum", "1.0")
+    assert resolve(tmp_path, "lute[Strings]") == {
+        "drum": "drum-1.0-py3-none-any.whl",
+        "harp": "harp-1.0.tar.gz",
+        "lute": "lute-2.0-py3-none-any.whl",
+    }
+
+
+def test_resolve_impossible(tmp_path: Path) -> None:
+    make_wheel(tmp_path, "lute", "1.0", "harp>=2")
+    make_wheel(tmp_path, "harp", "1.0")
+    with pytest.raises(exceptions.ResolutionImpossibleError, match="lute"):
+        resolve(tmp_path, "lute")
+    with pytest.raises(ValueError, match="direct reference"):
+        resolve(tmp_path, "harp @ https://example.com/harp.whl")
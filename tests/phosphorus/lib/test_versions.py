@@ -1,6 +1,10 @@
+import itertools
+import random
+
 import pytest
 
 from phosphorus.lib import versions
+from phosphorus.lib.constants import ComparisonOperator
 
 
 def test_release_trailing_zeroes() -> None:
@@ -26,12 +30,27 @@ def test_release_implied_segments() -> None:
         ("1.1.rc1", "1.1.b1"),
         ("1.1.b1", "1.1.a1"),
         ("1.1.a1", "1.1.dev1"),
+        ("1.1.a2.dev1", "1.1.a1"),
+        ("1.1.post1.dev1", "1.1"),
+        ("1.1+5", "1.1+abc"),
+        ("1.1+abc", "1.1"),
     ],
 )
 def test_version_comparison(big: str, small: str) -> None:
     assert versions.Version.from_string(big) > versions.Version.from_string(small)
 
 
+@pytest.mark.parametrize(
+    ("left", "right"),
+    [("1.1", "1.1.0"), ("1.1a", "1.1-alpha0"), ("1.1+Abc", "1.1+abc")],
+)
+def test_version_equality(left: str, right: str) -> None:
+    left_version = versions.Version.from_string(left)
+    right_version = versions.Version.from_string(right)
+    assert left_version == right_version
+    assert hash(left_version) == hash(right_version)
+
+
 @pytest.mark.parametrize(
     ("version_string", "match_all", "epoch"),
     [("1.2.*", False, 0), ("*", True, -1), ("15!*", True, 15)],
@@ -62,6 +81,8 @@ def test_version_wildcards(version_string: str, match_all: bool, epoch: int) ->
         ("1.2.0.5-1", "==1.2.0.*", True),
         ("1.2.a1", "==1.2.0.*", True),
         ("1.2.7", "==1.2.0.*", False),
+        ("1.20", "==1.2.*", False),
+        ("1!1.2", "==1!1.2.*", True),
         ("1.2", "==*", True),
         ("1.2", "==1!*", False),
         ("1.2+local", "==1.2", True),
@@ -79,6 +100,7 @@ def test_version_wildcards(version_string: str, match_all: bool, epoch: int) ->
         ("1.2.0.5-1", "!=1.2.0.*", False),
         ("1.2.a1", "!=1.2.0.*", False),
         ("1.2.7", "!=1.2.0.*", True),
+        ("1.20", "!=1.2.*", True),
         ("1.2", "!=*", False),
         ("1.2", "!=1!*", True),
         ("1.2+local", "!=1.2", False),
@@ -90,6 +112,7 @@ def test_version_wildcards(version_string: str, match_all: bool, epoch: int) ->
         ("1.3", "~=1.2", True),
         ("1.2.42", "~=1.2", True),
         ("1.2.42", "~=1.2.43", False),
+        ("1.20", "~=1.2.3", False),
         ("1.2+local", "~=1.2", True),
         ("1!1.2", ">=1.2", True),
         ("1.2", ">=1!1.2", False),
@@ -139,9 +162,268 @@ def test_version_wildcards(version_string: str, match_all: bool, epoch: int) ->
         ("1.7.1", "<1.7.1.rc2", False),
         ("1.7.1.rc1", "<1.7.1.rc2", True),
         ("1.7.0", "<1.7.1.rc2", True),
+        ("1!0.b2", ">0.3", True),
+        ("1!0.b2", "<1.1", False),
+        ("1.7.rc1", "<1.7.post1", True),
+        ("1.7.post1.dev1", "<1.7.post1", False),
+        ("1.7.dev1", "<1.7", False),
+        ("1.7.post2", ">1.7.post1", True),
+        ("1.7.post1+local", ">1.7.post1", False),
+        ("1.7.1.dev1", ">1.7.1.dev0", True),
     ],
 )
 def test_version_matching(candidate: str, clause: str, match: bool) -> None:
     candidate_version = versions.Version.from_string(candidate)
     version_clause = versions.VersionClause.from_string(clause)
     assert version_clause.match(candidate_version) is match
+
+
+CANDIDATES = [
+    "0.9",
+    "1",
+    "1.2",
+    "1.2.0",
+    "1.2.0.5",
+    "1.2.0.5-1",
+    "1.2.a1",
+    "1.2.7",
+    "1.20",
+    "1.2.post1",
+    "1.2.post2.dev1",
+    "1.2.dev3",
+    "1.2.rc1.dev1",
+    "1.2+local",
+    "1.2.1+5.abc",
+    "1.3",
+    "1.7.0.post1",
+    "1.7.1.rc1",
+    "1!1.2",
+    "1!0.b2",
+    "2.0.0.0.1",
+    "not-a-version",
+]
+CLAUSES = [
+    "*",
+    "1!*",
+    "==1.2",
+    "==1.2.*",
+    "==1.2.0.*",
+    "==1.2.a1.*",
+    "==1.2+local",
+    "!=1.2.*",
+    "!=1.2",
+    "!=1.2.a1.*",
+    "~=1.2",
+    "~=1.2.0",
+    "~=1.2.post1",
+    ">=1.2",
+    ">=1.2.0.5",
+    "<=1.2",
+    "<=1.2.post1",
+    ">1.2",
+    ">1.2.post1",
+    "<1.2",
+    "<1.2.rc2",
+    "<2.0.0.0.0.0.1",
+    "===1.2",
+    "===not-a-version",
+]
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+@pytest.mark.parametrize("clause", CLAUSES)
+def test_version_array_matches_clauses(use_numpy: bool, clause: str) -> None:
+    if use_numpy:
+        pytest.importorskip("numpy")
+    candidates = [versions.Version.from_string(version) for version in CANDIDATES]
+    array = versions.VersionArray(candidates, use_numpy=use_numpy)
+    version_clause = versions.VersionClause.from_string(clause)
+
+    expected = [version_clause.match(candidate) for candidate in candidates]
+    assert [bool(selected) for selected in array.match(version_clause)] == expected
+
+
+@pytest.mark.parametrize(
+    "clauses",
+    [
+        ">=1.2,<1.3",
+        "~=1.2.post1,!=1.2.*",
+        "==1.2.*",
+        "===1.2",
+        "===not-a-version",
+        "===not-a-version,!=1.2",
+        "",
+    ],
+)
+def test_specifier_set_matches_all_clauses(clauses: str) -> None:
+    candidates = sorted(
+        (versions.Version.from_string(version) for version in CANDIDATES),
+        key=lambda version: version.sort_key,
+    )
+    specifiers = versions.SpecifierSet.from_string(clauses)
+
+    expected = [
+        candidate
+        for candidate in candidates
+        if all(clause.match(candidate) for clause in specifiers.clauses)
+    ]
+    assert specifiers.filter(candidates, prereleases=True) == expected
+    assert [
+        candidate
+        for candidate in candidates
+        if specifiers.contains(candidate, prereleases=True)
+    ] == expected
+
+
+@pytest.mark.parametrize(
+    ("clauses", "prereleases", "expected"),
+    [
+        (">=1.0", None, ["1.0", "2.0"]),
+        (">=2.0.b1", None, ["2.0.b1", "2.0"]),
+        (">=1.0", True, ["1.0", "1.1.a1", "2.0.b1", "2.0"]),
+        (">1.0,<2.0", None, ["1.1.a1"]),
+        (">1.0,<2.0", False, []),
+    ],
+)
+def test_specifier_set_prereleases(
+    clauses: str, prereleases: bool | None, expected: list[str]
+) -> None:
+    candidates = [
+        versions.Version.from_string(version)
+        for version in ("1.0", "1.1.a1", "2.0.b1", "2.0")
+    ]
+    specifiers = versions.SpecifierSet.from_string(clauses)
+    matched = specifiers.filter(candidates, prereleases=prereleases)
+    assert matched == [versions.Version.from_string(version) for version in expected]
+
+
+def test_specifier_set_intervals_are_merged() -> None:
+    specifiers = versions.SpecifierSet.from_string(">=1.0,<2.0,>=1.5,!=3.0")
+    assert len(specifiers.intervals) == 1
+    assert not versions.SpecifierSet.from_string(">=2.0,<1.0").intervals
+
+
+def _random_specifier_set(generator: random.Random) -> versions.SpecifierSet:
+    clauses = generator.sample(CLAUSES[2:], generator.randint(1, 3))
+    return versions.SpecifierSet.from_string(",".join(clauses))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_specifier_algebra_matches_brute_force(seed: int) -> None:
+    generator = random.Random(seed)  # noqa: S311
+    candidates = [versions.Version.from_string(version) for version in CANDIDATES]
+    left = _random_specifier_set(generator)
+    right = _random_specifier_set(generator)
+    in_left = [candidate in left.version_set for candidate in candidates]
+    in_right = [candidate in right.version_set for candidate in candidates]
+    assert in_left == [
+        all(clause.match(candidate) for clause in left.clauses)
+        for candidate in candidates
+    ]
+
+    union = left.union(right)
+    intersection = left.version_set.intersection(right.version_set)
+    assert [candidate in union for candidate in candidates] == [
+        a or b for a, b in zip(in_left, in_right, strict=True)
+    ]
+    assert [candidate in intersection for candidate in candidates] == [
+        a and b for a, b in zip(in_left, in_right, strict=True)
+    ]
+    if left.is_empty():
+        assert not any(in_left)
+    if left.issubset(right):
+        assert all(b for a, b in zip(in_left, in_right, strict=True) if a)
+    simplified = left.simplify()
+    assert [candidate in simplified.version_set for candidate in candidates] == in_left
+
+
+@pytest.mark.parametrize(
+    ("clauses", "simplified"),
+    [
+        (">=1.0,>=1.2,<3,!=2.5,<2.9", ">=1.2,!=2.5,<2.9"),
+        ("~=1.2,>=1.0,!=2.*", "~=1.2"),
+        ("==1.2,==1.2", "==1.2"),
+        (">=1.0a1,>=1.2", ">=1.0a1,>=1.2"),
+        (">1.2,~=1.2,~=1.2.0", ">1.2,~=1.2.0"),
+        ("==1.2.*,==1.2.0.*", "==1.2.0.*"),
+        ("===not-a-version,===not-a-version", "===not-a-version"),
+    ],
+)
+def test_specifier_set_simplify(clauses: str, simplified: str) -> None:
+    assert str(versions.SpecifierSet.from_string(clauses).simplify()) == simplified
+
+
+def test_specifier_set_satisfiability() -> None:
+    assert versions.SpecifierSet.from_string(">=2,<1").is_empty()
+    assert versions.SpecifierSet.from_string("==1.2.*,<1.2.dev0").is_empty()
+    assert not versions.SpecifierSet.from_string(">=1,<1.0.0.1").is_empty()
+    assert not versions.SpecifierSet.from_string("===not-a-version").is_empty()
+    assert versions.SpecifierSet.from_string("===not-a-version,>=1").is_empty()
+    assert not versions.SpecifierSet.from_string("===not-a-version").issubset(
+        versions.SpecifierSet.from_string("!=1.0")
+    )
+    assert versions.SpecifierSet.from_string("~=1.2").issubset(
+        versions.SpecifierSet.from_string(">=1.0,!=2.*")
+    )
+
+
+def _match_by_operator(
+    clause: versions.VersionClause, candidate: versions.Version
+) -> bool:
+    if not (clause.identifier.pep_440_compliant and candidate.pep_440_compliant):
+        return clause.match_exact(candidate)
+    return {
+        ComparisonOperator.COMPATIBLE_WITH: clause.match_compatible,
+        ComparisonOperator.EQUAL_TO: clause.match_equality,
+        ComparisonOperator.NOT_EQUAL: lambda version: (
+            not clause.match_equality(version)
+        ),
+        ComparisonOperator.LESS_OR_EQUAL: clause.match_leq,
+        ComparisonOperator.GREATER_OR_EQUAL: clause.match_geq,
+        ComparisonOperator.LESS_THAN: clause.match_lt,
+        ComparisonOperator.GREATER_THAN: clause.match_gt,
+        ComparisonOperator.EXACT_MATCH: clause.match_exact,
+    }[clause.operator](candidate)
+
+
+@pytest.mark.parametrize("clause", CLAUSES)
+def test_compiled_matcher(clause: str) -> None:
+    version_clause = versions.VersionClause.from_string(clause)
+    for version in CANDIDATES:
+        candidate = versions.Version.from_string(version)
+        expected = _match_by_operator(version_clause, candidate)
+        assert version_clause.match(candidate) == expected, version
+
+
+def _version_corpus() -> list[str]:
+    releases = ["0", "1", "1.0", "01.002", "1.2.3.4.5", "2025.10"]
+    pre_releases = ["", "a", "a1", "b2", "rc3", "c4", ".a1", "-rc1", "alpha", "RC1"]
+    post_releases = ["", ".post", ".post1", "post2", "-3", ".rev4", "_r5", ".Post6"]
+    dev_releases = ["", ".dev", ".dev7", "dev8", "-dev9", ".DEV1"]
+    suffixes = ["", "+local", "+1.x_y", " ", "\n", ".*", "."]
+    corpus = [
+        "".join(parts)
+        for parts in itertools.product(
+            releases, pre_releases, post_releases, dev_releases, suffixes
+        )
+    ]
+    corpus += ["", ".1", "1.", "1..2", "v1.0", "1!1.0", "rc1", "1.0ab1", "\u0661.2"]
+    corpus += ["1.\u00b2", "1.0.dev.post1", "1.0.post1a1", "1.0.dev1.dev2", "1.0a1b2"]
+    return corpus
+
+
+def test_scan_version_agrees_with_regex() -> None:
+    scanned = 0
+    for version in _version_corpus():
+        groups = versions.scan_version(version)
+        if groups is not None:
+            scanned += 1
+            assert groups == versions.match_version(version), version
+    assert scanned > 0
+
+
+@pytest.mark.parametrize(
+    "version", ["1", "1.2.3", "1.0a1", "1.0b2", "1.0rc3", "1.0.post1", "1.0.dev0"]
+)
+def test_scan_version_common_forms(version: str) -> None:
+    assert versions.scan_version(version) == versions.match_version(version)
@@ -0,0 +1,79 @@
+import sys
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from phosphorus.lib.watch import InotifyWatcher, PollingWatcher, WatchedPaths, Watcher
+
+watchers = pytest.mark.parametrize(
+    "make_watcher",
+    [
+        pytest.param(
+            lambda watched: PollingWatcher(watched, interval=0.01, debounce=0.05),
+            id="polling",
+        ),
+        pytest.param(
+            lambda watched: InotifyWatcher(watched, debounce=0.05),
+            id="inotify",
+            marks=pytest.mark.skipif(
+                sys.platform != "linux", reason="inotify is linux only"
+            ),
+        ),
+    ],
+)
+
+
+@watchers
+def test_watch_changed_files(
+    tmp_path: Path, make_watcher: Callable[[WatchedPaths], Watcher]
+) -> None:
+    package_dir = tmp_path.joinpath("src", "lute")
+    package_dir.mkdir(parents=True)
+    package_dir.joinpath("__init__.py").touch()
+    pyproject = tmp_path.joinpath("pyproject.toml")
+    pyproject.touch()
+    notes = tmp_path.joinpath("notes.txt")
+    notes.touch()
+    watcher = make_watcher(WatchedPaths([pyproject, package_dir]))
+
+    def change() -> None:
+        notes.write_text("ignored")
+        pyproject.write_text("[project]")
+        package_dir.joinpath("__init__.py").unlink()
+        package_dir.joinpath("strings").mkdir()
+        package_dir.joinpath("strings", "gut.py").write_text("pass")
+
+    timer = threading.Timer(0.05, change)
+    timer.start()
+    try:
+        changes = watcher.wait()
+    finally:
+        timer.join()
+        watcher.close()
+    assert changes >= {
+        pyproject,
+        package_dir.joinpath("__init__.py"),
+        package_dir.joinpath("strings", "gut.py"),
+    }
+    assert notes not in changes
+
+
+@watchers
+def test_watch_mode_changes(
+    tmp_path: Path, make_watcher: Callable[[WatchedPaths], Watcher]
+) -> None:
+    script = tmp_path.joinpath("serenade.py")
+    script.write_text("pass")
+    script.chmod(0o644)
+    watcher = make_watcher(WatchedPaths([tmp_path]))
+
+    timer = threading.Timer(0.05, script.chmod, (0o755,))
+    timer.start()
+    try:
+        changes = watcher.wait()
+    finally:
+        timer.join()
+        watcher.close()
+    assert changes == {script}
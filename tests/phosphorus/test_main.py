@@ -2,6 +2,7 @@ from unittest import mock
 
 from phosphorus.__main__ import main
 from phosphorus.subcommands.build import BuildCommand
+from phosphorus.subcommands.resolve import ResolveCommand
 
 
 @mock.patch(
@@ -14,3 +15,15 @@ def test_main_run(mock_runner: mock.MagicMock) -> None:
     assert mock_runner.call_count == 1
     calls = [mock.call()]
     assert mock_runner.call_args_list == calls
+
+
+@mock.patch(
+    "phosphorus.__main__.parse_args",
+    new=mock.MagicMock(return_value=mock.MagicMock(subcommand="resolve")),
+)
+@mock.patch.object(ResolveCommand, "__init__", return_value=None)
+@mock.patch.object(ResolveCommand, "run", new_callable=mock.MagicMock())
+def test_main_resolve(mock_runner: mock.MagicMock, mock_init: mock.MagicMock) -> None:
+    main()
+    assert mock_runner.call_count == 1
+    assert mock_init.call_count == 1